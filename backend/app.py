@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import json
+import math
 import os
 import sys
-from flask import Flask, jsonify, request
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from struct import error as struct_error
+from flask import Flask, Response, jsonify, request, send_file
 import psycopg2
 
 # --- chemin pour importer src/* peu importe le cwd ---
@@ -10,9 +17,22 @@ BASE_DIR = os.path.dirname(__file__)
 if BASE_DIR not in sys.path:
     sys.path.append(BASE_DIR)
 
-from src.partC_graphs import dijkstra, astar, detect_cycle_with_dsu
-from src.partD_streaming import reservoir_sampling, CountMinSketch
-from src.partE_security import sha256_text, sha256_file, BloomFilter
+from src.partA_text_search import AhoCorasick
+from src.partB_selection import Leaderboard
+from src.partC_graphs import (
+    dijkstra, astar, jps, bidirectional, detect_cycle_with_dsu,
+    as_compiled, grid_fingerprint, get_flow_field, get_hierarchy, LRUCache,
+    CompiledGrid, MapRegistry, get_path_pool, GuildGraph, JPS_FALLBACK_LABEL,
+    HPA_FALLBACK_LABEL, use_hpa,
+)
+from src.partD_streaming import (
+    reservoir_sampling, weighted_reservoir_sampling, ReservoirSampler, WeightedReservoirSampler,
+    CountMinSketch, HeavyHitters,
+)
+from src.partE_security import (
+    sha256_text, sha256_file, merkle_file, merkle_many, corrupted_chunks, MERKLE_CHUNK_SIZE,
+    BlobStore, BloomFilter, ScalableBloomFilter, MappedBloomFilter, CuckooFilter,
+)
 
 app = Flask(__name__)
 try:
@@ -27,7 +47,86 @@ except Exception:
     app.json_provider_class = UTF8JSONProvider
     app.json = UTF8JSONProvider(app)
 
-BLOOM = BloomFilter(m=2048, k=4)
+BLOOM_CAPACITY = int(os.getenv("BLOOM_CAPACITY", "10000"))
+BLOOM_FPR = float(os.getenv("BLOOM_FPR", "0.001"))
+# BLOOM_PATH défini : filtre partagé par tous les workers (fichier mmap, repris au redémarrage) ;
+# sinon filtre extensible en mémoire : le taux de faux positifs reste sous BLOOM_FPR quand la liste grossit
+BLOOM_PATH = os.getenv("BLOOM_PATH")
+BLOOM = (MappedBloomFilter.open(BLOOM_PATH, BLOOM_CAPACITY, BLOOM_FPR) if BLOOM_PATH
+         else ScalableBloomFilter(initial_capacity=BLOOM_CAPACITY, fpr=BLOOM_FPR))
+BLOOM_LOCK = threading.Lock()
+# Stockage dédupliqué des contenus envoyés (replays, skins), ouvert au premier usage
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR") or os.path.join(tempfile.gettempdir(), "atelier-blobs")
+BLOBS: BlobStore | None = None
+BLOBS_INIT_LOCK = threading.Lock()
+
+def blob_store() -> BlobStore:
+    global BLOBS
+    with BLOBS_INIT_LOCK:
+        if BLOBS is None:
+            BLOBS = BlobStore(BLOB_STORE_DIR)
+        return BLOBS
+
+# Liste de bannis : filtre coucou (retrait d'un ban en O(1), sans reconstruction) pour les
+# vérifications ; BANNED_IDS, liste exacte, décide seule des ajouts et retraits
+BANS = CuckooFilter.for_capacity(int(os.getenv("BAN_CAPACITY", "100000")), BLOOM_FPR)
+BANNED_IDS: set[str] = set()
+BANS_LOCK = threading.Lock()
+
+# Dictionnaire de modération par défaut : compilé une seule fois au démarrage
+BANNED_WORDS = ["cheater", "noob", "hack", "aimbot", "wallhack", "exploit", "ddos"]
+CHAT_FILTER = AhoCorasick(BANNED_WORDS, ignore_case=True)
+
+
+@lru_cache(maxsize=16)
+def compiled_chat_filter(patterns: tuple[str, ...], ignore_case: bool) -> AhoCorasick:
+    # réutilise l'automate entre requêtes pour un même dictionnaire
+    return AhoCorasick(list(patterns), ignore_case=ignore_case)
+
+# Classement en direct (état global, protégé par un verrou)
+LEADERBOARD = Leaderboard()
+LEADERBOARD_LOCK = threading.Lock()
+
+# Graphe des guildes (état global) : restauré depuis GUILD_SNAPSHOT_PATH s'il existe
+GUILD_SNAPSHOT_PATH = os.getenv("GUILD_SNAPSHOT_PATH")
+GUILD_SNAPSHOT_INTERVAL = float(os.getenv("GUILD_SNAPSHOT_INTERVAL", "30"))
+
+def restore_guilds() -> GuildGraph:
+    """
+    Un snapshot illisible ne doit pas empêcher le démarrage : il est mis de côté
+    (`<path>.corrupt`), signalé dans le journal de l'app, et le graphe repart vide.
+    """
+    if not GUILD_SNAPSHOT_PATH or not os.path.exists(GUILD_SNAPSHOT_PATH):
+        return GuildGraph()
+    try:
+        return GuildGraph.load(GUILD_SNAPSHOT_PATH)
+    except (ValueError, struct_error) as e:
+        app.logger.error("Snapshot de guildes ignoré (%s) : %s", GUILD_SNAPSHOT_PATH, e)
+        os.replace(GUILD_SNAPSHOT_PATH, GUILD_SNAPSHOT_PATH + ".corrupt")
+        return GuildGraph()
+
+GUILDS = restore_guilds()
+GUILDS_LOCK = threading.Lock()
+GUILDS_LAST_SNAPSHOT = time.monotonic()
+
+# Sketches nommés (heavy hitters) conservés entre les requêtes
+SKETCHES: dict[str, HeavyHitters] = {}
+SKETCHES_LOCK = threading.Lock()
+
+# Registre de cartes (optionnel) : persistées sur disque si MAP_STORAGE_DIR est défini
+MAPS = MapRegistry(os.getenv("MAP_STORAGE_DIR") or None)
+# Cartes compilées (+ index de connexité), par empreinte de contenu
+COMPILED_MAPS = LRUCache(maxsize=16)
+# Flow fields déjà calculés, par (carte, objectif) ; bornés en octets (deux tableaux
+# à la taille de la carte par champ : ~64 Mo pour une carte 2048 x 2048)
+FLOW_FIELDS = LRUCache(maxsize=32, maxbytes=int(os.getenv("FLOW_FIELD_CACHE_BYTES", str(256 << 20))),
+                       sizeof=lambda field: field.nbytes)
+# Pré-calculs HPA* par carte (entrées + distances intra-cluster)
+HIERARCHIES = LRUCache(maxsize=8)
+# Pools de processus préchauffés par carte (requêtes en lot)
+PATH_POOLS = LRUCache(maxsize=2, on_evict=lambda pool: pool.close())
+PATH_POOLS_LOCK = threading.Lock()
+PATH_WORKERS = int(os.getenv("PATH_WORKERS", "0")) or None
 
 # ---------- Utilitaires ----------
 @app.get("/health")
@@ -62,42 +161,472 @@ def ping_db():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ---------- PARTIE A : Modération du chat ----------
+
+@app.post("/chat/scan")
+def chat_scan():
+    """
+    Body JSON attendu:
+    {
+      "messages": ["gg noob", "il a un aimbot"],
+      "patterns": ["noob", "aimbot"],   # optionnel (défaut: BANNED_WORDS)
+      "ignore_case": true                # optionnel (défaut: true)
+    }
+    """
+    try:
+        data = request.get_json(force=True)
+        messages = data["messages"]
+        if not isinstance(messages, list):
+            return jsonify({"message": "Requête invalide.", "error": "messages doit être une liste."}), 400
+        patterns = data.get("patterns")
+        ignore_case = bool(data.get("ignore_case", True))
+
+        if patterns is None and ignore_case:
+            automaton = CHAT_FILTER
+        else:
+            if patterns is None:
+                patterns = BANNED_WORDS
+            if not isinstance(patterns, list):
+                return jsonify({"message": "Requête invalide.", "error": "patterns doit être une liste."}), 400
+            automaton = compiled_chat_filter(tuple(str(p) for p in patterns), ignore_case)
+
+        results = automaton.scan_batch([str(m) for m in messages])
+        return jsonify({
+            "message": "Messages analysés.",
+            "scanned": len(messages),
+            "flagged": sum(1 for hits in results if hits),
+            "results": [
+                {"index": i, "flagged": bool(hits), "matches": hits}
+                for i, hits in enumerate(results)
+            ]
+        }), 200
+    except KeyError as e:
+        return jsonify({"message": "Requête invalide.", "error": f"Champ manquant: {e}"}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (chat/scan).", "error": str(e)}), 500
+
+# ---------- PARTIE B : Classement en direct ----------
+
+def leaderboard_entries(rows):
+    return [{"rank": r, "player": p, "score": s} for r, p, s in rows]
+
+@app.post("/leaderboard/scores")
+def leaderboard_upsert():
+    """
+    Body JSON attendu:
+    {
+      "scores": [["alice", 1200], ["bob", 950]]
+    }
+    ou pour un seul joueur: { "player": "alice", "score": 1200 }
+    """
+    try:
+        data = request.get_json(force=True)
+        if "scores" in data:
+            pairs = data["scores"]
+        else:
+            pairs = [[data["player"], data["score"]]]
+        if not isinstance(pairs, list):
+            return jsonify({"message": "Requête invalide.", "error": "scores doit être une liste."}), 400
+
+        updates = {}
+        for pair in pairs:
+            if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+                return jsonify({"message": "Requête invalide.", "error": "Chaque score doit être [player, score]."}), 400
+            score = float(pair[1])
+            if not math.isfinite(score):
+                return jsonify({"message": "Requête invalide.", "error": f"Score non fini pour {pair[0]!r}."}), 400
+            updates[str(pair[0])] = score
+
+        with LEADERBOARD_LOCK:
+            for player, score in updates.items():
+                LEADERBOARD.upsert(player, score)
+            ranks = {player: LEADERBOARD.rank(player) for player in updates}
+            total = len(LEADERBOARD)
+        return jsonify({
+            "message": "Scores mis à jour.",
+            "updated": len(ranks),
+            "ranks": ranks,
+            "players": total
+        }), 200
+    except KeyError as e:
+        return jsonify({"message": "Requête invalide.", "error": f"Champ manquant: {e}"}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (leaderboard/scores).", "error": str(e)}), 500
+
+@app.delete("/leaderboard/players/<player>")
+def leaderboard_remove(player):
+    try:
+        with LEADERBOARD_LOCK:
+            removed = LEADERBOARD.remove(player)
+        if not removed:
+            return jsonify({"message": "Joueur inconnu.", "player": player}), 404
+        return jsonify({"message": "Joueur retiré du classement.", "player": player}), 200
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (leaderboard/remove).", "error": str(e)}), 500
+
+@app.get("/leaderboard/top")
+def leaderboard_top():
+    """Query string: ?k=10"""
+    try:
+        k = int(request.args.get("k", 10))
+        with LEADERBOARD_LOCK:
+            rows = LEADERBOARD.top(k)
+            total = len(LEADERBOARD)
+        return jsonify({
+            "message": f"Top {k} du classement.",
+            "players": total,
+            "top": leaderboard_entries(rows)
+        }), 200
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (leaderboard/top).", "error": str(e)}), 500
+
+@app.get("/leaderboard/rank/<player>")
+def leaderboard_rank(player):
+    try:
+        with LEADERBOARD_LOCK:
+            rank = LEADERBOARD.rank(player)
+            score = LEADERBOARD.scores.get(player)
+        if rank is None:
+            return jsonify({"message": "Joueur inconnu.", "player": player}), 404
+        return jsonify({"message": "Rang du joueur.", "player": player, "rank": rank, "score": score}), 200
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (leaderboard/rank).", "error": str(e)}), 500
+
+@app.get("/leaderboard/around")
+def leaderboard_around():
+    """Query string: ?rank=100&radius=5  ou  ?player=alice&radius=5"""
+    try:
+        radius = int(request.args.get("radius", 5))
+        with LEADERBOARD_LOCK:
+            player = request.args.get("player")
+            if player is not None:
+                rank = LEADERBOARD.rank(player)
+                if rank is None:
+                    return jsonify({"message": "Joueur inconnu.", "player": player}), 404
+            elif "rank" in request.args:
+                rank = int(request.args["rank"])
+            else:
+                return jsonify({"message": "Requête invalide.", "error": "Paramètre 'rank' ou 'player' requis."}), 400
+            rows = LEADERBOARD.around(rank, radius)
+        return jsonify({
+            "message": "Page du classement.",
+            "rank": rank,
+            "radius": radius,
+            "entries": leaderboard_entries(rows)
+        }), 200
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (leaderboard/around).", "error": str(e)}), 500
+
 # ---------- PARTIE C : Pathfinding ----------
+def compiled_map(grid):
+    """
+    Compile la grille reçue et réutilise la version déjà connue (même contenu)
+    avec son index de connexité : un objectif inaccessible est rejeté en O(1).
+    """
+    cg = as_compiled(grid)
+    key = grid_fingerprint(cg)
+    cached = COMPILED_MAPS.get(key)
+    if cached is not None:
+        return cached, key
+    cg.ensure_connectivity()
+    COMPILED_MAPS.put(key, cg)
+    return cg, key
+
+class UnknownMap(Exception):
+    pass
+
+def resolve_map(data):
+    """Carte du registre si 'map_id' est fourni, sinon la grille JSON 'grid'."""
+    if "map_id" in data:
+        map_id = str(data["map_id"])
+        if map_id not in MAPS.maps:
+            raise UnknownMap(map_id)
+        return MAPS.get(map_id), map_id
+    return compiled_map(data["grid"])
+
+def run_pathfinding(cg, map_key, data):
+    start = tuple(data["start"])
+    goal = tuple(data["goal"])
+    algo = data.get("algorithm", "dijkstra").lower()
+
+    t0 = time.perf_counter()
+    if algo == "astar":
+        dist, path, explored = astar(cg, start, goal)
+        algo_name = "A*"
+    elif algo == "bidijkstra":
+        dist, path, explored = bidirectional(cg, start, goal)
+        algo_name = "Dijkstra bidirectionnel"
+    elif algo == "biastar":
+        dist, path, explored = bidirectional(cg, start, goal, heuristic=True)
+        algo_name = "A* bidirectionnel"
+    elif algo == "jps":
+        dist, path, explored, used_jps = jps(cg, start, goal)
+        algo_name = "JPS" if used_jps else JPS_FALLBACK_LABEL
+    elif algo == "hpa" and not use_hpa(cg):
+        dist, path, explored = astar(cg, start, goal)
+        algo_name = HPA_FALLBACK_LABEL
+    elif algo == "hpa":
+        cluster_size = int(data.get("cluster_size", 16))
+        hpa, _ = get_hierarchy(HIERARCHIES, map_key, cg, cluster_size)
+        dist, path, explored = hpa.find_path(start, goal)
+        algo_name = "HPA*"
+    else:
+        dist, path, explored = dijkstra(cg, start, goal)
+        algo_name = "Dijkstra"
+    elapsed_ms = round((time.perf_counter() - t0) * 1000, 3)
+
+    if dist == float("inf") or not path:
+        return {
+            "message": "Aucun chemin possible sur cette carte.",
+            "algorithm": algo_name,
+            "distance": None,
+            "path_length": 0,
+            "explored_nodes": explored,
+            "elapsed_ms": elapsed_ms
+        }
+
+    return {
+        "message": "Chemin trouvé avec succès.",
+        "algorithm": algo_name,
+        "distance": dist,
+        "path_length": len(path),
+        "explored_nodes": explored,
+        "elapsed_ms": elapsed_ms,
+        "path": path
+    }
+
 @app.post("/pathfinding")
 def pathfinding():
+    """
+    Body JSON attendu:
+    {
+      "grid": [[1, 1], [1, 1]],      # ou "map_id": "..." (carte du registre)
+      "start": [0, 0],
+      "goal": [1, 1],
+      "algorithm": "dijkstra"        # dijkstra | astar | bidijkstra | biastar | jps | hpa
+    }
+    """
+    try:
+        data = request.get_json(force=True)
+        cg, map_key = resolve_map(data)
+        return jsonify(run_pathfinding(cg, map_key, data)), 200
+    except UnknownMap as e:
+        return jsonify({"message": "Carte inconnue.", "map_id": str(e)}), 404
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (pathfinding).", "error": str(e)}), 500
+
+@app.post("/pathfinding/batch")
+def pathfinding_batch():
+    """
+    Body JSON attendu:
+    {
+      "map_id": "...",                       # ou "grid": [[1, 1], [1, 1]]
+      "queries": [
+        {"start": [0, 0], "goal": [1, 1], "algorithm": "astar"},
+        {"start": [1, 0], "goal": [0, 1]}
+      ],
+      "algorithm": "dijkstra",               # algorithme par défaut des requêtes
+      "budget_ms": 50                        # optionnel : budget de latence du lot
+    }
+    Les résultats sont renvoyés dans l'ordre ; une requête non traitée dans
+    le budget a le statut "timeout".
+    """
+    try:
+        data = request.get_json(force=True)
+        cg, map_key = resolve_map(data)
+        default_algo = data.get("algorithm", "dijkstra").lower()
+        queries = []
+        for q in data["queries"]:
+            queries.append((
+                cg.index(tuple(q["start"])),
+                cg.index(tuple(q["goal"])),
+                q.get("algorithm", default_algo).lower(),
+            ))
+        budget = data.get("budget_ms")
+        budget = float(budget) / 1000 if budget is not None else None
+
+        t0 = time.perf_counter()
+        with PATH_POOLS_LOCK:
+            pool, warm = get_path_pool(PATH_POOLS, map_key, cg, PATH_WORKERS)
+        try:
+            raw = pool.run(queries, budget)
+        finally:
+            pool.release()   # un pool évincé entre-temps s'arrête ici
+        elapsed_ms = round((time.perf_counter() - t0) * 1000, 3)
+
+        results = []
+        for item in raw:
+            if item is None:
+                results.append({"status": "timeout"})
+                continue
+            dist, path, explored, algo_name = item
+            if dist == float("inf") or not path:
+                results.append({"status": "no_path", "algorithm": algo_name,
+                                "distance": None, "path_length": 0, "explored_nodes": explored})
+            else:
+                results.append({"status": "ok", "algorithm": algo_name, "distance": dist,
+                                "path_length": len(path), "explored_nodes": explored, "path": path})
+        timed_out = sum(1 for r in results if r["status"] == "timeout")
+        return jsonify({
+            "message": "Lot traité." if not timed_out else "Lot partiellement traité (budget dépassé).",
+            "count": len(results),
+            "timed_out": timed_out,
+            "pool_warm": warm,
+            "map_version": pool.version,
+            "elapsed_ms": elapsed_ms,
+            "results": results
+        }), 200
+    except UnknownMap as e:
+        return jsonify({"message": "Carte inconnue.", "map_id": str(e)}), 404
+    except KeyError as e:
+        return jsonify({"message": "Requête invalide.", "error": f"Champ manquant: {e}"}), 400
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (pathfinding/batch).", "error": str(e)}), 500
+
+# ---------- PARTIE C : Flow field (plusieurs unités, même objectif) ----------
+@app.post("/pathfinding/flowfield")
+def pathfinding_flowfield():
+    """
+    Body JSON attendu:
+    {
+      "grid": [[1, 1, 1], [1, null, 1], [1, 1, 1]],   # ou "map_id": "..."
+      "goal": [2, 2],
+      "starts": [[0, 0], [0, 2], [2, 0]],
+      "include_paths": true   # optionnel
+    }
+    """
     try:
         data = request.get_json(force=True)
-        grid = data["grid"]
-        start = tuple(data["start"])
+        cg, map_key = resolve_map(data)
         goal = tuple(data["goal"])
-        algo = data.get("algorithm", "dijkstra").lower()
+        starts = [tuple(s) for s in data["starts"]]
+        include_paths = bool(data.get("include_paths", True))
 
-        if algo == "astar":
-            dist, path, explored = astar(grid, start, goal)
-            algo_name = "A*"
-        else:
-            dist, path, explored = dijkstra(grid, start, goal)
-            algo_name = "Dijkstra"
-
-        if dist == float("inf") or not path:
-            return jsonify({
-                "message": "Aucun chemin possible sur cette carte.",
-                "algorithm": algo_name,
-                "distance": None,
-                "path_length": 0,
-                "explored_nodes": explored
-            }), 200
+        field, cached = get_flow_field(FLOW_FIELDS, map_key, cg, goal)
+        results = []
+        for start in starts:
+            dist = field.distance(start)
+            if dist == float("inf"):
+                results.append({"start": start, "distance": None, "path_length": 0})
+                continue
+            entry = {"start": start, "distance": dist}
+            if include_paths:
+                path = field.path_from(start)
+                entry["path_length"] = len(path)
+                entry["path"] = path
+            results.append(entry)
 
         return jsonify({
-            "message": "Chemin trouvé avec succès.",
-            "algorithm": algo_name,
-            "distance": dist,
-            "path_length": len(path),
-            "explored_nodes": explored,
-            "path": path
+            "message": "Champ de flux calculé." if not cached else "Champ de flux réutilisé (cache).",
+            "goal": goal,
+            "cached": cached,
+            "explored_nodes": field.explored,
+            "results": results
         }), 200
+    except UnknownMap as e:
+        return jsonify({"message": "Carte inconnue.", "map_id": str(e)}), 404
+    except KeyError as e:
+        return jsonify({"message": "Requête invalide.", "error": f"Champ manquant: {e}"}), 400
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
     except Exception as e:
-        return jsonify({"message": "Erreur interne (pathfinding).", "error": str(e)}), 500
+        return jsonify({"message": "Erreur interne (pathfinding/flowfield).", "error": str(e)}), 500
+
+# ---------- PARTIE C : Registre de cartes ----------
+def map_info(map_id, cg):
+    return {"map_id": map_id, "rows": cg.rows, "cols": cg.cols, "version": cg.version}
+
+@app.post("/maps")
+def maps_upload():
+    """
+    Deux modes:
+    1) JSON: { "grid": [[1, 1, null], [1, 2, 1]] }
+    2) binaire (Content-Type: application/octet-stream) : format CompiledGrid.to_bytes
+    """
+    try:
+        if request.mimetype == "application/octet-stream":
+            cg = CompiledGrid.from_bytes(request.get_data())
+        else:
+            data = request.get_json(force=True)
+            cg = as_compiled(data["grid"])
+        map_id = MAPS.create(cg)
+        return jsonify({"message": "Carte enregistrée.", **map_info(map_id, cg)}), 201
+    except KeyError as e:
+        return jsonify({"message": "Requête invalide.", "error": f"Champ manquant: {e}"}), 400
+    except (ValueError, struct_error) as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (maps).", "error": str(e)}), 500
+
+@app.get("/maps/<map_id>")
+def maps_get(map_id):
+    """?format=binary pour récupérer la carte au format compact."""
+    if map_id not in MAPS.maps:
+        return jsonify({"message": "Carte inconnue.", "map_id": map_id}), 404
+    cg = MAPS.get(map_id)
+    if request.args.get("format") == "binary":
+        return Response(cg.to_bytes(), mimetype="application/octet-stream")
+    return jsonify({"message": "Carte trouvée.", **map_info(map_id, cg)}), 200
+
+@app.patch("/maps/<map_id>/cells")
+def maps_patch(map_id):
+    """
+    JSON attendu:
+    {
+      "cells": [[0, 2, 5], [1, 1, null]]   # [ligne, colonne, coût | null (mur)]
+    }
+    """
+    try:
+        if map_id not in MAPS.maps:
+            return jsonify({"message": "Carte inconnue.", "map_id": map_id}), 404
+        data = request.get_json(force=True)
+        changes = []
+        for item in data["cells"]:
+            if not isinstance(item, (list, tuple)) or len(item) != 3:
+                return jsonify({"message": "Requête invalide.", "error": "Chaque cellule doit être [row, col, cost|null]."}), 400
+            r, c, value = item
+            changes.append(((int(r), int(c)), None if value is None else float(value)))
+        cg = MAPS.patch(map_id, changes)
+        # les flow fields sont indexés par version ; les HPA* basculent sur la
+        # nouvelle grille en ne recalculant que les clusters touchés
+        cells = [cell for cell, _ in changes]
+        for (key, _), hpa in HIERARCHIES.items():
+            if key == map_id:
+                hpa.sync(cg, cells)
+        return jsonify({"message": "Carte modifiée.", "patched": len(changes), **map_info(map_id, cg)}), 200
+    except KeyError as e:
+        return jsonify({"message": "Requête invalide.", "error": f"Champ manquant: {e}"}), 400
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (maps/patch).", "error": str(e)}), 500
+
+@app.post("/maps/<map_id>/path")
+def maps_path(map_id):
+    """JSON attendu: { "start": [0, 0], "goal": [5, 5], "algorithm": "astar" }"""
+    try:
+        if map_id not in MAPS.maps:
+            return jsonify({"message": "Carte inconnue.", "map_id": map_id}), 404
+        data = request.get_json(force=True)
+        return jsonify({"map_id": map_id, **run_pathfinding(MAPS.get(map_id), map_id, data)}), 200
+    except KeyError as e:
+        return jsonify({"message": "Requête invalide.", "error": f"Champ manquant: {e}"}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (maps/path).", "error": str(e)}), 500
+
+@app.delete("/maps/<map_id>")
+def maps_delete(map_id):
+    if not MAPS.delete(map_id):
+        return jsonify({"message": "Carte inconnue.", "map_id": map_id}), 404
+    return jsonify({"message": "Carte supprimée.", "map_id": map_id}), 200
 
 # ---------- PARTIE C : Détection de cycle ----------
 @app.post("/guilds/cycle")
@@ -114,32 +643,155 @@ def guilds_cycle():
     except Exception as e:
         return jsonify({"message": "Erreur interne (guilds/cycle).", "error": str(e)}), 500
 
+def snapshot_guilds(force: bool = False) -> bool:
+    """Écrit le snapshot des guildes (au plus toutes les GUILD_SNAPSHOT_INTERVAL s). Appelé sous GUILDS_LOCK."""
+    global GUILDS_LAST_SNAPSHOT
+    if not GUILD_SNAPSHOT_PATH:
+        return False
+    now = time.monotonic()
+    if not force and now - GUILDS_LAST_SNAPSHOT < GUILD_SNAPSHOT_INTERVAL:
+        return False
+    GUILDS.save(GUILD_SNAPSHOT_PATH)
+    GUILDS_LAST_SNAPSHOT = now
+    return True
+
+@app.post("/guilds/merges")
+def guilds_merges():
+    """
+    Body JSON attendu:
+    {
+      "merges": [["g1", "g2"], ["g2", "g3"], ["g3", "g1"]]
+    }
+    Chaque fusion renvoie true si elle relie deux guildes distinctes,
+    false si elle ferme un cycle.
+    """
+    try:
+        data = request.get_json(force=True)
+        merges = []
+        for m in data["merges"]:
+            if not isinstance(m, (list, tuple)) or len(m) != 2:
+                return jsonify({"message": "Requête invalide.", "error": "Chaque fusion doit être [guilde_a, guilde_b]."}), 400
+            merges.append((m[0], m[1]))
+        with GUILDS_LOCK:
+            merged = GUILDS.merge_batch(merges)
+            stats = GUILDS.stats()
+            saved = snapshot_guilds()
+        return jsonify({
+            "message": "Fusions appliquées.",
+            "merged": merged,
+            "cycles_in_batch": merged.count(False),
+            "snapshot_saved": saved,
+            "stats": stats
+        }), 200
+    except KeyError as e:
+        return jsonify({"message": "Requête invalide.", "error": f"Champ manquant: {e}"}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (guilds/merges).", "error": str(e)}), 500
+
+@app.get("/guilds/same")
+def guilds_same():
+    """?a=g1&b=g2 : même guilde ? et la fusion fermerait-elle un cycle ?"""
+    a, b = request.args.get("a"), request.args.get("b")
+    if a is None or b is None:
+        return jsonify({"message": "Requête invalide.", "error": "Paramètres a et b requis."}), 400
+    with GUILDS_LOCK:
+        same = GUILDS.same_guild(a, b)
+    return jsonify({"a": a, "b": b, "same_guild": same, "merge_would_cycle": same}), 200
+
+@app.get("/guilds/<guild>")
+def guilds_info(guild):
+    with GUILDS_LOCK:
+        known = str(guild) in GUILDS.index
+        size = GUILDS.component_size(guild)
+        cyclic = GUILDS.has_cycle(guild)
+    return jsonify({"guild": guild, "known": known, "component_size": size, "has_cycle": cyclic}), 200
+
+@app.get("/guilds/stats")
+def guilds_stats():
+    with GUILDS_LOCK:
+        return jsonify(GUILDS.stats()), 200
+
+@app.post("/guilds/snapshot")
+def guilds_snapshot():
+    if not GUILD_SNAPSHOT_PATH:
+        return jsonify({"message": "GUILD_SNAPSHOT_PATH non configuré."}), 400
+    try:
+        with GUILDS_LOCK:
+            snapshot_guilds(force=True)
+            stats = GUILDS.stats()
+        return jsonify({"message": "Snapshot écrit.", "path": GUILD_SNAPSHOT_PATH, "stats": stats}), 200
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (guilds/snapshot).", "error": str(e)}), 500
+
 # ---------- PARTIE D : Reservoir Sampling ----------
 
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+def weighted_pair(value):
+    """[élément, poids] ou {"item": ..., "weight": ...} -> (élément, poids)."""
+    if isinstance(value, dict):
+        return value["item"], float(value["weight"])
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return value[0], float(value[1])
+    raise ValueError("Élément pondéré attendu : [élément, poids] ou {\"item\", \"weight\"}.")
+
 @app.post("/reservoir")
 def reservoir_route():
     """
-    Body JSON attendu:
+    Deux modes:
+    1) JSON:
     {
       "stream": [ .. liste de valeurs .. ],
       "k": 3,
-      "seed": 42   # optionnel (entier)
+      "seed": 42,        # optionnel (entier)
+      "weighted": false  # optionnel : stream = [[élément, poids], ...]
     }
+    2) NDJSON (Content-Type: application/x-ndjson, corps éventuellement chunked):
+       une valeur JSON par ligne, paramètres en query string
+       (?k=3&seed=42&weighted=1). Le corps est lu ligne par ligne :
+       mémoire O(k) quelle que soit la longueur du flux.
     """
     try:
-        data = request.get_json(force=True)
-        stream = data["stream"]
-        k = int(data["k"])
-        seed = data.get("seed", None)
-        sample = reservoir_sampling(stream, k, seed)
+        if request.mimetype in NDJSON_MIMETYPES:
+            if "k" not in request.args:
+                return jsonify({"message": "Requête invalide.", "error": "Paramètre k requis."}), 400
+            k = int(request.args["k"])
+            seed = request.args.get("seed", None)
+            seed = int(seed) if seed is not None else None
+            weighted = request.args.get("weighted", "0").lower() in ("1", "true", "yes")
+            sampler = WeightedReservoirSampler(k, seed) if weighted else ReservoirSampler(k, seed)
+            for line in request.stream:
+                line = line.strip()
+                if not line:
+                    continue
+                value = json.loads(line)
+                if weighted:
+                    sampler.add(*weighted_pair(value))
+                else:
+                    sampler.add(value)
+            n, sample = sampler.n, sampler.sample
+        else:
+            data = request.get_json(force=True)
+            stream = data["stream"]
+            k = int(data["k"])
+            seed = data.get("seed", None)
+            weighted = bool(data.get("weighted", False))
+            if weighted:
+                sample = weighted_reservoir_sampling((weighted_pair(v) for v in stream), k, seed)
+            else:
+                sample = reservoir_sampling(stream, k, seed)
+            n = len(stream)
         return jsonify({
             "message": "Échantillon généré.",
-            "n": len(stream),
+            "n": n,
             "k": k,
+            "weighted": weighted,
             "sample": sample
         }), 200
     except KeyError as e:
         return jsonify({"message": "Requête invalide.", "error": f"Champ manquant: {e}"}), 400
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
     except Exception as e:
         return jsonify({"message": "Erreur interne (reservoir).", "error": str(e)}), 500
 
@@ -154,34 +806,39 @@ def cms_route():
       "depth": 5,
       "width": 200,
       "adds": [["pikachu", 3], ["bulbasaur", 1], ["pikachu", 2]],
-      "queries": ["pikachu", "mew"]
+      "queries": ["pikachu", "mew"],
+      "conservative": false   # optionnel : mise à jour conservatrice
     }
 
     - Crée un CMS en mémoire (stateless par requête),
-      applique les 'adds', puis renvoie les estimations pour 'queries'.
+      applique les 'adds' en un seul lot, puis renvoie les estimations pour 'queries'.
     """
     try:
         data = request.get_json(force=True)
         depth = int(data.get("depth", 5))
         width = int(data.get("width", 200))
+        conservative = bool(data.get("conservative", False))
         adds = data.get("adds", [])         # liste de [key, count]
         queries = data.get("queries", [])   # liste de clés
 
-        cms = CountMinSketch(depth, width)
+        cms = CountMinSketch(depth, width, conservative=conservative)
+        keys, counts = [], []
         for pair in adds:
             if not isinstance(pair, (list, tuple)) or len(pair) != 2:
                 return jsonify({"message": "Requete invalide.", "error": "Chaque 'adds' doit être [key, count]."}), 400
             key, count = pair
-            cms.add(str(key), int(count))
+            keys.append(str(key))
+            counts.append(int(count))
+        cms.add_many(keys, counts)
 
-        estimates = {}
-        for q in queries:
-            estimates[str(q)] = cms.estimate(str(q))
+        query_keys = [str(q) for q in queries]
+        estimates = dict(zip(query_keys, cms.estimate_many(query_keys).tolist()))
 
         return jsonify({
             "message": "Estimations CMS calculées.",
             "depth": depth,
             "width": width,
+            "conservative": conservative,
             "added": len(adds),
             "estimated": estimates
         }), 200
@@ -189,6 +846,155 @@ def cms_route():
         return jsonify({"message": "Erreur interne (cms).", "error": str(e)}), 500
 
 
+# ---------- PARTIE D : Heavy hitters (sketches persistants) ----------
+
+def sketch_info(name, hh):
+    return {
+        "name": name, "depth": hh.depth, "width": hh.width, "capacity": hh.capacity,
+        "window_seconds": hh.window_seconds, "buckets": hh.buckets, "decay": hh.decay,
+        "conservative": hh.conservative, "total": hh.total,
+    }
+
+@app.put("/sketches/<name>")
+def sketches_create(name):
+    """
+    Body JSON (tout est optionnel):
+    {
+      "depth": 5, "width": 2000, "capacity": 100,
+      "window_seconds": 3600, "buckets": 12,   # fenêtre glissante d'1 h par tranches de 5 min
+      "decay": 0.5,                            # ou décroissance exponentielle par tranche
+      "conservative": false
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        window = data.get("window_seconds")
+        decay = data.get("decay")
+        hh = HeavyHitters(
+            depth=int(data.get("depth", 5)),
+            width=int(data.get("width", 2000)),
+            capacity=int(data.get("capacity", 100)),
+            window_seconds=float(window) if window is not None else None,
+            buckets=int(data.get("buckets", 1)),
+            decay=float(decay) if decay is not None else None,
+            conservative=bool(data.get("conservative", False)),
+        )
+        with SKETCHES_LOCK:
+            SKETCHES[name] = hh
+        return jsonify({"message": "Sketch créé.", **sketch_info(name, hh)}), 201
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (sketches).", "error": str(e)}), 500
+
+@app.post("/sketches/<name>/events")
+def sketches_ingest(name):
+    """
+    Body JSON attendu:
+    {
+      "events": ["pikachu", "mew", ["pikachu", 3]]   # clé seule (compte 1) ou [clé, compte]
+    }
+    Le sketch est créé avec les paramètres par défaut s'il n'existe pas.
+    """
+    try:
+        data = request.get_json(force=True)
+        keys, counts = [], []
+        for ev in data["events"]:
+            if isinstance(ev, (list, tuple)):
+                if len(ev) != 2:
+                    return jsonify({"message": "Requête invalide.", "error": "Chaque événement doit être une clé ou [clé, compte]."}), 400
+                keys.append(str(ev[0]))
+                counts.append(int(ev[1]))
+            else:
+                keys.append(str(ev))
+                counts.append(1)
+        with SKETCHES_LOCK:
+            hh = SKETCHES.get(name)
+            if hh is None:
+                hh = SKETCHES[name] = HeavyHitters()
+            hh.add_many(keys, counts)
+            info = sketch_info(name, hh)
+        return jsonify({"message": "Événements ajoutés.", "added": len(keys), **info}), 200
+    except KeyError as e:
+        return jsonify({"message": "Requête invalide.", "error": f"Champ manquant: {e}"}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (sketches/events).", "error": str(e)}), 500
+
+@app.get("/sketches/<name>/top")
+def sketches_top(name):
+    """Query string: ?k=10"""
+    try:
+        k = int(request.args.get("k", 10))
+        with SKETCHES_LOCK:
+            hh = SKETCHES.get(name)
+            if hh is None:
+                return jsonify({"message": "Sketch inconnu.", "name": name}), 404
+            top = hh.top(k)
+        return jsonify({"name": name, "k": k, "top": [{"key": key, "estimate": v} for key, v in top]}), 200
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (sketches/top).", "error": str(e)}), 500
+
+@app.get("/sketches/<name>/estimate")
+def sketches_estimate(name):
+    """?key=pikachu&key=mew"""
+    keys = request.args.getlist("key")
+    with SKETCHES_LOCK:
+        hh = SKETCHES.get(name)
+        if hh is None:
+            return jsonify({"message": "Sketch inconnu.", "name": name}), 404
+        values = hh.estimate_many(keys).tolist() if keys else []
+    return jsonify({"name": name, "estimated": dict(zip(keys, values))}), 200
+
+@app.get("/sketches/<name>/snapshot")
+def sketches_snapshot(name):
+    with SKETCHES_LOCK:
+        hh = SKETCHES.get(name)
+        if hh is None:
+            return jsonify({"message": "Sketch inconnu.", "name": name}), 404
+        data = hh.to_bytes()
+    return Response(data, mimetype="application/octet-stream")
+
+@app.put("/sketches/<name>/snapshot")
+def sketches_restore(name):
+    """Corps binaire (application/octet-stream) : snapshot produit par GET .../snapshot."""
+    try:
+        hh = HeavyHitters.from_bytes(request.get_data())
+        with SKETCHES_LOCK:
+            SKETCHES[name] = hh
+        return jsonify({"message": "Sketch restauré.", **sketch_info(name, hh)}), 200
+    except (ValueError, KeyError, OSError) as e:
+        return jsonify({"message": "Snapshot invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (sketches/snapshot).", "error": str(e)}), 500
+
+@app.post("/sketches/<name>/merge")
+def sketches_merge(name):
+    """Corps binaire : snapshot d'un sketch construit ailleurs (autre worker), fusionné dans <name>."""
+    try:
+        other = HeavyHitters.from_bytes(request.get_data())
+        with SKETCHES_LOCK:
+            hh = SKETCHES.get(name)
+            if hh is None:
+                return jsonify({"message": "Sketch inconnu.", "name": name}), 404
+            hh.merge(other)
+            info = sketch_info(name, hh)
+        return jsonify({"message": "Sketches fusionnés.", **info}), 200
+    except (ValueError, KeyError, OSError) as e:
+        return jsonify({"message": "Fusion impossible.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (sketches/merge).", "error": str(e)}), 500
+
+@app.delete("/sketches/<name>")
+def sketches_delete(name):
+    with SKETCHES_LOCK:
+        hh = SKETCHES.pop(name, None)
+    if hh is None:
+        return jsonify({"message": "Sketch inconnu.", "name": name}), 404
+    return jsonify({"message": "Sketch supprimé.", "name": name}), 200
+
+
 # ---------- E1 : SHA-256 (texte ou fichier) ----------
 
 @app.post("/sha256")
@@ -197,9 +1003,24 @@ def sha256_route():
     Deux modes:
     1) JSON: { "text": "bonjour", "salt": "pepper" }
     2) multipart/form-data: file=@monfichier.bin ; (salt optionnel)
+       + store=1 : le fichier est aussi rangé dans le stockage dédupliqué (/blobs)
+       + mode=merkle : arbre de Merkle par morceaux (pas de limite de taille,
+         le fichier est reçu sur disque) ; chunk_size (octets) et
+         expected_chunks (liste JSON de hash) optionnels.
     """
     try:
         # multipart (fichier) ?
+        if "file" in request.files and request.form.get("mode") == "merkle":
+            chunk_size = int(request.form.get("chunk_size", MERKLE_CHUNK_SIZE))
+            expected = json.loads(request.form["expected_chunks"]) if "expected_chunks" in request.form else None
+            if expected is not None and not isinstance(expected, list):
+                return jsonify({"message": "Requête invalide.", "error": "expected_chunks doit être une liste de hash."}), 400
+            result = merkle_file(request.files["file"].stream, chunk_size)
+            payload = {"message": "Arbre de Merkle calculé (fichier).", **result}
+            if expected is not None:
+                payload["corrupted_chunks"] = corrupted_chunks(result, expected)
+            return jsonify(payload), 200
+
         if "file" in request.files:
             fileobj = request.files["file"]
             salt = request.form.get("salt", "")
@@ -207,10 +1028,13 @@ def sha256_route():
             if request.content_length and request.content_length > 5 * 1024 * 1024:
                 return jsonify({"message": "Fichier trop volumineux (max 5 Mo)."}), 413
             hexa = sha256_file(fileobj, salt)
-            return jsonify({
+            payload = {
                 "message": "Empreinte SHA-256 calculée (fichier).",
                 "hash": hexa
-            }), 200
+            }
+            if request.form.get("store", "").lower() in ("1", "true", "yes"):
+                payload["blob"] = blob_store().put(fileobj.stream)
+            return jsonify(payload), 200
 
         # JSON (texte)
         data = request.get_json(force=True)
@@ -224,12 +1048,151 @@ def sha256_route():
             "hash": hexa
         }), 200
 
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
     except Exception as e:
         return jsonify({"message": "Erreur interne (sha256).", "error": str(e)}), 500
 
 
+
+@app.post("/sha256/batch")
+def sha256_batch_route():
+    """
+    multipart/form-data : files=@a.pak files=@b.replay ... (champ répété)
+    - chunk_size (optionnel, octets, défaut 1 Mio)
+    - expected (optionnel) : JSON {"a.pak": ["<hash morceau 0>", ...]} pour
+      signaler les morceaux corrompus à re-télécharger.
+    Les parties du corps sont écrites sur disque pendant la réception (pas de
+    limite de taille), puis tous les morceaux de tous les fichiers sont hachés
+    dans un même pool de threads.
+    """
+    try:
+        files = request.files.getlist("files")
+        if not files:
+            return jsonify({"message": "Requête invalide.", "error": "Au moins un champ 'files' requis."}), 400
+        chunk_size = int(request.form.get("chunk_size", MERKLE_CHUNK_SIZE))
+        expected = json.loads(request.form["expected"]) if "expected" in request.form else {}
+        if not isinstance(expected, dict) or not all(isinstance(v, list) for v in expected.values()):
+            return jsonify({"message": "Requête invalide.", "error": "expected doit être un objet {fichier: [hash, ...]}."}), 400
+
+        t0 = time.perf_counter()
+        results = merkle_many([f.stream for f in files], chunk_size)
+        elapsed_ms = round((time.perf_counter() - t0) * 1000, 3)
+
+        out = []
+        for f, result in zip(files, results):
+            item = {"filename": f.filename, **result}
+            if f.filename in expected:
+                item["corrupted_chunks"] = corrupted_chunks(result, expected[f.filename])
+            out.append(item)
+        return jsonify({
+            "message": "Arbres de Merkle calculés.",
+            "count": len(out),
+            "elapsed_ms": elapsed_ms,
+            "files": out
+        }), 200
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (sha256/batch).", "error": str(e)}), 500
+
+
+# ---------- E4 : Stockage dédupliqué par contenu ----------
+
+def valid_digest(digest: str) -> bool:
+    return len(digest) == 64 and all(c in "0123456789abcdef" for c in digest)
+
+@app.post("/blobs")
+def blobs_put():
+    """
+    multipart/form-data: file=@replay.bin
+    Contenu déjà connu : 200 + référence existante (rien n'est réécrit) ; sinon 201.
+    """
+    try:
+        if "file" not in request.files:
+            return jsonify({"message": "Requête invalide.", "error": "Champ 'file' requis."}), 400
+        result = blob_store().put(request.files["file"].stream)
+        message = "Contenu déjà stocké (référence ajoutée)." if result["deduplicated"] else "Contenu stocké."
+        return jsonify({"message": message, **result}), 200 if result["deduplicated"] else 201
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (blobs).", "error": str(e)}), 500
+
+@app.get("/blobs/<digest>")
+def blobs_get(digest):
+    """Contenu brut ; les gros blobs sont envoyés en flux depuis le disque."""
+    if not valid_digest(digest):
+        return jsonify({"message": "Empreinte invalide.", "digest": digest}), 400
+    try:
+        f = blob_store().open(digest)
+        if f is None:
+            return jsonify({"message": "Blob inconnu.", "digest": digest}), 404
+        return send_file(f, mimetype="application/octet-stream", download_name=digest,
+                         etag=digest, conditional=True)
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (blobs/get).", "error": str(e)}), 500
+
+@app.get("/blobs/<digest>/info")
+def blobs_info(digest):
+    if not valid_digest(digest):
+        return jsonify({"message": "Empreinte invalide.", "digest": digest}), 400
+    try:
+        info = blob_store().info(digest)
+        if info is None:
+            return jsonify({"message": "Blob inconnu.", "digest": digest}), 404
+        return jsonify(info), 200
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (blobs/info).", "error": str(e)}), 500
+
+@app.delete("/blobs/<digest>")
+def blobs_release(digest):
+    """Retire une référence ; le fichier disparaît au prochain POST /blobs/gc s'il n'en a plus."""
+    if not valid_digest(digest):
+        return jsonify({"message": "Empreinte invalide.", "digest": digest}), 400
+    try:
+        refs = blob_store().release(digest)
+        if refs is None:
+            return jsonify({"message": "Blob inconnu.", "digest": digest}), 404
+        return jsonify({"message": "Référence retirée.", "digest": digest, "refs": refs}), 200
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (blobs/release).", "error": str(e)}), 500
+
+@app.post("/blobs/gc")
+def blobs_gc():
+    try:
+        return jsonify({"message": "Nettoyage effectué.", **blob_store().gc()}), 200
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (blobs/gc).", "error": str(e)}), 500
+
+@app.get("/blobs/stats")
+def blobs_stats():
+    try:
+        return jsonify(blob_store().summary()), 200
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (blobs/stats).", "error": str(e)}), 500
+
 # ---------- E2 : Bloom Filter (global en mémoire) ----------
 
+def bloom_info():
+    # O(1) : le taux de remplissage / faux positifs est servi par /bloom/stats
+    return {
+        "m": BLOOM.m,
+        "k": BLOOM.k,
+        "layers": len(BLOOM.layers) if isinstance(BLOOM, ScalableBloomFilter) else 1,
+        "count": BLOOM.count,
+    }
+
+@app.get("/bloom/stats")
+def bloom_stats_route():
+    try:
+        layers = BLOOM.layers if isinstance(BLOOM, ScalableBloomFilter) else [BLOOM]
+        return jsonify({
+            **bloom_info(),
+            "fill_ratio": [layer.fill_ratio() for layer in layers],
+            "estimated_fpr": BLOOM.estimated_fpr(),
+        }), 200
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (bloom/stats).", "error": str(e)}), 500
+
 @app.post("/bloom/add")
 def bloom_add_route():
     """
@@ -237,31 +1200,37 @@ def bloom_add_route():
     {
       "items": ["pikachu", "bulbasaur"],
       "reset": false,      # optionnel: True pour réinitialiser
-      "m": 4096,           # optionnel: redimensionner (si reset=true)
-      "k": 5               # optionnel: changer nb de hash (si reset=true)
+      "capacity": 10000,   # optionnel (si reset=true): filtre extensible dimensionné
+      "fpr": 0.001,        #   pour ce nombre d'éléments et ce taux de faux positifs
+      "m": 4096,           # optionnel (si reset=true): filtre fixe de m bits...
+      "k": 5               # ...et k fonctions de hachage
     }
+    Filtre partagé (BLOOM_PATH) : reset vide le fichier, ses dimensions restent celles du fichier.
     """
     try:
         data = request.get_json(force=True)
         items = data.get("items", [])
         reset = bool(data.get("reset", False))
 
-        global BLOOM
-        # reset demandé ?
-        if reset:
-            m = int(data.get("m", 2048))
-            k = int(data.get("k", 4))
-            BLOOM = BloomFilter(m=m, k=k)
-
         if not isinstance(items, list):
             return jsonify({"message": "Requête invalide.", "error": "items doit être une liste."}), 400
 
-        BLOOM.add_many(items)
+        global BLOOM
+        with BLOOM_LOCK:
+            # reset demandé ?
+            if reset:
+                if isinstance(BLOOM, MappedBloomFilter):
+                    BLOOM.clear()
+                elif "m" in data or "k" in data:
+                    BLOOM = BloomFilter(m=int(data.get("m", 2048)), k=int(data.get("k", 4)))
+                else:
+                    BLOOM = ScalableBloomFilter(initial_capacity=int(data.get("capacity", BLOOM_CAPACITY)),
+                                                fpr=float(data.get("fpr", BLOOM_FPR)))
+            BLOOM.add_many(items)
         return jsonify({
             "message": "Éléments ajoutés au filtre de Bloom.",
             "added": items,
-            "m": BLOOM.m,
-            "k": BLOOM.k
+            **bloom_info()
         }), 200
 
     except Exception as e:
@@ -287,8 +1256,7 @@ def bloom_check_route():
         return jsonify({
             "message": "Vérification effectuée (présence probable).",
             "present": present,
-            "m": BLOOM.m,
-            "k": BLOOM.k
+            **bloom_info()
         }), 200
 
     except Exception as e:
@@ -296,6 +1264,90 @@ def bloom_check_route():
 
 
 
+
+# ---------- E3 : Liste de bannis (filtre coucou) ----------
+
+def bans_info():
+    return {"count": BANS.count, "capacity": BANS.capacity, "load_factor": round(BANS.load_factor(), 4)}
+
+def bans_items():
+    data = request.get_json(force=True)
+    items = data.get("items", [])
+    if not isinstance(items, list):
+        raise ValueError("items doit être une liste.")
+    return [str(x) for x in items]
+
+@app.post("/bans/add")
+def bans_add_route():
+    """
+    JSON attendu: { "items": ["player42", "player77"] }
+    Idempotent : un joueur déjà dans BANNED_IDS n'est pas inséré une seconde
+    fois. La décision ne dépend pas du filtre (un faux positif empêcherait le ban).
+    """
+    try:
+        items = bans_items()
+        with BANS_LOCK:
+            unique = list(dict.fromkeys(items))
+            fresh = [x for x in unique if x not in BANNED_IDS]
+            added = BANS.add_many(fresh)
+            BANNED_IDS.update(x for x, ok in zip(fresh, added) if ok)
+            info = bans_info()
+        rejected = [x for x, ok in zip(fresh, added) if not ok]
+        return jsonify({
+            "message": "Bans ajoutés." if not rejected else "Filtre plein : certains bans n'ont pas été ajoutés.",
+            "added": len(fresh) - len(rejected),
+            "already_banned": [x for x in unique if x not in fresh],
+            "rejected": rejected,
+            **info
+        }), 200 if not rejected else 507
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (bans/add).", "error": str(e)}), 500
+
+@app.post("/bans/remove")
+def bans_remove_route():
+    """
+    JSON attendu: { "items": ["player42"] }
+    Seuls les ids de BANNED_IDS sont retirés du filtre : un id jamais banni dont
+    l'empreinte coïncide avec celle d'un banni ne lève pas le ban de ce dernier.
+    """
+    try:
+        items = list(dict.fromkeys(bans_items()))
+        with BANS_LOCK:
+            banned = [x for x in items if x in BANNED_IDS]
+            removed = dict(zip(banned, BANS.delete_many(banned)))
+            BANNED_IDS.difference_update(banned)
+            info = bans_info()
+        return jsonify({
+            "message": "Bans levés.",
+            "removed": {x: removed.get(x, False) for x in items},
+            "not_banned": [x for x in items if x not in removed],
+            **info
+        }), 200
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (bans/remove).", "error": str(e)}), 500
+
+@app.post("/bans/check")
+def bans_check_route():
+    """JSON attendu: { "items": ["player42", "player1"] }"""
+    try:
+        items = bans_items()
+        with BANS_LOCK:
+            present = BANS.check_many(items)
+            info = bans_info()
+        return jsonify({
+            "message": "Vérification effectuée (présence probable).",
+            "present": dict(zip(items, present)),
+            **info
+        }), 200
+    except ValueError as e:
+        return jsonify({"message": "Requête invalide.", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erreur interne (bans/check).", "error": str(e)}), 500
+
 # ---------- Lancement unique ----------
 if __name__ == "__main__":
     host = os.getenv("HOST", "127.0.0.1")        # docker-compose mettra HOST=0.0.0.0
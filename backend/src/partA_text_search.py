@@ -1,3 +1,12 @@
+import mmap
+import os
+import sys
+from array import array
+from collections import deque
+
+import numpy as np
+
+
 def build_lps(pattern: str) -> list[int]:
     lps = [0] * len(pattern)
     length = 0
@@ -7,10 +16,10 @@ def build_lps(pattern: str) -> list[int]:
             length += 1
             lps[i] = length
             i += 1
+        elif length:
+            length = lps[length - 1]
         else:
-            length = lps[length - 1] if length else 0
-            if not length:
-                i += 1
+            i += 1
     return lps
 
 
@@ -27,10 +36,10 @@ def find_all_occurrences(text: str, pattern: str) -> list[int]:
             if j == len(pattern):
                 res.append(i - j)
                 j = lps[j - 1]
+        elif j:
+            j = lps[j - 1]
         else:
-            j = lps[j - 1] if j else 0
-            if not j:
-                i += 1
+            i += 1
     return res
 
 
@@ -67,6 +76,433 @@ def rabin_karp_multi(text: str, patterns: list[str], base=257, mod=10**9+7):
     return res
 
 
+# ---------- A3 — Aho–Corasick (modération multi-motifs) ----------
+
+class AhoCorasick:
+    """
+    Automate d'Aho–Corasick compilé une fois pour tout un dictionnaire de motifs.
+
+    Les transitions sont stockées dans un tableau plat `delta[etat * A + col]`
+    (A = taille de l'alphabet des motifs) : le scan est une seule passe linéaire
+    sur le texte, sans remonter les liens d'échec.
+    - ignore_case: les variantes majuscule/minuscule partagent la même colonne
+      (les positions renvoyées restent celles du texte d'origine).
+    """
+
+    def __init__(self, patterns: list[str], ignore_case: bool = False):
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+        self.ignore_case = ignore_case
+
+        # alphabet : caractère -> colonne
+        self.alpha: dict[str, int] = {}
+        for p in self.patterns:
+            for ch in (p.lower() if ignore_case else p):
+                if ch not in self.alpha:
+                    self.alpha[ch] = len(self.alpha)
+        if ignore_case:
+            for ch, col in list(self.alpha.items()):
+                up = ch.upper()
+                if len(up) == 1 and up not in self.alpha:
+                    self.alpha[up] = col
+        width = len(set(self.alpha.values()))
+        self.width = width
+
+        # 1) trie (transitions creuses, temporaires)
+        # avec ignore_case, « Noob » et « noob » finissent dans le même état :
+        # chaque état terminal renvoie vers la liste de ses motifs (self.groups)
+        trie: list[dict[int, int]] = [{}]
+        term = [-1]
+        self.groups: list[list[str]] = []
+        for p in self.patterns:
+            s = 0
+            for ch in (p.lower() if ignore_case else p):
+                col = self.alpha[ch]
+                nxt = trie[s].get(col)
+                if nxt is None:
+                    nxt = len(trie)
+                    trie[s][col] = nxt
+                    trie.append({})
+                    term.append(-1)
+                s = nxt
+            if term[s] < 0:
+                term[s] = len(self.groups)
+                self.groups.append([])
+            self.groups[term[s]].append(p)
+
+        # 2) BFS : liens d'échec, liens de sortie et table de transitions pleine
+        n = len(trie)
+        self.delta = array("i", [0]) * (n * width)
+        self.fail = array("i", [0]) * n
+        self.out_link = array("i", [-1]) * n   # prochain état terminal via les échecs
+        self.term = array("i", term)
+        self.depth = array("i", [0]) * n
+
+        queue = deque()
+        for col in range(width):
+            nxt = trie[0].get(col)
+            if nxt is not None:
+                self.delta[col] = nxt
+                self.depth[nxt] = 1
+                queue.append(nxt)
+        while queue:
+            s = queue.popleft()
+            f = self.fail[s]
+            self.out_link[s] = f if self.term[f] >= 0 else self.out_link[f]
+            base_s, base_f = s * width, f * width
+            for col in range(width):
+                nxt = trie[s].get(col)
+                if nxt is None:
+                    self.delta[base_s + col] = self.delta[base_f + col]
+                else:
+                    self.delta[base_s + col] = nxt
+                    self.fail[nxt] = self.delta[base_f + col]
+                    self.depth[nxt] = self.depth[s] + 1
+                    queue.append(nxt)
+
+    def iter_matches(self, text: str):
+        """Génère les couples (position, motif) dans l'ordre de fin de match."""
+        alpha, delta, width = self.alpha, self.delta, self.width
+        term, out_link, depth, groups = self.term, self.out_link, self.depth, self.groups
+        s = 0
+        for i, ch in enumerate(text):
+            col = alpha.get(ch)
+            if col is None:
+                s = 0
+                continue
+            s = delta[s * width + col]
+            t = s if term[s] >= 0 else out_link[s]
+            while t > 0:
+                pos = i - depth[t] + 1
+                for p in groups[term[t]]:
+                    yield pos, p
+                t = out_link[t]
+
+    def find_all(self, text: str) -> dict[str, list[int]]:
+        """Même format de sortie que `rabin_karp_multi`."""
+        res = {p: [] for p in self.patterns}
+        for pos, p in self.iter_matches(text):
+            res[p].append(pos)
+        for pos_list in res.values():
+            pos_list.sort()
+        return res
+
+    def scan_batch(self, messages: list[str]) -> list[dict[str, list[int]]]:
+        """Scanne un lot de messages ; seuls les motifs trouvés sont renvoyés."""
+        out = []
+        for msg in messages:
+            hits: dict[str, list[int]] = {}
+            for pos, p in self.iter_matches(msg):
+                hits.setdefault(p, []).append(pos)
+            for pos_list in hits.values():
+                pos_list.sort()
+            out.append(hits)
+        return out
+
+
+# ---------- A4 — KMP en streaming (logs volumineux) ----------
+
+class KMPStreamMatcher:
+    """
+    Matcher KMP avec état, alimenté par morceaux (`str` ou `bytes`).
+
+    Seul l'état KMP (longueur du préfixe courant) est conservé entre deux
+    morceaux : mémoire constante, et les occurrences à cheval sur deux
+    morceaux sont détectées. Les positions sont absolues (en caractères pour
+    `str`, en octets pour `bytes`).
+    """
+
+    def __init__(self, pattern: str | bytes):
+        if not pattern:
+            raise ValueError("Le motif ne doit pas être vide.")
+        self.pattern = pattern
+        self.lps = build_lps(pattern)
+        self.offset = 0   # nb d'unités déjà consommées
+        self.state = 0    # longueur du préfixe du motif reconnu
+
+    def reset(self) -> None:
+        self.offset = 0
+        self.state = 0
+
+    def _coerce(self, chunk):
+        # un motif `str` est encodé en UTF-8 au premier morceau `bytes`
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            if isinstance(self.pattern, str):
+                if self.offset:
+                    raise TypeError("Morceaux str et bytes mélangés.")
+                self.pattern = self.pattern.encode("utf-8")
+                self.lps = build_lps(self.pattern)
+            return chunk
+        if isinstance(self.pattern, bytes):
+            raise TypeError("Motif bytes : les morceaux doivent être des bytes.")
+        return chunk
+
+    def feed(self, chunk):
+        """Consomme un morceau et génère les positions de début des occurrences."""
+        chunk = self._coerce(chunk)
+        pattern, lps = self.pattern, self.lps
+        m = len(pattern)
+        j = self.state
+        base = self.offset - m + 1
+        for i, c in enumerate(chunk):
+            while j and pattern[j] != c:
+                j = lps[j - 1]
+            if pattern[j] == c:
+                j += 1
+                if j == m:
+                    yield base + i
+                    j = lps[j - 1]
+        self.state = j
+        self.offset += len(chunk)
+
+    def feed_all(self, chunks):
+        """Enchaîne `feed` sur un itérable de morceaux."""
+        for chunk in chunks:
+            yield from self.feed(chunk)
+
+    def scan_file(self, path: str):
+        """
+        Recherche dans un fichier via mmap : les pages sont lues à la demande par
+        l'OS, la recherche elle-même se fait avec `mmap.find` (code C).
+        """
+        pattern = self.pattern.encode("utf-8") if isinstance(self.pattern, str) else self.pattern
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = mm.find(pattern)
+                while pos != -1:
+                    yield pos
+                    pos = mm.find(pattern, pos + 1)
+
+    def scan_file_chunks(self, path: str, chunk_size: int = 1 << 20):
+        """Variante KMP pure : lecture par blocs de `chunk_size` octets."""
+        self.reset()
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield from self.feed(chunk)
+
+
+# ---------- A5 — Rabin–Karp vectorisé (NumPy) + index de hash ----------
+
+def _window_hashes(codes, m: int, base: int, mod: int):
+    """
+    Hash polynomial de toutes les fenêtres de longueur m, calculé en bloc par
+    doublement : H_{a+b}[i] = H_a[i] * base^b + H_b[i + a]  (mod `mod`).
+    O(n log m) opérations NumPy, aucune boucle Python par caractère.
+    Les valeurs restent < mod < 2^31, donc les produits tiennent en uint64.
+    """
+    mod_u = np.uint64(mod)
+    cur = codes % mod_u          # fenêtres de longueur 1
+    cur_len, cur_pow = 1, base % mod
+    res, res_len = None, 0
+    while True:
+        if m & cur_len:
+            if res is None:
+                res, res_len = cur, cur_len
+            else:
+                n_out = len(res) - cur_len
+                res = (res[:n_out] * np.uint64(cur_pow) + cur[res_len:res_len + n_out]) % mod_u
+                res_len += cur_len
+        if cur_len * 2 > m:
+            return res
+        n_out = len(cur) - cur_len
+        cur = (cur[:n_out] * np.uint64(cur_pow) + cur[cur_len:cur_len + n_out]) % mod_u
+        cur_len *= 2
+        cur_pow = cur_pow * cur_pow % mod
+
+
+def rabin_karp_multi_vectorized(text: str, patterns: list[str], base=257, mod=10**9+7):
+    """
+    Même résultat que `rabin_karp_multi`, mais :
+    - les hash de fenêtres d'un groupe de longueur sont calculés en bloc sur une
+      vue NumPy des points de code du texte ;
+    - les hash des motifs sont indexés (hash -> motifs) : on ne vérifie que les
+      positions dont le hash est présent, au lieu de tester chaque motif.
+    """
+    res = {p: [] for p in patterns}
+    if "" in res:
+        # comme `rabin_karp_multi` : le motif vide apparaît à chaque position
+        res[""] = list(range(len(text) + 1))
+    if not patterns or not text:
+        return res
+
+    # vue uint32 des points de code (ord) sans boucle Python
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+    grouped = {}
+    for p in res:
+        if p:
+            grouped.setdefault(len(p), []).append(p)
+
+    for m, group in grouped.items():
+        if len(text) < m:
+            continue
+        index: dict[int, list[str]] = {}
+        for p in group:
+            hp = 0
+            for ch in p:
+                hp = (hp * base + ord(ch)) % mod
+            index.setdefault(hp, []).append(p)
+
+        hashes = _window_hashes(codes, m, base, mod)
+        keys = np.fromiter(index.keys(), dtype=np.uint64, count=len(index))
+        for i in np.flatnonzero(np.isin(hashes, keys)).tolist():
+            for p in index[int(hashes[i])]:
+                if text.startswith(p, i):
+                    res[p].append(i)
+    return res
+
+
+def bench_rabin_karp(text_len: int = 1_000_000, n_patterns: int = 1000,
+                     baseline_len: int = 20_000, seed: int = 0) -> None:
+    """
+    Compare `rabin_karp_multi` et `rabin_karp_multi_vectorized`.
+    La version pure Python est O(n × motifs) : on la mesure sur un préfixe de
+    `baseline_len` caractères et on extrapole linéairement à `text_len`.
+    """
+    import random
+    import time
+
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz0123456789 "
+    text = "".join(rng.choices(alphabet, k=text_len))
+    patterns = list(dict.fromkeys(
+        "".join(rng.choices(alphabet, k=rng.randint(6, 12))) for _ in range(n_patterns)
+    ))
+    # quelques motifs réellement présents dans le texte
+    for _ in range(50):
+        i = rng.randrange(text_len - 12)
+        patterns.append(text[i:i + rng.randint(6, 12)])
+    patterns = list(dict.fromkeys(patterns))
+
+    prefix = text[:baseline_len]
+    t0 = time.perf_counter()
+    ref = rabin_karp_multi(prefix, patterns)
+    t_base = time.perf_counter() - t0
+    assert rabin_karp_multi_vectorized(prefix, patterns) == ref
+
+    t0 = time.perf_counter()
+    rabin_karp_multi_vectorized(text, patterns)
+    t_vec = time.perf_counter() - t0
+
+    t_base_full = t_base * text_len / baseline_len
+    print(f"Texte : {text_len:,} caractères, {len(patterns)} motifs")
+    print(f" - rabin_karp_multi            : {t_base:.2f} s sur {baseline_len:,} car."
+          f" (≈ {t_base_full:.1f} s extrapolé)")
+    print(f" - rabin_karp_multi_vectorized : {t_vec:.2f} s sur le texte complet")
+    print(f"➡️ Gain ≈ x{t_base_full / t_vec:.0f}")
+
+
+# ---------- A6 — Recherche approchée bit-parallèle (Myers) ----------
+
+# Table de normalisation par défaut (leet-speak courant dans le chat)
+DEFAULT_LEET_TABLE = {
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s",
+    "7": "t", "@": "a", "$": "s", "!": "i", "€": "e",
+}
+
+
+def normalize_text(text: str, table: dict[str, str] | None = None) -> str:
+    """
+    Applique la table de normalisation puis passe en minuscules, caractère par
+    caractère : la longueur est conservée, donc les positions aussi.
+    """
+    if table:
+        text = text.translate(str.maketrans(table))
+    low = text.lower()
+    if len(low) == len(text):
+        return low
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+class ApproxMatcher:
+    """
+    Recherche approchée (distance d'édition <= k) par l'algorithme bit-parallèle
+    de Myers : chaque caractère du texte met à jour toute une colonne de la
+    matrice de distance en quelques opérations sur un mot (un entier Python,
+    donc sans limite de longueur de motif ; <= 64 caractères tient dans un mot).
+
+    - table: normalisation appliquée aux motifs et aux messages (1 car. -> 1 car.)
+    - k: nb d'erreurs max (borné à len(motif) - 1 pour ne pas tout accepter)
+    """
+
+    def __init__(self, patterns: list[str], k: int = 1,
+                 table: dict[str, str] | None = DEFAULT_LEET_TABLE):
+        if k < 0:
+            raise ValueError("k doit être >= 0")
+        if table and any(len(v) != 1 for v in table.values()):
+            raise ValueError("La table doit associer un caractère à un caractère.")
+        self.k = k
+        self.table = dict(table) if table else {}
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+        self._compiled = []
+        for p in self.patterns:
+            norm = normalize_text(p, self.table)
+            peq: dict[str, int] = {}
+            for i, ch in enumerate(norm):
+                peq[ch] = peq.get(ch, 0) | (1 << i)
+            m = len(norm)
+            self._compiled.append((p, peq, m, min(k, m - 1)))
+
+    @staticmethod
+    def _myers(text: str, peq: dict[str, int], m: int, k: int) -> list[tuple[int, int]]:
+        mask = (1 << m) - 1
+        high = 1 << (m - 1)
+        pv, mv, score = mask, 0, m
+        hits: list[tuple[int, int]] = []
+        run_end = -1
+        for j, ch in enumerate(text):
+            eq = peq.get(ch, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+            ph = (ph << 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | (~(xv | ph) & mask)
+            mv = ph & xv
+            if score <= k:
+                # une seule fin par groupe de positions consécutives (la meilleure)
+                if run_end == j:
+                    if score < hits[-1][1]:
+                        hits[-1] = (j + 1, score)
+                else:
+                    hits.append((j + 1, score))
+                run_end = j + 1
+        return hits
+
+    def search(self, text: str) -> dict[str, list[tuple[int, int]]]:
+        """
+        Renvoie, pour chaque motif trouvé, la liste des (fin, erreurs) :
+        `fin` est la position (exclusive) de fin du match dans le message.
+        """
+        norm = normalize_text(text, self.table)
+        out = {}
+        for p, peq, m, k in self._compiled:
+            hits = self._myers(norm, peq, m, k)
+            if hits:
+                out[p] = hits
+        return out
+
+    def scan_batch(self, messages: list[str]) -> list[dict[str, list[tuple[int, int]]]]:
+        return [self.search(msg) for msg in messages]
+
+
+def approx_find_occurrences(text: str, pattern: str, k: int = 1,
+                            table: dict[str, str] | None = DEFAULT_LEET_TABLE) -> list[tuple[int, int]]:
+    """Équivalent approché de `find_all_occurrences` : liste de (fin, erreurs)."""
+    if not pattern:
+        return []
+    return ApproxMatcher([pattern], k, table).search(text).get(pattern, [])
+
+
 if __name__ == "__main__":
     print("====================================")
     print("🔎 A1 — Détection de messages suspects (KMP)")
@@ -96,3 +532,39 @@ if __name__ == "__main__":
     print("\nRésultats :")
     for p, pos in hits.items():
         print(f" - {p} trouvé aux positions {pos}")
+
+
+    print("\n====================================")
+    print("🛡️ A3 — Modération du chat (Aho–Corasick)")
+    print("====================================")
+
+    banned = ["cheater", "noob", "hack", "aimbot", "wallhack"]
+    ac = AhoCorasick(banned, ignore_case=True)
+    messages = ["GG noob", "il a un Aimbot + wallhack", "bien joué"]
+    print("🚫 Dictionnaire :", banned)
+    for msg, hits in zip(messages, ac.scan_batch(messages)):
+        print(f" - {msg!r} -> {hits}")
+
+    print("\n====================================")
+    print("📜 A4 — Recherche en streaming dans les logs (KMP)")
+    print("====================================")
+
+    matcher = KMPStreamMatcher(b"error 500")
+    chunks = [b"ok error 5", b"00 retry error", b" 500 done"]
+    print("📦 Morceaux :", chunks)
+    print("📍 Positions absolues :", list(matcher.feed_all(chunks)))
+
+    print("\n====================================")
+    print("🕵️ A6 — Insultes obfusquées (recherche approchée, Myers)")
+    print("====================================")
+
+    approx = ApproxMatcher(["cheater", "noob"], k=1)
+    messages = ["t'es un ch3at3r", "gros cheeater", "n00b", "bien joué"]
+    for msg, hits in zip(messages, approx.scan_batch(messages)):
+        print(f" - {msg!r} -> {hits}")
+
+    if "--bench" in sys.argv:
+        print("\n====================================")
+        print("⏱️ Benchmark Rabin–Karp (1 Mo, 1 000 motifs)")
+        print("====================================")
+        bench_rabin_karp()
@@ -1,5 +1,9 @@
-import heapq, random
+import heapq, math, random, sys, threading
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+
+import numpy as np
 
 
 def topk_heap(scores: list[float], k: int) -> list[float]:
@@ -24,23 +28,120 @@ def partition(arr, low, high):
     return i
 
 
-def quickselect(arr, low, high, k):
-    if low < high:
-        pi = partition(arr, low, high)
-        if pi == k:
+def _median_of_three(arr, low, high):
+    a, b, c = arr[low], arr[(low + high) // 2], arr[high]
+    if a > b:
+        a, b = b, a
+    if b > c:
+        b = c
+    return max(a, b)
+
+
+def _median_of_medians(arr, low, high):
+    # pivot garanti : au moins ~30 % des éléments de chaque côté
+    medians = []
+    for i in range(low, high + 1, 5):
+        group = sorted(arr[i:min(i + 5, high + 1)])
+        medians.append(group[len(group) // 2])
+    mid = len(medians) // 2
+    introselect(medians, mid)
+    return medians[mid]
+
+
+def _partition3(arr, low, high, pivot):
+    """
+    Partition à trois voies (ordre décroissant) :
+    arr[low:lt] > pivot, arr[lt:gt+1] == pivot, arr[gt+1:high+1] < pivot.
+    """
+    lt, i, gt = low, low, high
+    while i <= gt:
+        v = arr[i]
+        if v > pivot:
+            arr[lt], arr[i] = v, arr[lt]
+            lt += 1
+            i += 1
+        elif v < pivot:
+            arr[gt], arr[i] = v, arr[gt]
+            gt -= 1
+        else:
+            i += 1
+    return lt, gt
+
+
+def _partition_hoare(arr, low, high, pivot):
+    """
+    Partition de Hoare (ordre décroissant) autour de `pivot`, médiane de trois
+    de la plage : seuls les éléments mal placés sont échangés. Renvoie p avec
+    arr[low:p+1] >= pivot >= arr[p+1:high+1] et low <= p < high.
+    """
+    i, j = low, high
+    while True:
+        while arr[i] > pivot:
+            i += 1
+        while arr[j] < pivot:
+            j -= 1
+        if i >= j:
+            return j
+        arr[i], arr[j] = arr[j], arr[i]
+        i += 1
+        j -= 1
+
+
+def introselect(arr, k, low=0, high=None):
+    """
+    Sélection itérative (ordre décroissant) : place en arr[k] l'élément de rang k,
+    avec arr[low:k] >= arr[k] >= arr[k+1:high+1].
+    - pivot médiane de trois + partition de Hoare (peu d'échanges, scores égaux
+      répartis des deux côtés) ; si la profondeur dépasse 2·log2(n), médiane
+      des médianes + partition à trois voies : pire cas O(n) garanti
+    - aucune récursion sur la partie principale (pas de RecursionError)
+    """
+    if high is None:
+        high = len(arr) - 1
+    if not low <= k <= high:
+        return
+    budget = 2 * (high - low + 1).bit_length()
+    while high > low:
+        if high - low < 16:
+            arr[low:high + 1] = sorted(arr[low:high + 1], reverse=True)
             return
-        elif pi < k:
-            quickselect(arr, pi + 1, high, k)
+        if budget > 0:
+            budget -= 1
+            p = _partition_hoare(arr, low, high, _median_of_three(arr, low, high))
+            if k <= p:
+                high = p
+            else:
+                low = p + 1
+            continue
+        lt, gt = _partition3(arr, low, high, _median_of_medians(arr, low, high))
+        if k < lt:
+            high = lt - 1
+        elif k > gt:
+            low = gt + 1
         else:
-            quickselect(arr, low, pi - 1, k)
+            return
+
+
+def quickselect(arr, low, high, k):
+    introselect(arr, k, low, high)
 
 
-def topk_quickselect(scores: list[float], k: int) -> list[float]:
+def topk_quickselect(scores: list[float], k: int, in_place: bool = False) -> list[float]:
+    """
+    Top-K décroissant. Les primitives C l'emportent sur une sélection en pur
+    Python (voir `bench_selection`) : petit k -> `heapq.nlargest`, sinon tri
+    complet (Timsort). `introselect` reste disponible quand il faut partitionner
+    la liste elle-même.
+    in_place=True : évite la copie de `scores` (la liste est réordonnée).
+    """
     if k <= 0:
         return []
-    arr = scores.copy()
-    quickselect(arr, 0, len(arr) - 1, k)
-    return sorted(arr[:k], reverse=True)
+    if k * 8 <= len(scores):
+        return heapq.nlargest(k, scores)
+    if in_place:
+        scores.sort(reverse=True)
+        return scores[:k]
+    return sorted(scores, reverse=True)[:k]
 
 
 def sliding_window_max(arr: list[int], w: int) -> list[int]:
@@ -58,6 +159,422 @@ def sliding_window_max(arr: list[int], w: int) -> list[int]:
     return res
 
 
+def bench_selection(n: int = 200_000, k: int = 100, seed: int = 0) -> None:
+    """
+    Compare topk_quickselect, introselect seul, topk_heap et un tri complet sur
+    des entrées triées, inversées, toutes égales et aléatoires. L'ancien
+    quickselect récursif (pivot arr[high]) est mesuré sur toute l'entrée
+    aléatoire, et sur 3 000 éléments (k = 1 500) pour les autres : sur entrée
+    triée il dépasse la limite de récursion.
+    """
+    import time
+
+    def legacy_quickselect(arr, low, high, k):
+        if low < high:
+            pi = partition(arr, low, high)
+            if pi < k:
+                legacy_quickselect(arr, pi + 1, high, k)
+            elif pi > k:
+                legacy_quickselect(arr, low, pi - 1, k)
+
+    def timed(fn, *args):
+        t0 = time.perf_counter()
+        try:
+            fn(*args)
+        except RecursionError:
+            return "RecursionError"
+        return f"{(time.perf_counter() - t0) * 1000:8.1f} ms"
+
+    rng = random.Random(seed)
+    base = [rng.randint(0, 10000) for _ in range(n)]
+    inputs = {
+        "trié": sorted(base),
+        "inversé": sorted(base, reverse=True),
+        "tous égaux": [5000] * n,
+        "aléatoire": base,
+    }
+    small = 3000
+    print(f"n = {n:,}, k = {k} (ancien quickselect : n = {small:,}, k = {small // 2:,})")
+    for name, data in inputs.items():
+        assert topk_quickselect(data, k) == topk_heap(data, k)
+        legacy = data.copy() if name == "aléatoire" else data[:small]
+        legacy_k = k if name == "aléatoire" else small // 2
+        print(f" - {name:<10} top-k {timed(topk_quickselect, data, k)} | "
+              f"introselect {timed(introselect, data.copy(), k)} | "
+              f"tas {timed(topk_heap, data, k)} | "
+              f"tri {timed(sorted, data)} | "
+              f"ancien {timed(legacy_quickselect, legacy, 0, len(legacy) - 1, legacy_k)}")
+
+
+# ---------- B3 — Classement en direct (skip list indexable) ----------
+
+class _SkipNode:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.next = [None] * level
+        self.width = [1] * level   # nb de positions sautées par chaque lien
+
+
+class Leaderboard:
+    """
+    Classement persistant : skip list indexable triée par (-score, joueur).
+
+    Chaque lien mémorise sa largeur (nb de joueurs sautés), ce qui permet de
+    calculer un rang ou d'accéder au i-ème joueur en O(log n) attendu.
+    - upsert(joueur, score), remove(joueur)      O(log n)
+    - rank(joueur), top(k), around(rang, rayon)  O(log n + taille du résultat)
+    Les rangs renvoyés commencent à 1.
+    """
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self, seed=None):
+        self._rng = random.Random(seed)
+        self._head = _SkipNode(None, self.MAX_LEVEL)
+        self._level = 1
+        self.scores: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __contains__(self, player) -> bool:
+        return player in self.scores
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and self._rng.random() < self.P:
+            level += 1
+        return level
+
+    def _insert(self, key) -> None:
+        update = [self._head] * self.MAX_LEVEL
+        steps = [0] * self.MAX_LEVEL
+        node = self._head
+        for lvl in range(self._level - 1, -1, -1):
+            while node.next[lvl] is not None and node.next[lvl].key < key:
+                steps[lvl] += node.width[lvl]
+                node = node.next[lvl]
+            update[lvl] = node
+
+        level = self._random_level()
+        if level > self._level:
+            # les nouveaux niveaux de la tête sautent toute la liste
+            for lvl in range(self._level, level):
+                self._head.width[lvl] = len(self.scores) + 1
+            self._level = level
+
+        new = _SkipNode(key, level)
+        skipped = 0
+        for lvl in range(level):
+            prev = update[lvl]
+            new.next[lvl] = prev.next[lvl]
+            prev.next[lvl] = new
+            new.width[lvl] = prev.width[lvl] - skipped
+            prev.width[lvl] = skipped + 1
+            skipped += steps[lvl]
+        for lvl in range(level, self._level):
+            update[lvl].width[lvl] += 1
+
+    def _remove(self, key) -> None:
+        update = [self._head] * self.MAX_LEVEL
+        node = self._head
+        for lvl in range(self._level - 1, -1, -1):
+            while node.next[lvl] is not None and node.next[lvl].key < key:
+                node = node.next[lvl]
+            update[lvl] = node
+        target = node.next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for lvl in range(self._level):
+            prev = update[lvl]
+            if prev.next[lvl] is target:
+                prev.width[lvl] += target.width[lvl] - 1
+                prev.next[lvl] = target.next[lvl]
+            else:
+                prev.width[lvl] -= 1
+
+    def _node_at(self, index: int) -> _SkipNode:
+        # index 0-based
+        node = self._head
+        remaining = index + 1
+        for lvl in range(self._level - 1, -1, -1):
+            while node.next[lvl] is not None and node.width[lvl] <= remaining:
+                remaining -= node.width[lvl]
+                node = node.next[lvl]
+        return node
+
+    def upsert(self, player: str, score: float) -> int:
+        """Ajoute ou met à jour le score d'un joueur ; renvoie son nouveau rang."""
+        if not math.isfinite(score):
+            # NaN ne se compare à rien : la clé (-score, joueur) deviendrait introuvable
+            raise ValueError(f"Score non fini pour {player!r} : {score}")
+        old = self.scores.get(player)
+        if old is not None:
+            if old == score:
+                return self.rank(player)
+            self._remove((-old, player))
+        self.scores[player] = score
+        self._insert((-score, player))
+        return self.rank(player)
+
+    def remove(self, player: str) -> bool:
+        score = self.scores.get(player)
+        if score is None:
+            return False
+        self._remove((-score, player))   # lève KeyError avant toute modification
+        del self.scores[player]
+        return True
+
+    def rank(self, player: str) -> int | None:
+        score = self.scores.get(player)
+        if score is None:
+            return None
+        key = (-score, player)
+        node, pos = self._head, 0
+        for lvl in range(self._level - 1, -1, -1):
+            while node.next[lvl] is not None and node.next[lvl].key < key:
+                pos += node.width[lvl]
+                node = node.next[lvl]
+        return pos + 1
+
+    def _walk(self, start_rank: int, count: int) -> list[tuple[int, str, float]]:
+        out = []
+        if count <= 0 or start_rank > len(self.scores):
+            return out
+        node = self._node_at(start_rank - 1)
+        rank = start_rank
+        while node is not None and len(out) < count:
+            neg_score, player = node.key
+            out.append((rank, player, -neg_score))
+            node = node.next[0]
+            rank += 1
+        return out
+
+    def top(self, k: int) -> list[tuple[int, str, float]]:
+        """Les k meilleurs joueurs : liste de (rang, joueur, score)."""
+        return self._walk(1, k)
+
+    def around(self, rank: int, radius: int = 5) -> list[tuple[int, str, float]]:
+        """Page de joueurs autour d'un rang : [rang - rayon, rang + rayon]."""
+        start = max(1, rank - radius)
+        return self._walk(start, rank + radius - start + 1)
+
+
+# ---------- B4 — Top-K shardé en parallèle (process pool + fusion k-way) ----------
+
+SHARD_BLOCK = 1 << 20   # valeurs lues à la fois dans un shard
+
+_POOLS: dict[int | None, ProcessPoolExecutor] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _shard_pool(workers: int | None) -> ProcessPoolExecutor:
+    """Pool de processus du module, créé au premier appel et réutilisé ensuite."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            pool = _POOLS[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+def shard_topk(shard, k: int) -> list:
+    """
+    Top-K local d'un shard, trié par ordre décroissant.
+    shard: liste, tableau NumPy ou chemin vers un fichier .npy (ouvert en
+    mmap : seules les pages lues sont chargées, rien n'est picklé).
+    """
+    if k <= 0:
+        return []
+    if isinstance(shard, str):
+        arr = np.load(shard, mmap_mode="r")
+    else:
+        arr = np.asarray(shard)
+    arr = arr.ravel()
+    # O(n) par blocs : np.partition sur les valeurs (pas de tableau d'indices
+    # int64), et au plus SHARD_BLOCK + k valeurs en mémoire pour un mmap
+    best = arr[:0]
+    step = max(SHARD_BLOCK, k)
+    for start in range(0, arr.size, step):
+        block = np.concatenate((best, arr[start:start + step]))
+        if block.size > k:
+            block = np.partition(block, block.size - k)[block.size - k:]
+        best = block
+    return np.sort(best)[::-1].tolist()
+
+
+def split_shards(scores, n_shards: int) -> list:
+    """Découpe une liste / un tableau en `n_shards` morceaux contigus."""
+    if isinstance(scores, np.ndarray):
+        return np.array_split(scores, n_shards)
+    size = max(1, -(-len(scores) // max(1, n_shards)))
+    return [scores[i:i + size] for i in range(0, len(scores), size)] or [scores]
+
+
+def topk_sharded(shards, k: int, workers: int | None = None) -> list:
+    """
+    Top-K global sur plusieurs shards : chaque shard est réduit à son top-K
+    local dans un pool de processus (`numpy.partition`), puis les listes
+    triées sont fusionnées par tas (k-way merge) en O(k log #shards).
+    Même résultat que `topk_heap` sur la concaténation des shards.
+
+    Passer des chemins .npy plutôt que des listes évite de sérialiser les
+    données vers les workers : c'est ce qui permet un passage à l'échelle
+    quasi linéaire avec le nombre de cœurs.
+    """
+    if k <= 0:
+        return []
+    shards = list(shards)
+    if workers == 1 or len(shards) <= 1:
+        partials = [shard_topk(s, k) for s in shards]
+    else:
+        partials = list(_shard_pool(workers).map(shard_topk, shards, repeat(k)))
+    return list(islice(heapq.merge(*partials, reverse=True), k))
+
+
+# ---------- B5 — Agrégats glissants temporels (télémétrie en ligne) ----------
+
+class TimeWindowAggregator:
+    """
+    Max / min / somme sur une fenêtre temporelle glissante (t - window, t].
+
+    Même principe que `sliding_window_max` : deux deques monotones (max et
+    min) + une deque des échantillons pour la somme. push et les requêtes sont
+    en O(1) amorti ; les timestamps doivent arriver dans l'ordre.
+    """
+
+    def __init__(self, window: float):
+        if window <= 0:
+            raise ValueError("window doit être > 0")
+        self.window = window
+        self._items = deque()   # (t, v) dans l'ordre d'arrivée
+        self._max = deque()     # (t, v) valeurs décroissantes
+        self._min = deque()     # (t, v) valeurs croissantes
+        self._sum = 0.0
+        self.last_ts = None
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.window
+        items = self._items
+        while items and items[0][0] <= cutoff:
+            self._sum -= items.popleft()[1]
+        while self._max and self._max[0][0] <= cutoff:
+            self._max.popleft()
+        while self._min and self._min[0][0] <= cutoff:
+            self._min.popleft()
+        if not items:
+            self._sum = 0.0   # évite la dérive des flottants
+
+    def push(self, ts: float, value: float) -> None:
+        if self.last_ts is not None and ts < self.last_ts:
+            raise ValueError("timestamps non croissants")
+        self.last_ts = ts
+        self._evict(ts)
+        self._items.append((ts, value))
+        self._sum += value
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((ts, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((ts, value))
+
+    def _at(self, now):
+        if now is not None:
+            self._evict(now)
+
+    def max(self, now: float | None = None):
+        self._at(now)
+        return self._max[0][1] if self._max else None
+
+    def min(self, now: float | None = None):
+        self._at(now)
+        return self._min[0][1] if self._min else None
+
+    def sum(self, now: float | None = None) -> float:
+        self._at(now)
+        return self._sum
+
+    def count(self, now: float | None = None) -> int:
+        self._at(now)
+        return len(self._items)
+
+    def stats(self, now: float | None = None) -> dict:
+        self._at(now)
+        n = len(self._items)
+        return {
+            "count": n,
+            "max": self._max[0][1] if n else None,
+            "min": self._min[0][1] if n else None,
+            "sum": self._sum,
+            "mean": self._sum / n if n else None,
+        }
+
+
+class KeyedWindowAggregator:
+    """Un `TimeWindowAggregator` par clé (ex. un par serveur de jeu)."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self.series: dict[str, TimeWindowAggregator] = {}
+
+    def push(self, key, ts: float, value: float) -> None:
+        agg = self.series.get(key)
+        if agg is None:
+            agg = self.series[key] = TimeWindowAggregator(self.window)
+        agg.push(ts, value)
+
+    def stats(self, key, now: float | None = None) -> dict | None:
+        agg = self.series.get(key)
+        return agg.stats(now) if agg is not None else None
+
+    def prune(self, now: float) -> int:
+        """Supprime les clés sans échantillon dans la fenêtre ; renvoie leur nombre."""
+        stale = [k for k, agg in self.series.items() if agg.count(now) == 0]
+        for k in stale:
+            del self.series[k]
+        return len(stale)
+
+
+def window_aggregates_batch(timestamps, values, window: float) -> dict:
+    """
+    Mode rejeu hors-ligne (NumPy) : pour chaque échantillon i, agrégats sur
+    (t_i - window, t_i]. Début de fenêtre par `searchsorted`, somme par
+    préfixes cumulés, max/min par sparse table (O(n log n), sans boucle par
+    échantillon). `timestamps` doit être trié.
+    """
+    ts = np.asarray(timestamps, dtype=np.float64)
+    vals = np.asarray(values, dtype=np.float64)
+    n = len(ts)
+    if n == 0:
+        empty = np.empty(0)
+        return {"count": np.empty(0, dtype=np.int64), "max": empty, "min": empty, "sum": empty}
+
+    end = np.arange(n)
+    start = np.searchsorted(ts, ts - window, side="right")
+    count = end - start + 1
+
+    prefix = np.concatenate(([0.0], np.cumsum(vals)))
+    sums = prefix[end + 1] - prefix[start]
+
+    levels = np.floor(np.log2(count)).astype(np.int64)
+    mx, mn = vals.copy(), vals.copy()
+    out_max, out_min = np.empty(n), np.empty(n)
+    for j in range(int(levels.max()) + 1):
+        if j:
+            half = 1 << (j - 1)
+            mx = np.maximum(mx[:-half], mx[half:])
+            mn = np.minimum(mn[:-half], mn[half:])
+        sel = np.flatnonzero(levels == j)
+        if sel.size:
+            right = end[sel] - (1 << j) + 1
+            out_max[sel] = np.maximum(mx[start[sel]], mx[right])
+            out_min[sel] = np.minimum(mn[start[sel]], mn[right])
+    return {"count": count, "max": out_max, "min": out_min, "sum": sums}
+
+
 if __name__ == "__main__":
     print("====================================")
     print("🏆 B1 — Top-K : Classement des meilleurs joueurs")
@@ -69,6 +586,7 @@ if __name__ == "__main__":
 
     print(f"Top {k} (tas min) :", topk_heap(scores, k))
     print(f"Top {k} (quickselect) :", topk_quickselect(scores, k))
+    print(f"Top {k} (shardé, 4 shards) :", topk_sharded(split_shards(scores, 4), k))
 
     print("\n====================================")
     print("📈 B2 — Score maximum sur fenêtre glissante")
@@ -79,3 +597,32 @@ if __name__ == "__main__":
     print("Scores :", arr)
     print("Fenêtre :", w)
     print("Résultat :", sliding_window_max(arr, w))
+
+    print("\n====================================")
+    print("📊 B3 — Classement en direct (skip list indexable)")
+    print("====================================")
+
+    board = Leaderboard(seed=0)
+    for player, score in [("alice", 1200), ("bob", 950), ("carol", 1430), ("dave", 1100)]:
+        board.upsert(player, score)
+    board.upsert("bob", 1500)
+    print("Top 3 :", board.top(3))
+    print("Rang de dave :", board.rank("dave"))
+    print("Autour du rang 3 :", board.around(3, radius=1))
+
+    print("\n====================================")
+    print("📡 B5 — Ping max sur les 30 dernières secondes (par serveur)")
+    print("====================================")
+
+    pings = KeyedWindowAggregator(window=30.0)
+    for t, server, ping in [(0, "eu-1", 42), (10, "eu-1", 80), (12, "us-1", 120),
+                            (35, "eu-1", 55), (50, "eu-1", 60)]:
+        pings.push(server, t, ping)
+    print("eu-1 @ t=50 :", pings.stats("eu-1"))
+    print("us-1 @ t=50 :", pings.stats("us-1", now=50))
+
+    if "--bench" in sys.argv:
+        print("\n====================================")
+        print("⏱️ Benchmark sélection (introselect)")
+        print("====================================")
+        bench_selection()
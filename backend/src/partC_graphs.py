@@ -1,7 +1,17 @@
 from __future__ import annotations
 from typing import List, Tuple, Dict, Optional
+from array import array
+from collections import OrderedDict, deque
+import hashlib
 import heapq
 import math
+import os
+import struct
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
 
 Coord = Tuple[int, int]  # (row, col)
 
@@ -27,82 +37,1416 @@ def reconstruct_path(parents, start, goal):
     return path
 
 
-def dijkstra(grid: List[List[Optional[int]]], start: Coord, goal: Coord) -> Tuple[float, List[Coord], int]:
-    dist: Dict[Coord, float] = {start: 0.0}
-    parents: Dict[Coord, Coord] = {}
+# ---- Compact grid (flat arrays) ----
+
+class CompiledGrid:
+    """
+    Grille compilée : coûts dans un seul buffer plat `array('d')` entouré d'une
+    bordure sentinelle, cellules encodées par un index entier
+    idx = (r + 1) * stride + (c + 1).
+
+    Les murs (None) et la bordure valent +inf : `d + cost[v]` n'améliore jamais
+    une distance, donc aucun test de bornes ni de mur dans les boucles de
+    recherche. `offsets` donne les 4 voisins (haut, bas, gauche, droite),
+    dans le même ordre que `neighbors()`.
+    """
+
+    def __init__(self, rows: int, cols: int, cost: Optional[array] = None) -> None:
+        if rows <= 0 or cols <= 0:
+            raise ValueError("La grille doit contenir au moins une cellule.")
+        self.rows = rows
+        self.cols = cols
+        self.stride = cols + 2
+        self.size = (rows + 2) * self.stride
+        self.cost = cost if cost is not None else array("d", [math.inf]) * self.size
+        self.offsets = (-self.stride, self.stride, -1, 1)
+        self.version = 0
+        self.connectivity: Optional["ConnectivityIndex"] = None
+        self._derived: Dict[str, tuple] = {}   # nom -> (version, valeur), voir `derived`
+
+    @classmethod
+    def from_rows(cls, grid: List[List[Optional[int]]]) -> "CompiledGrid":
+        rows, cols = len(grid), len(grid[0]) if grid else 0
+        cg = cls(rows, cols)
+        inf, stride, cost = math.inf, cg.stride, cg.cost
+        for r, line in enumerate(grid):
+            if len(line) != cols:
+                raise ValueError("Toutes les lignes de la grille doivent avoir la même longueur.")
+            base = (r + 1) * stride + 1
+            cost[base:base + cols] = array("d", (inf if v is None else float(v) for v in line))
+        return cg
+
+    # En-tête binaire : magic, version du format, type des coûts, lignes, colonnes, version de la carte
+    HEADER = struct.Struct("<4sBcIIQ")
+    MAGIC = b"AGRD"
+
+    def to_bytes(self) -> bytes:
+        """
+        Format binaire compact : coûts entiers 0..254 sur 1 octet (255 = mur),
+        sinon float64 (inf = mur). Seules les cases intérieures sont écrites.
+        """
+        interior = array("d")
+        for r in range(self.rows):
+            base = (r + 1) * self.stride + 1
+            interior.extend(self.cost[base:base + self.cols])
+        if all(v == math.inf or (v.is_integer() and 0 <= v < 255) for v in interior):
+            body = bytes(255 if v == math.inf else int(v) for v in interior)
+            kind = b"B"
+        else:
+            body = interior.tobytes()
+            kind = b"d"
+        return self.HEADER.pack(self.MAGIC, 1, kind, self.rows, self.cols, self.version) + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompiledGrid":
+        magic, fmt, kind, rows, cols, version = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or fmt != 1:
+            raise ValueError("Format de carte binaire inconnu.")
+        body = memoryview(data)[cls.HEADER.size:]
+        if kind == b"B":
+            values = array("d", (math.inf if v == 255 else float(v) for v in body))
+        elif kind == b"d":
+            values = array("d")
+            values.frombytes(body)
+        else:
+            raise ValueError("Type de coût inconnu.")
+        if len(values) != rows * cols:
+            raise ValueError("Taille de carte binaire incohérente.")
+        cg = cls(rows, cols)
+        for r in range(rows):
+            base = (r + 1) * cg.stride + 1
+            cg.cost[base:base + cols] = values[r * cols:(r + 1) * cols]
+        cg.version = version
+        return cg
+
+    def to_rows(self) -> List[List[Optional[float]]]:
+        out = []
+        for r in range(self.rows):
+            base = (r + 1) * self.stride + 1
+            out.append([None if v == math.inf else v for v in self.cost[base:base + self.cols]])
+        return out
+
+    def in_bounds(self, cell: Coord) -> bool:
+        return 0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols
+
+    def index(self, cell: Coord) -> int:
+        if not self.in_bounds(cell):
+            raise ValueError(f"Cellule hors de la grille: {tuple(cell)}")
+        return (cell[0] + 1) * self.stride + cell[1] + 1
+
+    def cell(self, idx: int) -> Coord:
+        r, c = divmod(idx, self.stride)
+        return (r - 1, c - 1)
+
+    def walkable(self, idx: int) -> bool:
+        return self.cost[idx] != math.inf
+
+    def set_cost(self, cell: Coord, value: Optional[float]) -> None:
+        idx = self.index(cell)
+        was_walkable = self.cost[idx] != math.inf
+        self.cost[idx] = math.inf if value is None else float(value)
+        self.version += 1
+        if self.connectivity is not None and was_walkable != (value is not None):
+            self.connectivity.cell_changed(idx, value is not None)
+
+    def derived(self, name: str, compute):
+        """Valeur dérivée de la carte (min des coûts...), recalculée quand la version change."""
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        value = compute(self)
+        self._derived[name] = (self.version, value)
+        return value
+
+    def copy(self) -> "CompiledGrid":
+        """Copie indépendante (coûts, version, index de connexité) : base des modifications."""
+        cg = CompiledGrid(self.rows, self.cols, array("d", self.cost))
+        cg.version = self.version
+        if self.connectivity is not None:
+            cg.connectivity = self.connectivity.copy(cg)
+        return cg
+
+    def ensure_connectivity(self) -> "ConnectivityIndex":
+        """Construit (une fois) l'index des composantes connexes de la carte."""
+        if self.connectivity is None:
+            self.connectivity = ConnectivityIndex(self)
+        return self.connectivity
+
+    def unreachable(self, start: int, goal: int) -> bool:
+        """True si l'index de connexité prouve qu'aucun chemin n'existe."""
+        return self.connectivity is not None and not self.connectivity.connected(start, goal)
+
+
+def as_compiled(grid) -> CompiledGrid:
+    """Couche de conversion : accepte une liste de listes ou une CompiledGrid."""
+    return grid if isinstance(grid, CompiledGrid) else CompiledGrid.from_rows(grid)
+
+
+def path_from_parents(parent: array, start: int, goal: int) -> List[int]:
+    path = [goal]
+    cur = goal
+    while cur != start:
+        cur = parent[cur]
+        if cur < 0:
+            return []
+        path.append(cur)
+    path.reverse()
+    return path
+
+
+def dijkstra_compiled(cg: CompiledGrid, start: int, goal: int) -> Tuple[float, List[int], int]:
+    if cg.unreachable(start, goal):
+        return math.inf, [], 0
+    cost, offsets = cg.cost, cg.offsets
+    dist = array("d", [math.inf]) * cg.size
+    parent = array("l", [-1]) * cg.size
+    dist[start] = 0.0
     explored = 0
-    pq: List[Tuple[float, Coord]] = [(0.0, start)]
+    pq: List[Tuple[float, int]] = [(0.0, start)]
+    pop, push = heapq.heappop, heapq.heappush
 
     while pq:
-        d, u = heapq.heappop(pq)
+        d, u = pop(pq)
+        if d > dist[u]:
+            continue  # entrée périmée : u a déjà été atteint plus court
         explored += 1
         if u == goal:
-            return d, reconstruct_path(parents, start, goal), explored
-        if d > dist.get(u, math.inf):
-            continue
-        for v in neighbors(grid, u):
-            cost = grid[v[0]][v[1]]
-            assert cost is not None
-            nd = d + float(cost)
-            if nd < dist.get(v, math.inf):
+            return d, path_from_parents(parent, start, goal), explored
+        for off in offsets:
+            v = u + off
+            nd = d + cost[v]
+            if nd < dist[v]:
                 dist[v] = nd
-                parents[v] = u
-                heapq.heappush(pq, (nd, v))
+                parent[v] = u
+                push(pq, (nd, v))
     return math.inf, [], explored
 
+
+def astar_compiled(cg: CompiledGrid, start: int, goal: int) -> Tuple[float, List[int], int]:
+    if cg.unreachable(start, goal):
+        return math.inf, [], 0
+    cost, offsets, stride = cg.cost, cg.offsets, cg.stride
+    gr, gc = divmod(goal, stride)
+    g = array("d", [math.inf]) * cg.size
+    parent = array("l", [-1]) * cg.size
+    g[start] = 0.0
+    explored = 0
+    sr, sc = divmod(start, stride)
+    h0 = float(abs(sr - gr) + abs(sc - gc))
+    # (f, h, g, u) : à f égal on développe d'abord la case la plus proche du but
+    pq: List[Tuple[float, float, float, int]] = [(h0, h0, 0.0, start)]
+    pop, push = heapq.heappop, heapq.heappush
+
+    while pq:
+        f, h, gu, u = pop(pq)
+        if gu > g[u]:
+            continue  # entrée périmée
+        explored += 1
+        if u == goal:
+            return gu, path_from_parents(parent, start, goal), explored
+        for off in offsets:
+            v = u + off
+            tentative = gu + cost[v]
+            if tentative < g[v]:
+                g[v] = tentative
+                parent[v] = u
+                vr, vc = divmod(v, stride)
+                hv = abs(vr - gr) + abs(vc - gc)
+                push(pq, (tentative + hv, hv, tentative, v))
+    return math.inf, [], explored
+
+
+def dijkstra(grid: List[List[Optional[int]]], start: Coord, goal: Coord) -> Tuple[float, List[Coord], int]:
+    cg = as_compiled(grid)
+    dist, path, explored = dijkstra_compiled(cg, cg.index(start), cg.index(goal))
+    return dist, [cg.cell(i) for i in path], explored
+
 def manhattan(a: Coord, b: Coord) -> float:
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 def astar(grid: List[List[Optional[int]]], start: Coord, goal: Coord) -> Tuple[float, List[Coord], int]:
-    g: Dict[Coord, float] = {start: 0.0}
-    parents: Dict[Coord, Coord] = {}
+    cg = as_compiled(grid)
+    dist, path, explored = astar_compiled(cg, cg.index(start), cg.index(goal))
+    return dist, [cg.cell(i) for i in path], explored
+
+
+# ---- Recherche bidirectionnelle (Dijkstra / A*) ----
+
+def min_cost(cg: CompiledGrid) -> float:
+    """Plus petit coût de case franchissable (mis en cache par version de la grille)."""
+    return cg.derived("min_cost", _min_cost)
+
+
+def _min_cost(cg: CompiledGrid) -> float:
+    value = min(cg.cost)
+    return 0.0 if value == math.inf else value
+
+
+def bidirectional_compiled(cg: CompiledGrid, start: int, goal: int,
+                           heuristic: bool = False) -> Tuple[float, List[int], int]:
+    """
+    Recherche bidirectionnelle : un front part de `start`, l'autre de `goal`
+    (arcs inversés, on paie toujours la case où l'on entre), et on garde la
+    meilleure jonction `mu` rencontrée.
+
+    Avec `heuristic=True`, les deux fronts utilisent le potentiel moyen
+    p(v) = (h_goal(v) - h_start(v)) / 2 (Manhattan × coût minimal, donc
+    cohérent) : la règle d'arrêt reste celle de Dijkstra bidirectionnel,
+    top_avant + top_arrière >= mu, et le chemin rendu est optimal.
+    Les entrées périmées du tas sont ignorées ; à clé égale on développe la
+    case la plus proche de la cible du front.
+    """
+    if cg.unreachable(start, goal):
+        return math.inf, [], 0
+    if start == goal:
+        return 0.0, [start], 0
+    if not cg.walkable(goal):
+        return math.inf, [], 0
+    cost, offsets, stride, size = cg.cost, cg.offsets, cg.stride, cg.size
+    inf = math.inf
+    sr, sc = divmod(start, stride)
+    gr, gc = divmod(goal, stride)
+    half = min_cost(cg) / 2 if heuristic else 0.0
+
+    df = array("d", [inf]) * size      # distance depuis start
+    db = array("d", [inf]) * size      # distance jusqu'à goal
+    parent = array("l", [-1]) * size   # front avant : prédécesseur
+    nxt = array("l", [-1]) * size      # front arrière : case suivante vers goal
+    df[start] = 0.0
+    db[goal] = 0.0
+    span = abs(sr - gr) + abs(sc - gc)
+    # entrées : (clé, départage = distance Manhattan à la cible du front, distance, case)
+    fwd: List[Tuple[float, int, float, int]] = [(span * half, span, 0.0, start)]
+    bwd: List[Tuple[float, int, float, int]] = [(span * half, span, 0.0, goal)]
+    pop, push = heapq.heappop, heapq.heappush
+    mu, meet = inf, -1
     explored = 0
-    pq: List[Tuple[float, Coord]] = [(manhattan(start, goal), start)]
 
+    while fwd and bwd:
+        if fwd[0][0] + bwd[0][0] >= mu:
+            break
+        if fwd[0][0] <= bwd[0][0]:
+            _, _, d, u = pop(fwd)
+            if d > df[u]:
+                continue
+            explored += 1
+            for off in offsets:
+                v = u + off
+                nd = d + cost[v]
+                if nd < df[v]:
+                    df[v] = nd
+                    parent[v] = u
+                    if nd + db[v] < mu:
+                        mu, meet = nd + db[v], v
+                    vr, vc = divmod(v, stride)
+                    ht = abs(vr - gr) + abs(vc - gc)
+                    push(fwd, (nd + (ht - abs(vr - sr) - abs(vc - sc)) * half, ht, nd, v))
+        else:
+            _, _, d, v = pop(bwd)
+            if d > db[v]:
+                continue
+            explored += 1
+            nd = d + cost[v]
+            for off in offsets:
+                u = v + off
+                if nd < db[u] and cost[u] != inf:
+                    db[u] = nd
+                    nxt[u] = v
+                    if df[u] + nd < mu:
+                        mu, meet = df[u] + nd, u
+                    ur, uc = divmod(u, stride)
+                    hs = abs(ur - sr) + abs(uc - sc)
+                    push(bwd, (nd + (hs - abs(ur - gr) - abs(uc - gc)) * half, hs, nd, u))
+
+    if meet < 0:
+        return inf, [], explored
+    path = path_from_parents(parent, start, meet)
+    cur = meet
+    while cur != goal:
+        cur = nxt[cur]
+        path.append(cur)
+    return mu, path, explored
+
+
+def bidirectional(grid, start: Coord, goal: Coord, heuristic: bool = False) -> Tuple[float, List[Coord], int]:
+    cg = as_compiled(grid)
+    dist, path, explored = bidirectional_compiled(cg, cg.index(start), cg.index(goal), heuristic)
+    return dist, [cg.cell(i) for i in path], explored
+
+# ---- Flow fields (un calcul par objectif, partagé par toutes les unités) ----
+
+class FlowField:
+    """
+    Champ de distances vers un objectif : une seule recherche de Dijkstra
+    inversée depuis `goal` donne, pour chaque cellule, la distance restante
+    (`dist`) et la prochaine cellule à emprunter (`next`).
+    Le chemin d'une unité se lit ensuite en O(longueur du chemin).
+    """
+
+    def __init__(self, cg: CompiledGrid, goal: Coord) -> None:
+        self.grid = cg
+        self.goal = tuple(goal)
+        self.version = cg.version
+        g = cg.index(goal)
+        cost, offsets = cg.cost, cg.offsets
+        inf = math.inf
+        self.dist = dist = array("d", [inf]) * cg.size
+        self.next = nxt = array("l", [-1]) * cg.size
+        self.explored = 0
+        if cost[g] == inf:
+            return
+        dist[g] = 0.0
+        pq: List[Tuple[float, int]] = [(0.0, g)]
+        pop, push = heapq.heappop, heapq.heappush
+        while pq:
+            d, v = pop(pq)
+            if d > dist[v]:
+                continue
+            self.explored += 1
+            # arc inverse u -> v : coûte cost[v] (on paie la case où l'on entre)
+            nd = d + cost[v]
+            for off in offsets:
+                u = v + off
+                if nd < dist[u] and cost[u] != inf:
+                    dist[u] = nd
+                    nxt[u] = v
+                    push(pq, (nd, u))
+
+    def _entry(self, u: int) -> Tuple[float, int]:
+        # une unité posée sur un mur peut quand même en sortir (comme `dijkstra`)
+        if u == self.grid.index(self.goal):
+            return 0.0, -1
+        if self.grid.cost[u] != math.inf:
+            return self.dist[u], self.next[u]
+        best, step = math.inf, -1
+        for off in self.grid.offsets:
+            v = u + off
+            d = self.grid.cost[v] + self.dist[v]
+            if d < best:
+                best, step = d, v
+        return best, step
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire des deux tableaux à la taille de la carte (poids dans le cache)."""
+        return len(self.dist) * self.dist.itemsize + len(self.next) * self.next.itemsize
+
+    def distance(self, start: Coord) -> float:
+        return self._entry(self.grid.index(start))[0]
+
+    def path_from(self, start: Coord) -> List[Coord]:
+        cg = self.grid
+        u = cg.index(start)
+        d, step = self._entry(u)
+        if d == math.inf:
+            return []
+        path = [cg.cell(u)]
+        nxt = self.next
+        while step >= 0:
+            u = step
+            path.append(cg.cell(u))
+            step = nxt[u]
+        return path
+
+
+class LRUCache:
+    """
+    Cache LRU minimal (OrderedDict) pour les structures dérivées d'une carte.
+    Partagé entre les threads Flask : toutes les opérations passent par `lock`.
+    - maxsize: nombre maximal d'entrées
+    - maxbytes / sizeof: borne optionnelle en octets, `sizeof(valeur)` donnant
+      le poids de chaque entrée (la plus récente est toujours conservée)
+    """
+
+    def __init__(self, maxsize: int = 32, on_evict=None, maxbytes: Optional[int] = None, sizeof=None) -> None:
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof if sizeof is not None else (lambda value: 0)
+        self.data: "OrderedDict" = OrderedDict()
+        self.sizes: Dict = {}
+        self.nbytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            value = self.data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.data.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        evicted = []
+        size = self.sizeof(value)
+        with self.lock:
+            self.nbytes += size - self.sizes.get(key, 0)
+            self.sizes[key] = size
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > 1 and (len(self.data) > self.maxsize or
+                                          (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+                old_key, old = self.data.popitem(last=False)
+                self.nbytes -= self.sizes.pop(old_key)
+                evicted.append(old)
+        # hors du verrou : le callback peut être lent (arrêt d'un pool...)
+        if self.on_evict is not None:
+            for item in evicted:
+                self.on_evict(item)
+
+    def items(self) -> List[tuple]:
+        """Instantané des couples (clé, valeur), du moins au plus récemment utilisé."""
+        with self.lock:
+            return list(self.data.items())
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.data)
+
+
+def grid_fingerprint(cg: CompiledGrid) -> str:
+    """Empreinte du contenu d'une grille (clé de cache pour les grilles envoyées en JSON)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{cg.rows}x{cg.cols}|".encode())
+    h.update(cg.cost.tobytes())
+    return h.hexdigest()
+
+
+def get_flow_field(cache: LRUCache, map_key, cg: CompiledGrid, goal: Coord) -> Tuple[FlowField, bool]:
+    """
+    Renvoie (champ, trouvé_en_cache) pour (carte, version, objectif) : toute
+    modification de la carte incrémente sa version et invalide ses champs.
+    """
+    key = (map_key, cg.version, tuple(goal))
+    field = cache.get(key)
+    if field is not None:
+        return field, True
+    field = FlowField(cg, goal)
+    cache.put(key, field)
+    return field, False
+
+
+# ---- HPA* (pathfinding hiérarchique pour les grandes cartes) ----
+
+BorderKey = Tuple[str, int, int]  # ("v", cr, cc) : entre (cr, cc) et (cr, cc+1) ; ("h", cr, cc) : entre (cr, cc) et (cr+1, cc)
+
+class HierarchicalPathfinder:
+    """
+    HPA* : la grille est découpée en clusters de `cluster_size` × `cluster_size`.
+
+    Pré-calcul (une fois par carte) :
+    - entrées entre clusters voisins : pour chaque segment de bordure franchissable,
+      une paire de cellules de transition au milieu (aux deux extrémités si le
+      segment fait >= 6 cases) ;
+    - distances intra-cluster entre les transitions d'un même cluster (Dijkstra
+      limité au cluster).
+    Requête : on relie départ et arrivée aux transitions de leur cluster, on
+    cherche dans le petit graphe abstrait (A*), puis on raffine par un A*
+    limité au couloir des clusters traversés (+ `corridor_margin` clusters
+    autour). Le chemin raffiné n'est jamais plus long que le chemin abstrait,
+    mais aucune borne d'optimalité n'est garantie (mesuré jusqu'à 1,115 ×
+    l'optimal).
+    Les distances intra-cluster sont calculées au premier passage d'une
+    requête dans le cluster, pas à la construction : seules les bordures sont
+    pré-calculées. `update_cells` ne recalcule que les bordures touchées et
+    oublie les distances des clusters concernés.
+
+    Compromis mesuré (Python pur, clusters de 16) : sur une carte ouverte, A*
+    avec l'heuristique de Manhattan n'explore que le chemin et reste devant
+    (512² : 5 ms contre 34 ms) ; sur 512² à 1024² avec obstacles, les deux
+    sont au coude à coude une fois les clusters calculés, et les premières
+    requêtes paient ce calcul. Voir `HPA_MIN_CELLS` : en dessous, les
+    requêtes "hpa" de l'API passent par A*.
+    """
+
+    LONG_ENTRANCE = 6
+
+    def __init__(self, cg: CompiledGrid, cluster_size: int = 16, corridor_margin: int = 1) -> None:
+        if cluster_size < 2:
+            raise ValueError("cluster_size doit être >= 2")
+        self.grid = cg
+        self.cs = cluster_size
+        self.corridor_margin = corridor_margin
+        self.n_cr = -(-cg.rows // cluster_size)
+        self.n_cc = -(-cg.cols // cluster_size)
+        # partagé entre threads : requêtes et mises à jour sont sérialisées
+        self.lock = threading.RLock()
+        self.rebuild()
+
+    # --- structure ---
+
+    def rebuild(self) -> None:
+        with self.lock:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        # id de cluster par cellule (-1 sur la bordure sentinelle)
+        cg = self.grid
+        self.cid = array("i", [-1]) * cg.size
+        for r in range(cg.rows):
+            base = (r + 1) * cg.stride + 1
+            row_ids = [(r // self.cs) * self.n_cc + c // self.cs for c in range(cg.cols)]
+            self.cid[base:base + cg.cols] = array("i", row_ids)
+        self.borders: Dict[BorderKey, List[Tuple[int, int]]] = {}
+        self.nodes: Dict[Tuple[int, int], Dict[int, int]] = {}       # cluster -> {idx: refcount}
+        self.inter: Dict[int, Dict[int, float]] = {}                  # arcs entre clusters
+        self.intra: Dict[Tuple[int, int], Dict[int, Dict[int, float]]] = {}
+        for cr in range(self.n_cr):
+            for cc in range(self.n_cc):
+                self.nodes[(cr, cc)] = {}
+        for cr in range(self.n_cr):
+            for cc in range(self.n_cc):
+                if cc + 1 < self.n_cc:
+                    self._set_border(("v", cr, cc), self._compute_border(("v", cr, cc)))
+                if cr + 1 < self.n_cr:
+                    self._set_border(("h", cr, cc), self._compute_border(("h", cr, cc)))
+        # distances intra-cluster : calculées au premier passage d'une requête (`_intra`)
+        self.version = self.grid.version
+
+    def cluster_of(self, idx: int) -> Tuple[int, int]:
+        r, c = self.grid.cell(idx)
+        return (r // self.cs, c // self.cs)
+
+    def _bounds(self, cluster: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        cr, cc = cluster
+        r0, c0 = cr * self.cs, cc * self.cs
+        return r0, min(self.grid.rows, r0 + self.cs), c0, min(self.grid.cols, c0 + self.cs)
+
+    def _compute_border(self, key: BorderKey) -> List[Tuple[int, int]]:
+        kind, cr, cc = key
+        cg, inf = self.grid, math.inf
+        if kind == "v":
+            r0, r1, _, _ = self._bounds((cr, cc))
+            c = (cc + 1) * self.cs - 1
+            pairs = [(cg.index((r, c)), cg.index((r, c + 1))) for r in range(r0, r1)]
+        else:
+            _, _, c0, c1 = self._bounds((cr, cc))
+            r = (cr + 1) * self.cs - 1
+            pairs = [(cg.index((r, c)), cg.index((r + 1, c))) for c in range(c0, c1)]
+
+        transitions: List[Tuple[int, int]] = []
+        segment: List[Tuple[int, int]] = []
+        for pair in pairs + [None]:
+            if pair is not None and cg.cost[pair[0]] != inf and cg.cost[pair[1]] != inf:
+                segment.append(pair)
+                continue
+            if segment:
+                if len(segment) >= self.LONG_ENTRANCE:
+                    transitions += [segment[0], segment[-1]]
+                else:
+                    transitions.append(segment[len(segment) // 2])
+                segment = []
+        return transitions
+
+    def _set_border(self, key: BorderKey, transitions: List[Tuple[int, int]]) -> None:
+        kind, cr, cc = key
+        first, second = (cr, cc), ((cr, cc + 1) if kind == "v" else (cr + 1, cc))
+        cost = self.grid.cost
+        for a, b in self.borders.get(key, []):
+            self.inter[a].pop(b, None)
+            self.inter[b].pop(a, None)
+            for cluster, n in ((first, a), (second, b)):
+                refs = self.nodes[cluster]
+                refs[n] -= 1
+                if not refs[n]:
+                    del refs[n]
+        for a, b in transitions:
+            self.inter.setdefault(a, {})[b] = cost[b]
+            self.inter.setdefault(b, {})[a] = cost[a]
+            for cluster, n in ((first, a), (second, b)):
+                refs = self.nodes.setdefault(cluster, {})
+                refs[n] = refs.get(n, 0) + 1
+        self.borders[key] = transitions
+
+    def _local_search(self, cluster: Tuple[int, int], source: int, reverse: bool = False,
+                      target: Optional[int] = None, targets: Optional[set] = None):
+        """
+        Dijkstra limité à un cluster. reverse=True : distances *vers* `source`.
+        S'arrête dès que `target` (ou tous les `targets`) sont atteints.
+        Renvoie (dist, parent, explored).
+        """
+        cg = self.grid
+        cost, offsets, cid = cg.cost, cg.offsets, self.cid
+        k = cluster[0] * self.n_cc + cluster[1]
+        inf = math.inf
+        dist = {source: 0.0}
+        parent: Dict[int, int] = {}
+        pq: List[Tuple[float, int]] = [(0.0, source)]
+        pop, push = heapq.heappop, heapq.heappush
+        explored = 0
+        remaining = len(targets) if targets else -1
+        while pq:
+            d, u = pop(pq)
+            if d > dist[u]:
+                continue
+            explored += 1
+            if u == target:
+                break
+            if remaining > 0 and u in targets:
+                remaining -= 1
+                if not remaining:
+                    break
+            cu = cost[u]
+            for off in offsets:
+                v = u + off
+                if cid[v] != k or cost[v] == inf:
+                    continue
+                nd = d + (cu if reverse else cost[v])
+                if nd < dist.get(v, inf):
+                    dist[v] = nd
+                    parent[v] = u
+                    push(pq, (nd, v))
+        return dist, parent, explored
+
+    def _intra(self, cluster: Tuple[int, int]) -> Dict[int, Dict[int, float]]:
+        edges = self.intra.get(cluster)
+        if edges is None:
+            self._compute_intra(cluster)
+            edges = self.intra[cluster]
+        return edges
+
+    def _compute_intra(self, cluster: Tuple[int, int]) -> None:
+        nodes = list(self.nodes.get(cluster, {}))
+        edges: Dict[int, Dict[int, float]] = {}
+        for n in nodes:
+            dist, _, _ = self._local_search(cluster, n, targets=set(nodes) - {n})
+            edges[n] = {m: dist[m] for m in nodes if m != n and m in dist}
+        self.intra[cluster] = edges
+
+    def update_cells(self, changes: List[Tuple[Coord, Optional[float]]]) -> None:
+        """Applique des changements de coût (None = mur) et met à jour les clusters concernés."""
+        for cell, value in changes:
+            self.grid.set_cost(cell, value)
+        self.cells_changed([cell for cell, _ in changes])
+
+    def cells_changed(self, cells: List[Coord]) -> None:
+        """Resynchronise après des modifications déjà appliquées à la grille."""
+        with self.lock:
+            self._cells_changed(cells)
+
+    def sync(self, cg: CompiledGrid, cells: List[Coord]) -> None:
+        """Bascule sur `cg` (nouvelle version publiée de la carte) dont seules `cells` ont changé."""
+        with self.lock:
+            self.grid = cg
+            self._cells_changed(cells)
+
+    def _cells_changed(self, cells: List[Coord]) -> None:
+        borders, clusters = set(), set()
+        for cell in cells:
+            r, c = cell
+            cr, cc = r // self.cs, c // self.cs
+            r0, r1, c0, c1 = self._bounds((cr, cc))
+            clusters.add((cr, cc))
+            if c == c0 and cc > 0:
+                borders.add(("v", cr, cc - 1))
+            if c == c1 - 1 and cc + 1 < self.n_cc:
+                borders.add(("v", cr, cc))
+            if r == r0 and cr > 0:
+                borders.add(("h", cr - 1, cc))
+            if r == r1 - 1 and cr + 1 < self.n_cr:
+                borders.add(("h", cr, cc))
+        for key in borders:
+            kind, cr, cc = key
+            self._set_border(key, self._compute_border(key))
+            clusters.add((cr, cc))
+            clusters.add((cr, cc + 1) if kind == "v" else (cr + 1, cc))
+        for cluster in clusters:
+            self.intra.pop(cluster, None)
+        self.version = self.grid.version
+
+    # --- requêtes ---
+
+    def find_path(self, start: Coord, goal: Coord) -> Tuple[float, List[Coord], int]:
+        with self.lock:
+            return self._find_path(start, goal)
+
+    def _find_path(self, start: Coord, goal: Coord) -> Tuple[float, List[Coord], int]:
+        cg = self.grid
+        if self.version != cg.version:
+            self.rebuild()   # carte modifiée sans passer par update_cells
+        s, g = cg.index(start), cg.index(goal)
+        if s == g:
+            return 0.0, [start], 1
+        if cg.unreachable(s, g):
+            return math.inf, [], 0
+        if cg.cost[s] == math.inf:
+            # départ sur un mur : on peut en sortir (comme `dijkstra`), on repart des voisins
+            best_d, best_path, explored = math.inf, [], 0
+            for off in cg.offsets:
+                v = s + off
+                if cg.cost[v] == math.inf:
+                    continue
+                d, path, n = self._find_path(cg.cell(v), goal)
+                explored += n
+                if cg.cost[v] + d < best_d:
+                    best_d, best_path = cg.cost[v] + d, [start] + path
+            return best_d, best_path, explored
+        cs_, cg_ = self.cluster_of(s), self.cluster_of(g)
+        explored = 0
+
+        best: Tuple[float, List[int]] = (math.inf, [])
+        if cs_ == cg_:
+            dist, parent, n = self._local_search(cs_, s, target=g)
+            explored += n
+            if g in dist:
+                best = (dist[g], self._unwind(parent, s, g))
+
+        # arcs temporaires : départ -> transitions, transitions -> arrivée
+        dist_s, _, n = self._local_search(cs_, s)
+        explored += n
+        start_edges = {m: dist_s[m] for m in self.nodes[cs_] if m in dist_s and m != s}
+        dist_g, _, n = self._local_search(cg_, g, reverse=True)
+        explored += n
+        goal_edges = {m: dist_g[m] for m in self.nodes[cg_] if m in dist_g and m != g}
+
+        stride = cg.stride
+        gr, gc = divmod(g, stride)
+        g_cost = {s: 0.0}
+        parent: Dict[int, int] = {}
+        sr, sc = divmod(s, stride)
+        pq: List[Tuple[float, int]] = [(float(abs(sr - gr) + abs(sc - gc)), s)]
+        while pq:
+            f, u = heapq.heappop(pq)
+            gu = g_cost[u]
+            if u == g:
+                break
+            if f > gu + abs(u // stride - gr) + abs(u % stride - gc):
+                continue
+            explored += 1
+            succ = list(self.inter.get(u, {}).items())
+            if u == s:
+                succ += start_edges.items()
+            else:
+                succ += self._intra(self.cluster_of(u)).get(u, {}).items()
+            if u in goal_edges:
+                succ.append((g, goal_edges[u]))
+            for v, w in succ:
+                nd = gu + w
+                if nd < g_cost.get(v, math.inf):
+                    g_cost[v] = nd
+                    parent[v] = u
+                    vr, vc = divmod(v, stride)
+                    heapq.heappush(pq, (nd + abs(vr - gr) + abs(vc - gc), v))
+
+        if g_cost.get(g, math.inf) < best[0]:
+            cells, d, n = self._refine(self._unwind(parent, s, g))
+            explored += n
+            if d < best[0]:
+                best = (d, cells)
+        if best[0] == math.inf:
+            return math.inf, [], explored
+        return best[0], [cg.cell(i) for i in best[1]], explored
+
+    @staticmethod
+    def _unwind(parent: Dict[int, int], s: int, g: int) -> List[int]:
+        path = [g]
+        while path[-1] != s:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
+
+    def _refine(self, abstract: List[int]) -> Tuple[List[int], float, int]:
+        """
+        Raffinement dans le « couloir » des clusters traversés par le chemin
+        abstrait : A* limité à ces clusters. Le chemin abstrait y est inclus,
+        donc le résultat est au moins aussi bon, et souvent optimal.
+        Le couloir est un ensemble d'ids de cluster testé via `self.cid`
+        (calculé une fois par carte) : rien n'est alloué à la taille de la carte.
+        """
+        cg = self.grid
+        stride, cid = cg.stride, self.cid
+        allowed = set()
+        m = self.corridor_margin
+        for i in abstract:
+            cr, cc = self.cluster_of(i)
+            for dr in range(-m, m + 1):
+                for dc in range(-m, m + 1):
+                    if 0 <= cr + dr < self.n_cr and 0 <= cc + dc < self.n_cc:
+                        allowed.add((cr + dr) * self.n_cc + cc + dc)
+
+        cost, offsets = cg.cost, cg.offsets
+        s, g = abstract[0], abstract[-1]
+        gr, gc = divmod(g, stride)
+        dist = {s: 0.0}
+        parent: Dict[int, int] = {}
+        sr, sc = divmod(s, stride)
+        pq: List[Tuple[float, int]] = [(float(abs(sr - gr) + abs(sc - gc)), s)]
+        explored = 0
+        while pq:
+            f, u = heapq.heappop(pq)
+            du = dist[u]
+            if f > du + abs(u // stride - gr) + abs(u % stride - gc):
+                continue
+            explored += 1
+            if u == g:
+                break
+            for off in offsets:
+                v = u + off
+                if cid[v] not in allowed:
+                    continue
+                nd = du + cost[v]
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    parent[v] = u
+                    vr, vc = divmod(v, stride)
+                    heapq.heappush(pq, (nd + abs(vr - gr) + abs(vc - gc), v))
+        return self._unwind(parent, s, g), dist[g], explored
+
+
+def get_hierarchy(cache: LRUCache, map_key, cg: CompiledGrid, cluster_size: int = 16) -> Tuple[HierarchicalPathfinder, bool]:
+    """HPA* pré-calculé par (carte, taille de cluster), mis en cache."""
+    key = (map_key, cluster_size)
+    hpa = cache.get(key)
+    if hpa is None:
+        hpa = HierarchicalPathfinder(cg, cluster_size)
+        cache.put(key, hpa)
+        return hpa, False
+    with hpa.lock:
+        # même carte (même clé) : on ne revient jamais à une version plus ancienne ;
+        # find_path reconstruit si la version a changé sans passer par `sync`
+        if cg.version > hpa.grid.version:
+            hpa.grid = cg
+    return hpa, True
+
+
+# ---- Jump Point Search (grilles 4-connexes à coût uniforme) ----
+
+def uniform_cost(cg: CompiledGrid) -> Optional[float]:
+    """Coût commun à toutes les cases franchissables, ou None si les coûts varient."""
+    return cg.derived("uniform_cost", _uniform_cost)
+
+
+def _uniform_cost(cg: CompiledGrid) -> Optional[float]:
+    values = set(cg.cost)
+    values.discard(math.inf)
+    return values.pop() if len(values) == 1 else None
+
+
+def jump_tables(cg: CompiledGrid) -> Tuple[array, array, array, array]:
+    """
+    Tables JPS+ (droite, gauche, bas, haut) : pour chaque case, indice du prochain
+    point de saut ou du mur qui arrête le saut dans cette direction. Calculées une
+    fois par version de carte (O(cases)), elles rendent chaque saut O(1).
+    """
+    return cg.derived("jump_tables", _jump_tables)
+
+
+def _jump_tables(cg: CompiledGrid) -> Tuple[array, array, array, array]:
+    inf, cost, stride = math.inf, cg.cost, cg.stride
+    n = len(cost)
+    right, left, down, up = (array("i", bytes(4 * n)) for _ in range(4))
+    for r in range(1, cg.rows + 1):
+        base = r * stride
+        nxt = base + stride - 1
+        for v in range(base + stride - 2, base, -1):
+            right[v] = nxt
+            # voisin forcé : ouverture au-dessus / en dessous derrière un mur
+            if cost[v] == inf or (cost[v - stride] != inf and cost[v - 1 - stride] == inf) or \
+               (cost[v + stride] != inf and cost[v - 1 + stride] == inf):
+                nxt = v
+        nxt = base
+        for v in range(base + 1, base + stride - 1):
+            left[v] = nxt
+            if cost[v] == inf or (cost[v - stride] != inf and cost[v + 1 - stride] == inf) or \
+               (cost[v + stride] != inf and cost[v + 1 + stride] == inf):
+                nxt = v
+    last = cg.rows * stride
+    for c in range(1, cg.cols + 1):
+        # en vertical, une case d'où un saut horizontal trouve un point de saut est intéressante
+        nxt = last + stride + c
+        for v in range(last + c, c, -stride):
+            down[v] = nxt
+            if cost[v] == inf or cost[right[v]] != inf or cost[left[v]] != inf or \
+               (cost[v - 1] != inf and cost[v - 1 - stride] == inf) or \
+               (cost[v + 1] != inf and cost[v + 1 - stride] == inf):
+                nxt = v
+        nxt = c
+        for v in range(stride + c, last + stride + c, stride):
+            up[v] = nxt
+            if cost[v] == inf or cost[right[v]] != inf or cost[left[v]] != inf or \
+               (cost[v - 1] != inf and cost[v - 1 + stride] == inf) or \
+               (cost[v + 1] != inf and cost[v + 1 + stride] == inf):
+                nxt = v
+    return right, left, down, up
+
+
+def _jump(cost, tables, u: int, d: int, goal: int, stride: int) -> int:
+    """
+    Saute depuis u dans la direction d (±1 horizontal, ±stride vertical) jusqu'au
+    prochain point de saut ; -1 si on heurte un mur. La seule partie qui dépend de
+    la requête (le but) est testée ici, le reste vient des tables JPS+.
+    """
+    right, left, down, up = tables
+    if d == 1 or d == -1:
+        w = right[u] if d == 1 else left[u]
+        if goal // stride == u // stride and (u < goal <= w if d == 1 else w <= goal < u):
+            return goal
+        return -1 if cost[w] == math.inf else w
+    w = down[u] if d > 0 else up[u]
+    # case de la ligne du but sur la colonne : elle devient un point de saut si le
+    # but y est visible horizontalement
+    gv = goal // stride * stride + u % stride
+    if (u < gv <= w if d > 0 else w <= gv < u) and cost[gv] != math.inf:
+        if gv == goal or gv < goal <= right[gv] or left[gv] <= goal < gv:
+            return gv
+    return -1 if cost[w] == math.inf else w
+
+
+def jps_compiled(cg: CompiledGrid, start: int, goal: int) -> Tuple[float, List[int], int]:
+    """
+    Jump Point Search 4-connexe : seuls les points de saut entrent dans le tas,
+    les chemins symétriques sont élagués. Suppose un coût uniforme (sinon
+    utiliser `jps`, qui se replie sur A*).
+
+    Les sauts lisent les tables JPS+ de la carte (`jump_tables`). Leur construction
+    coûte plus cher qu'un A* isolé (~240 ms contre ~4 ms sur une carte ouverte
+    301x301) : JPS n'est rentable que sur une carte réutilisée (registre, cache
+    des grilles compilées), où la requête tombe alors à ~0,1 ms.
+    """
+    if cg.unreachable(start, goal):
+        return math.inf, [], 0
+    unit = uniform_cost(cg)
+    if unit is None:   # coûts variables (ou aucune case libre) : pas d'estimation fiable
+        unit = 1.0
+    cost, stride = cg.cost, cg.stride
+    tables = jump_tables(cg)
+    gr, gc = divmod(goal, stride)
+    g: Dict[int, float] = {start: 0.0}
+    parent: Dict[int, int] = {}
+    sr, sc = divmod(start, stride)
+    pq: List[Tuple[float, int]] = [(unit * (abs(sr - gr) + abs(sc - gc)), start)]
+    explored = 0
     while pq:
         f, u = heapq.heappop(pq)
+        gu = g[u]
+        ur, uc = divmod(u, stride)
+        if f > gu + unit * (abs(ur - gr) + abs(uc - gc)):
+            continue
         explored += 1
         if u == goal:
-            return g[u], reconstruct_path(parents, start, goal), explored
-        for v in neighbors(grid, u):
-            cost = grid[v[0]][v[1]]
-            assert cost is not None
-            tentative = g[u] + float(cost)
-            if tentative < g.get(v, math.inf):
-                g[v] = tentative
-                parents[v] = u
-                score = tentative + manhattan(v, goal)
-                heapq.heappush(pq, (score, v))
+            jumps = [u]
+            while u != start:
+                u = parent[u]
+                jumps.append(u)
+            jumps.reverse()
+            path = [start]
+            for a, b in zip(jumps, jumps[1:]):
+                step = (1 if b > a else -1) if a // stride == b // stride else (stride if b > a else -stride)
+                path.extend(range(a + step, b + step, step))
+            return gu, path, explored
+
+        p = parent.get(u)
+        if p is None:
+            directions = (-stride, stride, -1, 1)
+        elif p // stride == ur:
+            d = 1 if u > p else -1
+            directions = (-stride, stride, d)
+        else:
+            d = stride if u > p else -stride
+            directions = (-1, 1, d)
+        for d in directions:
+            v = _jump(cost, tables, u, d, goal, stride)
+            if v < 0:
+                continue
+            vr, vc = divmod(v, stride)
+            nd = gu + unit * (abs(vr - ur) + abs(vc - uc))
+            if nd < g.get(v, math.inf):
+                g[v] = nd
+                parent[v] = u
+                heapq.heappush(pq, (nd + unit * (abs(vr - gr) + abs(vc - gc)), v))
     return math.inf, [], explored
 
 
+def jps(grid, start: Coord, goal: Coord) -> Tuple[float, List[Coord], int, bool]:
+    """
+    JPS si tous les coûts franchissables sont égaux, sinon repli sur A*.
+    Renvoie (distance, chemin, explored, jps_utilisé).
+    """
+    cg = as_compiled(grid)
+    s, t = cg.index(start), cg.index(goal)
+    if uniform_cost(cg) is None:
+        dist, path, explored = astar_compiled(cg, s, t)
+        return dist, [cg.cell(i) for i in path], explored, False
+    dist, path, explored = jps_compiled(cg, s, t)
+    return dist, [cg.cell(i) for i in path], explored, True
+
+
+def make_maze(rows: int, cols: int, seed: int = 0) -> List[List[Optional[int]]]:
+    """Labyrinthe parfait (DFS itératif) : couloirs de coût 1, murs None."""
+    import random
+    rng = random.Random(seed)
+    grid: List[List[Optional[int]]] = [[None] * cols for _ in range(rows)]
+    stack = [(0, 0)]
+    grid[0][0] = 1
+    while stack:
+        r, c = stack[-1]
+        options = [(r + dr, c + dc, dr, dc) for dr, dc in ((0, 2), (2, 0), (0, -2), (-2, 0))
+                   if 0 <= r + dr < rows and 0 <= c + dc < cols and grid[r + dr][c + dc] is None]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc, dr, dc = rng.choice(options)
+        grid[r + dr // 2][c + dc // 2] = 1
+        grid[nr][nc] = 1
+        stack.append((nr, nc))
+    return grid
+
+
+def bench_jps(size: int = 301) -> None:
+    """Compare Dijkstra, A* et JPS (temps, nœuds explorés) sur carte ouverte et labyrinthe."""
+    import time
+    maps = {
+        "ouverte": [[1] * size for _ in range(size)],
+        "labyrinthe": make_maze(size, size),
+    }
+    for name, grid in maps.items():
+        cg = CompiledGrid.from_rows(grid)
+        s, t = cg.index((0, 0)), cg.index((size - 1, size - 1))
+        print(f"Carte {name} {size}x{size} :")
+        cg.unreachable(s, t)
+        uniform_cost(cg)
+        t0 = time.perf_counter()
+        jump_tables(cg)
+        print(f" - tables JPS+ construites en {(time.perf_counter() - t0) * 1000:.1f} ms (une fois par version)")
+        for label, fn in (("Dijkstra", dijkstra_compiled), ("A*", astar_compiled), ("JPS", jps_compiled)):
+            t0 = time.perf_counter()
+            dist, path, explored = fn(cg, s, t)
+            ms = (time.perf_counter() - t0) * 1000
+            print(f" - {label:<8} distance={dist:<7} explored={explored:<8} {ms:8.1f} ms")
+
+
+def bench_bidirectional(size: int = 301) -> None:
+    """Compare les recherches uni- et bidirectionnelles sur carte ouverte et labyrinthe (longs couloirs)."""
+    import time
+    mid = size // 2
+    maps = {
+        "ouverte": ([[1] * size for _ in range(size)], (mid, size // 4), (mid, 3 * size // 4)),
+        "labyrinthe": (make_maze(size, size), (0, 0), (size - 1, size - 1)),
+    }
+    variants = (
+        ("Dijkstra", dijkstra_compiled),
+        ("Bi-Dijkstra", lambda cg, s, t: bidirectional_compiled(cg, s, t)),
+        ("A*", astar_compiled),
+        ("Bi-A*", lambda cg, s, t: bidirectional_compiled(cg, s, t, heuristic=True)),
+    )
+    for name, (grid, a, b) in maps.items():
+        cg = CompiledGrid.from_rows(grid)
+        s, t = cg.index(a), cg.index(b)
+        print(f"Carte {name} {size}x{size}, {a} -> {b} :")
+        for label, fn in variants:
+            t0 = time.perf_counter()
+            dist, path, explored = fn(cg, s, t)
+            ms = (time.perf_counter() - t0) * 1000
+            print(f" - {label:<11} distance={dist:<7} explored={explored:<8} {ms:8.1f} ms")
+
+# ---- Registre de cartes (téléversées une fois, interrogées par map_id) ----
+
+class MapRegistry:
+    """
+    Cartes conservées côté serveur sous forme compilée, identifiées par un
+    `map_id`. Chaque modification incrémente la version de la carte, ce qui
+    invalide les caches dérivés (flow fields...).
+    Les modifications se font sur une copie, publiée d'un coup : une requête
+    qui tient déjà la grille la lit sans verrou et ne la voit jamais changer.
+    - storage_dir: si fourni, chaque carte est aussi écrite sur disque
+      (`<map_id>.grid`, format binaire de `CompiledGrid.to_bytes`) et
+      rechargée au démarrage.
+    """
+
+    def __init__(self, storage_dir: Optional[str] = None) -> None:
+        self.storage_dir = storage_dir
+        self.maps: Dict[str, CompiledGrid] = {}
+        self.lock = threading.Lock()
+        if storage_dir:
+            os.makedirs(storage_dir, exist_ok=True)
+            for name in os.listdir(storage_dir):
+                if name.endswith(".grid"):
+                    with open(os.path.join(storage_dir, name), "rb") as f:
+                        cg = CompiledGrid.from_bytes(f.read())
+                    cg.ensure_connectivity()
+                    self.maps[name[:-len(".grid")]] = cg
+
+    def _path(self, map_id: str) -> str:
+        return os.path.join(self.storage_dir, f"{map_id}.grid")
+
+    def save(self, map_id: str) -> None:
+        if not self.storage_dir:
+            return
+        tmp = self._path(map_id) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.maps[map_id].to_bytes())
+        os.replace(tmp, self._path(map_id))
+
+    def create(self, cg: CompiledGrid) -> str:
+        map_id = uuid.uuid4().hex[:12]
+        cg.ensure_connectivity()
+        with self.lock:
+            self.maps[map_id] = cg
+            self.save(map_id)
+        return map_id
+
+    def get(self, map_id: str) -> CompiledGrid:
+        cg = self.maps.get(map_id)
+        if cg is None:
+            raise KeyError(map_id)
+        return cg
+
+    def patch(self, map_id: str, changes: List[Tuple[Coord, Optional[float]]]) -> CompiledGrid:
+        """Applique [(cellule, coût | None), ...] ; renvoie la nouvelle grille publiée."""
+        with self.lock:
+            cg = self.get(map_id).copy()
+            for cell, _ in changes:
+                cg.index(cell)   # valide tout avant de modifier
+            for cell, value in changes:
+                cg.set_cost(cell, value)
+            self.maps[map_id] = cg
+            self.save(map_id)
+        return cg
+
+    def delete(self, map_id: str) -> bool:
+        with self.lock:
+            cg = self.maps.pop(map_id, None)
+            if cg is not None and self.storage_dir and os.path.exists(self._path(map_id)):
+                os.remove(self._path(map_id))
+        return cg is not None
+
+
+# ---- Requêtes de chemins en lot (pool de processus) ----
+
+def _hpa_compiled(cg: CompiledGrid, s: int, t: int, state: Optional[dict] = None) -> Tuple[float, List[int], int]:
+    hpa = state.get("hpa") if state is not None else None
+    if hpa is None:
+        hpa = HierarchicalPathfinder(cg)
+        if state is not None:
+            state["hpa"] = hpa
+    dist, path, explored = hpa.find_path(cg.cell(s), cg.cell(t))
+    return dist, [cg.index(c) for c in path], explored
+
+
+JPS_FALLBACK_LABEL = "A* (repli JPS : coûts non uniformes)"
+HPA_FALLBACK_LABEL = "A* (repli HPA* : carte trop petite)"
+# en dessous de ce nombre de cases, HPA* ne fait pas mieux qu'A* (voir HierarchicalPathfinder)
+HPA_MIN_CELLS = 2048 * 2048
+
+
+def use_hpa(cg: CompiledGrid) -> bool:
+    return cg.rows * cg.cols >= HPA_MIN_CELLS
+
+
+def _hpa_label(cg: CompiledGrid) -> str:
+    return "HPA*" if use_hpa(cg) else HPA_FALLBACK_LABEL
+
+
+def _jps_label(cg: CompiledGrid) -> str:
+    return "JPS" if uniform_cost(cg) is not None else JPS_FALLBACK_LABEL
+
+
+def _jps_or_astar(cg: CompiledGrid, s: int, t: int) -> Tuple[float, List[int], int]:
+    fn = jps_compiled if uniform_cost(cg) is not None else astar_compiled
+    return fn(cg, s, t)
+
+
+# nom -> (libellé, recherche sur indices compilés) ; le libellé peut dépendre de
+# la carte (fonction) quand l'algorithme se replie sur un autre
+PATH_ALGORITHMS = {
+    "dijkstra": ("Dijkstra", dijkstra_compiled),
+    "astar": ("A*", astar_compiled),
+    "bidijkstra": ("Dijkstra bidirectionnel", bidirectional_compiled),
+    "biastar": ("A* bidirectionnel", lambda cg, s, t: bidirectional_compiled(cg, s, t, heuristic=True)),
+    "jps": (_jps_label, _jps_or_astar),
+    "hpa": (_hpa_label, None),
+}
+
+
+def solve_queries(cg: CompiledGrid, queries: List[Tuple[int, int, str]],
+                  deadline: Optional[float] = None, state: Optional[dict] = None) -> List[Optional[tuple]]:
+    """
+    Résout [(start_idx, goal_idx, algorithme), ...] sur `cg`.
+    Chaque résultat vaut (distance, chemin en coordonnées, explored, libellé),
+    ou None si `deadline` (time.time()) est dépassée avant son tour.
+    """
+    out: List[Optional[tuple]] = []
+    for s, t, algo in queries:
+        if deadline is not None and time.time() > deadline:
+            out.append(None)
+            continue
+        label, fn = PATH_ALGORITHMS.get(algo, PATH_ALGORITHMS["dijkstra"])
+        if callable(label):
+            label = label(cg)
+        if fn is None and use_hpa(cg):
+            dist, path, explored = _hpa_compiled(cg, s, t, state)
+        elif fn is None:
+            dist, path, explored = astar_compiled(cg, s, t)
+        else:
+            dist, path, explored = fn(cg, s, t)
+        out.append((dist, [cg.cell(i) for i in path], explored, label))
+    return out
+
+
+_WORKER_STATE: dict = {}
+
+def _init_path_worker(data: bytes) -> None:
+    """Initialiseur des workers : la carte est décodée une seule fois par processus."""
+    cg = CompiledGrid.from_bytes(data)
+    cg.ensure_connectivity()
+    _WORKER_STATE.clear()
+    _WORKER_STATE["grid"] = cg
+
+def _solve_chunk(chunk: List[Tuple[int, int, str]], deadline: Optional[float]) -> List[Optional[tuple]]:
+    return solve_queries(_WORKER_STATE["grid"], chunk, deadline, _WORKER_STATE)
+
+
+class PathWorkerPool:
+    """
+    Pool de processus préchauffé avec UNE carte (instantané de `cg` à sa
+    version courante) : seules les requêtes (indices + nom d'algorithme)
+    transitent vers les workers, jamais la grille.
+
+    `run()` renvoie les résultats dans l'ordre des requêtes. Avec un budget,
+    les paquets non terminés à l'échéance sont annulés (ou ignorés par les
+    workers, qui consultent la même échéance) et marqués "timeout".
+
+    Le pool peut être évincé du cache pendant qu'une autre requête l'utilise :
+    chaque utilisateur le réserve (`acquire` / `release`) et `close()` ne
+    l'arrête qu'une fois le dernier utilisateur parti.
+    """
+
+    def __init__(self, cg: CompiledGrid, workers: Optional[int] = None) -> None:
+        self.version = cg.version
+        self.workers = workers or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._users = 0
+        self._closing = False
+        self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                            initializer=_init_path_worker,
+                                            initargs=(cg.to_bytes(),))
+
+    def run(self, queries: List[Tuple[int, int, str]], budget: Optional[float] = None) -> List[Optional[tuple]]:
+        if not queries:
+            return []
+        deadline = time.time() + budget if budget is not None else None
+        # quelques paquets par worker : peu d'allers-retours, charge équilibrée
+        size = max(1, -(-len(queries) // (self.workers * 4)))
+        chunks = [queries[i:i + size] for i in range(0, len(queries), size)]
+        futures = [self.executor.submit(_solve_chunk, chunk, deadline) for chunk in chunks]
+        done, not_done = wait(futures, timeout=budget)
+        for f in not_done:
+            f.cancel()
+        results: List[Optional[tuple]] = []
+        for chunk, f in zip(chunks, futures):
+            if f in done:
+                results.extend(f.result())
+            else:
+                results.extend([None] * len(chunk))
+        return results
+
+    def acquire(self) -> "PathWorkerPool":
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("Pool de pathfinding déjà fermé.")
+            self._users += 1
+        return self
+
+    def release(self) -> None:
+        with self._lock:
+            self._users -= 1
+            idle = self._closing and self._users == 0
+        if idle:
+            self.executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        """Arrête le pool dès qu'il n'a plus d'utilisateur (tout de suite s'il est libre)."""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            idle = self._users == 0
+        if idle:
+            # les paquets déjà lancés se terminent en arrière-plan
+            self.executor.shutdown(wait=False)
+
+
+def get_path_pool(cache: LRUCache, map_key, cg: CompiledGrid, workers: Optional[int] = None) -> Tuple[PathWorkerPool, bool]:
+    """
+    Pool préchauffé par carte ; recréé si la carte a changé de version.
+    Le pool renvoyé est réservé : l'appelant doit le rendre avec `release()`.
+    Appeler sous un verrou commun à tous les appelants du même cache.
+    """
+    pool = cache.get(map_key)
+    if pool is not None and pool.version == cg.version:
+        return pool.acquire(), True
+    if pool is not None:
+        pool.close()
+    pool = PathWorkerPool(cg, workers)
+    cache.put(map_key, pool)
+    return pool.acquire(), False
+
+
 # ---- DSU for cycles (guild merges) ----
 
 Edge = Tuple[int, int]
 
 class DisjointSet:
+    """
+    Union-find sur tableaux plats (`array`) : parent, rang et taille de
+    composante. `find` est itératif avec compression par demi-chemin
+    (path halving) : pas de récursion, donc pas de limite de profondeur.
+    """
+
     def __init__(self, size: int) -> None:
-        self.parent = list(range(size))
-        self.rank = [0] * size
+        self.parent = array("l", range(size))
+        self.rank = array("B", bytes(size))
+        self.size = array("l", [1]) * size
+        self.components = size
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def copy(self) -> "DisjointSet":
+        dsu = DisjointSet(0)
+        dsu.parent, dsu.rank, dsu.size = array("l", self.parent), array("B", self.rank), array("l", self.size)
+        dsu.components = self.components
+        return dsu
 
     def find(self, x: int) -> int:
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[x])
-        return self.parent[x]
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
 
     def union(self, x: int, y: int) -> bool:
         rx, ry = self.find(x), self.find(y)
         if rx == ry:
             return False
         if self.rank[rx] < self.rank[ry]:
-            self.parent[rx] = ry
-        elif self.rank[rx] > self.rank[ry]:
-            self.parent[ry] = rx
-        else:
-            self.parent[ry] = rx
+            rx, ry = ry, rx
+        self.parent[ry] = rx
+        self.size[rx] += self.size[ry]
+        if self.rank[rx] == self.rank[ry]:
             self.rank[rx] += 1
+        self.components -= 1
         return True
 
+    def connected(self, x: int, y: int) -> bool:
+        return self.find(x) == self.find(y)
+
+    def component_size(self, x: int) -> int:
+        return self.size[self.find(x)]
+
+    def add(self) -> int:
+        """Ajoute un singleton et renvoie son id."""
+        idx = len(self.parent)
+        self.parent.append(idx)
+        self.rank.append(0)
+        self.size.append(1)
+        self.components += 1
+        return idx
+
 def detect_cycle_with_dsu(edges: List[Edge], n: int) -> bool:
     dsu = DisjointSet(n)
     for (u, v) in edges:
@@ -111,8 +1455,289 @@ def detect_cycle_with_dsu(edges: List[Edge], n: int) -> bool:
     return False
 
 
+class GuildGraph:
+    """
+    Graphe des guildes persistant entre les requêtes : les fusions arrivent
+    par lots et chaque requête (même guilde, taille, cycle) coûte un `find`,
+    soit un temps quasi constant.
+
+    Les ids de guilde sont quelconques (normalisés en chaîne) et reçoivent
+    un index dense à leur première apparition. Une fusion entre deux guildes
+    déjà reliées ferme un cycle : elle est comptée et la composante est
+    marquée cyclique.
+    """
+
+    MAGIC = b"GDSU"
+    HEADER = struct.Struct("<4sBqqq")   # magic, format, nœuds, arêtes, cycles
+    FORMAT = 2
+
+    def __init__(self) -> None:
+        self.dsu = DisjointSet(0)
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.cyclic = array("B")   # par racine : la composante contient un cycle
+        self.edges = 0
+        self.cycles = 0
+        self.largest = 0   # les composantes ne font que grossir : maximum tenu à jour
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _node(self, guild) -> int:
+        key = str(guild)
+        idx = self.index.get(key)
+        if idx is None:
+            idx = self.dsu.add()
+            self.index[key] = idx
+            self.ids.append(key)
+            self.cyclic.append(0)
+            self.largest = max(self.largest, 1)
+        return idx
+
+    def merge(self, a, b) -> bool:
+        """Fusionne les guildes de `a` et `b` ; False si elles l'étaient déjà (cycle)."""
+        x, y = self._node(a), self._node(b)
+        self.edges += 1
+        rx, ry = self.dsu.find(x), self.dsu.find(y)
+        if rx == ry:
+            self.cycles += 1
+            self.cyclic[rx] = 1
+            return False
+        self.dsu.union(rx, ry)
+        root = self.dsu.find(rx)
+        self.cyclic[root] = self.cyclic[rx] | self.cyclic[ry]
+        self.largest = max(self.largest, self.dsu.size[root])
+        return True
+
+    def merge_batch(self, merges) -> List[bool]:
+        return [self.merge(a, b) for a, b in merges]
+
+    def same_guild(self, a, b) -> bool:
+        x, y = self.index.get(str(a)), self.index.get(str(b))
+        if x is None or y is None:
+            return str(a) == str(b)
+        return self.dsu.connected(x, y)
+
+    def would_cycle(self, a, b) -> bool:
+        """True si fusionner `a` et `b` fermerait un cycle."""
+        return self.same_guild(a, b)
+
+    def component_size(self, guild) -> int:
+        idx = self.index.get(str(guild))
+        return 1 if idx is None else self.dsu.component_size(idx)
+
+    def has_cycle(self, guild=None) -> bool:
+        """Cycle dans la composante de `guild`, ou n'importe où si `guild` est None."""
+        if guild is None:
+            return self.cycles > 0
+        idx = self.index.get(str(guild))
+        return idx is not None and bool(self.cyclic[self.dsu.find(idx)])
+
+    def stats(self) -> dict:
+        return {
+            "guilds": len(self.ids),
+            "components": self.dsu.components,
+            "largest_component": self.largest,
+            "merges": self.edges,
+            "cycles": self.cycles,
+        }
+
+    # -- snapshot binaire : en-tête + tableaux bruts + longueurs des ids (uint32)
+    # + ids UTF-8 concaténés (un id peut contenir n'importe quel caractère) --
+
+    def to_bytes(self) -> bytes:
+        dsu = self.dsu
+        encoded = [key.encode("utf-8") for key in self.ids]
+        return b"".join((
+            self.HEADER.pack(self.MAGIC, self.FORMAT, len(self.ids), self.edges, self.cycles),
+            dsu.parent.tobytes(), dsu.size.tobytes(), dsu.rank.tobytes(), self.cyclic.tobytes(),
+            array("I", map(len, encoded)).tobytes(),
+            b"".join(encoded),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GuildGraph":
+        if len(data) < cls.HEADER.size:
+            raise ValueError("Snapshot de guildes tronqué.")
+        magic, fmt, n, edges, cycles = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or fmt != cls.FORMAT:
+            raise ValueError("Format de snapshot de guildes inconnu.")
+        if n < 0:
+            raise ValueError("Snapshot de guildes incohérent.")
+        g = cls()
+        dsu = g.dsu
+        pos = cls.HEADER.size
+        lengths = array("I")
+        for arr in (dsu.parent, dsu.size, dsu.rank, g.cyclic, lengths):
+            end = pos + n * arr.itemsize
+            if end > len(data):
+                raise ValueError("Snapshot de guildes tronqué.")
+            arr.frombytes(data[pos:end])
+            pos = end
+        if pos + sum(lengths) != len(data):
+            raise ValueError("Snapshot de guildes incohérent.")
+        for length in lengths:
+            g.ids.append(data[pos:pos + length].decode("utf-8"))
+            pos += length
+        if len(g.ids) != n or any(not 0 <= p < n for p in dsu.parent):
+            raise ValueError("Snapshot de guildes incohérent.")
+        g.index = {key: i for i, key in enumerate(g.ids)}
+        if len(g.index) != n:
+            raise ValueError("Snapshot de guildes incohérent (ids en double).")
+        roots = [i for i in range(n) if dsu.parent[i] == i]
+        dsu.components = len(roots)
+        g.largest = max((dsu.size[i] for i in roots), default=0)
+        g.edges, g.cycles = edges, cycles
+        return g
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "GuildGraph":
+        """Relit un snapshot ; ValueError si le fichier est illisible (à l'appelant de décider)."""
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+# ---- Composantes connexes (rejet immédiat des objectifs inaccessibles) ----
+
+class ConnectivityIndex:
+    """
+    Étiquette chaque case franchissable d'une CompiledGrid par un id de
+    composante (flood fill), pour refuser en O(1) un départ et une arrivée
+    situés dans des zones non reliées.
+
+    Mises à jour incrémentales :
+    - mur retiré : la case rejoint ses voisines par `DisjointSet.union` ;
+    - mur ajouté : BFS entrelacés depuis les voisins de la case ; dès que deux
+      parcours se touchent ils fusionnent, et un parcours épuisé sans avoir
+      rejoint les autres est un morceau détaché, ré-étiqueté seul. Le coût est
+      proportionnel aux plus petits morceaux, pas à la carte.
+    """
+
+    def __init__(self, cg: CompiledGrid) -> None:
+        self.grid = cg
+        self.labels = array("l", [-1]) * cg.size
+        self.dsu = DisjointSet(0)
+        cost, offsets, labels = cg.cost, cg.offsets, self.labels
+        inf = math.inf
+        for r in range(cg.rows):
+            base = (r + 1) * cg.stride + 1
+            for idx in range(base, base + cg.cols):
+                if labels[idx] >= 0 or cost[idx] == inf:
+                    continue
+                label = self.dsu.add()
+                labels[idx] = label
+                stack = [idx]
+                while stack:
+                    u = stack.pop()
+                    for off in offsets:
+                        v = u + off
+                        if labels[v] < 0 and cost[v] != inf:
+                            labels[v] = label
+                            stack.append(v)
+
+    def copy(self, cg: CompiledGrid) -> "ConnectivityIndex":
+        """Même étiquetage, rattaché à `cg` (copie de la grille indexée)."""
+        index = ConnectivityIndex.__new__(ConnectivityIndex)
+        index.grid = cg
+        index.labels = array("l", self.labels)
+        index.dsu = self.dsu.copy()
+        return index
+
+    def component(self, idx: int) -> int:
+        label = self.labels[idx]
+        return self.dsu.find(label) if label >= 0 else -1
+
+    def connected(self, start: int, goal: int) -> bool:
+        if start == goal:
+            return True
+        target = self.component(goal)
+        if target < 0:
+            return False
+        if self.labels[start] >= 0:
+            return self.component(start) == target
+        # départ sur un mur : il suffit qu'un voisin soit dans la bonne composante
+        return any(self.component(start + off) == target for off in self.grid.offsets)
+
+    def cell_changed(self, idx: int, walkable: bool) -> None:
+        if walkable:
+            self._open(idx)
+        else:
+            self._close(idx)
+
+    def _open(self, idx: int) -> None:
+        label = self.dsu.add()
+        self.labels[idx] = label
+        for off in self.grid.offsets:
+            other = self.labels[idx + off]
+            if other >= 0:
+                self.dsu.union(label, other)
+
+    def _close(self, idx: int) -> None:
+        labels = self.labels
+        labels[idx] = -1
+        seeds = [idx + off for off in self.grid.offsets if labels[idx + off] >= 0]
+        if len(seeds) < 2:
+            return
+
+        offsets = self.grid.offsets
+        owner = {s: i for i, s in enumerate(seeds)}
+        visited: List[List[int]] = [[s] for s in seeds]
+        frontiers = [deque([s]) for s in seeds]
+        group = list(range(len(seeds)))    # mini union-find entre parcours
+
+        def root(i: int) -> int:
+            while group[i] != i:
+                group[i] = group[group[i]]
+                i = group[i]
+            return i
+
+        alive = set(range(len(seeds)))    # racines de groupes non résolus
+        while len(alive) > 1:
+            progressed = False
+            for i in range(len(seeds)):
+                if not frontiers[i] or root(i) not in alive:
+                    continue
+                progressed = True
+                u = frontiers[i].popleft()
+                for off in offsets:
+                    v = u + off
+                    if labels[v] < 0:
+                        continue
+                    j = owner.get(v)
+                    if j is None:
+                        owner[v] = i
+                        visited[i].append(v)
+                        frontiers[i].append(v)
+                    else:
+                        ri, rj = root(i), root(j)
+                        if ri != rj:
+                            group[rj] = ri
+                            alive.discard(rj)
+            # un groupe dont tous les parcours sont épuisés est un morceau isolé
+            for r in list(alive):
+                members = [i for i in range(len(seeds)) if root(i) == r]
+                if len(alive) > 1 and all(not frontiers[i] for i in members):
+                    label = self.dsu.add()
+                    for i in members:
+                        for v in visited[i]:
+                            labels[v] = label
+                    alive.discard(r)
+            if not progressed:
+                break
+
+
 if __name__ == "__main__":
     grid = [[1,1,1],[1,2,1],[1,1,1]]
     start, goal = (0,0), (2,2)
     dist, path, explored = astar(grid, start, goal)
-    print("dist:", dist, "path:", path, "explored:", explored)
\ No newline at end of file
+    print("dist:", dist, "path:", path, "explored:", explored)
+
+    if "--bench" in sys.argv:
+        bench_jps()
+        bench_bidirectional()
\ No newline at end of file
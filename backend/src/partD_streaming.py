@@ -1,8 +1,91 @@
+import heapq
+import io
+import json
+import math
 import random
-import hashlib
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+import numpy as np
 
 # ---------- D1 — Reservoir Sampling ----------
 
+def _open_unit(rng: random.Random) -> float:
+    """Tirage uniforme dans ]0, 1[ (log défini)."""
+    u = rng.random()
+    while u == 0.0:
+        u = rng.random()
+    return u
+
+
+class ReservoirSampler:
+    """
+    Échantillon uniforme de taille k sur un flux de longueur inconnue,
+    alimenté élément par élément (`add`) ou par morceaux (`extend`).
+
+    Algorithme L (Li, 1994) : au lieu d'un tirage par élément, on tire
+    directement le nombre d'éléments à sauter avant le prochain remplacement,
+    soit O(k log(n/k)) tirages au total. Le générateur est une instance
+    `random.Random` privée : aucun état global partagé entre requêtes.
+    """
+
+    def __init__(self, k: int, seed=None) -> None:
+        self.k = max(0, int(k))
+        self.rng = random.Random(seed)
+        self.reservoir: list = []
+        self.n = 0
+        self._w = 1.0
+        self._skip = 0
+
+    def _next_jump(self) -> None:
+        rng = self.rng
+        self._w *= math.exp(math.log(_open_unit(rng)) / self.k)
+        self._skip = int(math.log(_open_unit(rng)) / math.log1p(-self._w)) if self._w < 1.0 else 0
+
+    def add(self, item) -> None:
+        self.n += 1
+        if len(self.reservoir) < self.k:
+            self.reservoir.append(item)
+            if len(self.reservoir) == self.k:
+                self._next_jump()
+        elif self.k:
+            if self._skip:
+                self._skip -= 1
+                return
+            self.reservoir[self.rng.randrange(self.k)] = item
+            self._next_jump()
+
+    def extend(self, items) -> "ReservoirSampler":
+        it = iter(items)
+        while len(self.reservoir) < self.k:
+            for item in islice(it, 1):
+                self.add(item)
+                break
+            else:
+                return self
+        if not self.k:
+            self.n += sum(1 for _ in it)
+            return self
+        while True:
+            # les éléments sautés sont consommés sans tirage
+            skipped = sum(1 for _ in islice(it, self._skip))
+            self.n += skipped
+            self._skip -= skipped
+            if self._skip:
+                return self    # flux épuisé pendant le saut
+            for item in islice(it, 1):
+                self.add(item)
+                break
+            else:
+                return self
+
+    @property
+    def sample(self) -> list:
+        return list(self.reservoir)
+
+
 def reservoir_sampling(stream, k, seed=None):
     """
     stream: iterable (list d'entiers/strings/etc.)
@@ -13,56 +96,532 @@ def reservoir_sampling(stream, k, seed=None):
     """
     if k <= 0:
         return []
-    if seed is not None:
-        random.seed(seed)
-
-    reservoir = []
-    i = 0
-    for item in stream:
-        if i < k:
-            reservoir.append(item)
-        else:
-            j = random.randint(0, i)
-            if j < k:
-                reservoir[j] = item
-        i += 1
-    return reservoir
+    return ReservoirSampler(k, seed).extend(stream).sample
+
+
+class WeightedReservoirSampler:
+    """
+    Échantillon pondéré de taille k (sans remise) : un élément de poids w
+    reçoit la clé u^(1/w) et on garde les k plus grandes (Efraimidis-Spirakis).
+
+    Variante A-ExpJ : après chaque insertion on tire le « poids cumulé » à
+    franchir avant le prochain remplacement, donc O(k log(n/k)) tirages.
+    Les clés sont manipulées en logarithme (log(u) / w) pour rester stables
+    avec des poids très grands ou très petits. Les poids <= 0 sont ignorés.
+    """
+
+    def __init__(self, k: int, seed=None) -> None:
+        self.k = max(0, int(k))
+        self.rng = random.Random(seed)
+        self.heap: list = []   # tas-min de (log_clé, rang d'arrivée, élément)
+        self.n = 0
+        self._x = 0.0
+
+    def _next_jump(self) -> None:
+        t = self.heap[0][0]
+        self._x = math.log(_open_unit(self.rng)) / t if t < 0 else math.inf
+
+    def add(self, item, weight: float) -> None:
+        self.n += 1
+        if weight <= 0 or not self.k:
+            return
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, (math.log(_open_unit(self.rng)) / weight, self.n, item))
+            if len(self.heap) == self.k:
+                self._next_jump()
+            return
+        self._x -= weight
+        if self._x > 0:
+            return
+        # la nouvelle clé est tirée au-dessus du seuil courant
+        threshold = self.heap[0][0]
+        u = self.rng.uniform(math.exp(weight * threshold), 1.0)
+        key = math.log(u) / weight if u > 0 else threshold
+        heapq.heapreplace(self.heap, (max(key, threshold), self.n, item))
+        self._next_jump()
+
+    def extend(self, pairs) -> "WeightedReservoirSampler":
+        for item, weight in pairs:
+            self.add(item, float(weight))
+        return self
+
+    @property
+    def sample(self) -> list:
+        """Éléments retenus, du plus « prioritaire » au moins prioritaire."""
+        return [item for _, _, item in sorted(self.heap, reverse=True)]
+
+
+def weighted_reservoir_sampling(pairs, k, seed=None):
+    """pairs: iterable de (élément, poids). Retourne au plus k éléments tirés selon leurs poids."""
+    if k <= 0:
+        return []
+    return WeightedReservoirSampler(k, seed).extend(pairs).sample
 
 
 # ---------- D2 — Count-Min Sketch ----------
 
+_MASK64 = (1 << 64) - 1
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+
+
+def _fmix64(h: int) -> int:
+    # finaliseur de MurmurHash3 : répartit les bits de FNV sur tout le mot
+    h ^= h >> 33
+    h = (h * 0xFF51AFD7ED558CCD) & _MASK64
+    h ^= h >> 33
+    h = (h * 0xC4CEB9FE1A85EC53) & _MASK64
+    return h ^ (h >> 33)
+
+
+def _splitmix64(x: int) -> int:
+    z = (x + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def hash64(key) -> int:
+    """
+    Empreinte 64 bits d'une clé : FNV-1a + fmix64 pour les chaînes / octets,
+    splitmix64 pour les entiers. Même résultat que `hash64_many`.
+    """
+    if isinstance(key, (int, np.integer)) and not isinstance(key, bool):
+        return _splitmix64(int(key) & _MASK64)
+    data = key if isinstance(key, bytes) else str(key).encode("utf-8")
+    return _fmix64(_fnv1a(data))
+
+
+def _fnv1a(data: bytes, h: int = _FNV_OFFSET) -> int:
+    # tous les octets comptent, NUL compris : "a" et "a\0" sont deux clés distinctes
+    for b in data:
+        h = ((h ^ b) * _FNV_PRIME) & _MASK64
+    return h
+
+
+def hash64_many(keys) -> np.ndarray:
+    """
+    Version vectorisée de `hash64` : renvoie un tableau uint64, toujours égal
+    à `[hash64(k) for k in keys]`.
+    - entiers (tableau NumPy d'entiers, ou int dans une liste / un tableau
+      d'objets) : splitmix64 colonne par colonne ;
+    - autres clés : encodées en UTF-8 bout à bout dans un seul tampon d'octets
+      (mémoire bornée par la taille totale des clés) ; FNV-1a avance d'un octet
+      par tour pour toutes les clés encore assez longues.
+    """
+    if isinstance(keys, np.ndarray) and keys.dtype.kind in "iu":
+        return _splitmix64_many(keys.astype(np.uint64))
+    if isinstance(keys, np.ndarray) and keys.dtype.kind == "S":
+        return _fnv64_many(keys)
+    keys = keys.tolist() if isinstance(keys, np.ndarray) else list(keys)
+    is_int = np.fromiter((isinstance(k, (int, np.integer)) and not isinstance(k, bool) for k in keys),
+                         dtype=bool, count=len(keys))
+    if not is_int.any():
+        return _fnv64_many(keys)
+    out = np.empty(len(keys), dtype=np.uint64)
+    ints = np.fromiter((int(k) & _MASK64 for k, i in zip(keys, is_int) if i), dtype=np.uint64)
+    out[is_int] = _splitmix64_many(ints)
+    if not is_int.all():
+        out[~is_int] = _fnv64_many([k for k, i in zip(keys, is_int) if not i])
+    return out
+
+
+def _splitmix64_many(z: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        z = z + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+# en dessous de ce nombre de clés encore en cours, la boucle NumPy coûte plus
+# cher par octet que la boucle Python : les dernières (longues) clés finissent une à une
+_FNV_VECTOR_MIN = 16
+
+
+def _fnv64_many(keys) -> np.ndarray:
+    # un tableau 'S' perd ses NUL finaux à la lecture : on hache les valeurs telles que NumPy les rend
+    keys = keys.tolist() if isinstance(keys, np.ndarray) else keys
+    try:
+        encoded = list(map(str.encode, keys))   # cas courant : que des chaînes
+    except TypeError:
+        encoded = [k if isinstance(k, bytes) else str(k).encode("utf-8") for k in keys]
+    n = len(encoded)
+    h = np.full(n, _FNV_OFFSET, dtype=np.uint64)
+    if n == 0:
+        return h
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=n)
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    starts = np.zeros(n, dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    # clés triées par longueur décroissante : au tour j, les clés vivantes forment un préfixe
+    order = np.argsort(-lengths, kind="stable")
+    lengths, starts = lengths[order], starts[order]
+    alive = np.searchsorted(-lengths, -np.arange(int(lengths[0]) + 1), side="left")
+    prime = np.uint64(_FNV_PRIME)
+    j = 0
+    with np.errstate(over="ignore"):
+        while j < lengths[0] and alive[j] >= _FNV_VECTOR_MIN:
+            m = alive[j]
+            h[:m] = (h[:m] ^ buf[starts[:m] + j]) * prime
+            j += 1
+        for i in range(int(alive[j]) if j < lengths[0] else 0):
+            data = encoded[order[i]]
+            h[i] = _fnv1a(data[j:], int(h[i]))
+        h ^= h >> np.uint64(33)
+        h *= np.uint64(0xFF51AFD7ED558CCD)
+        h ^= h >> np.uint64(33)
+        h *= np.uint64(0xC4CEB9FE1A85EC53)
+        h ^= h >> np.uint64(33)
+    out = np.empty(n, dtype=np.uint64)
+    out[order] = h
+    return out
+
+
 class CountMinSketch:
     """
-    Implémentation simple de CMS.
+    Count-Min Sketch sur tableau NumPy 2-D (depth x width).
 
     - depth (d): nb de fonctions de hachage (lignes)
     - width (w): largeur de chaque ligne (colonnes)
-    - add(key, count): augmente la fréquence approx
-    - estimate(key): estimation avec biais positif (min des compteurs)
+    - add(key, count) / add_many(keys, counts): augmente la fréquence approx
+    - estimate(key) / estimate_many(keys): estimation avec biais positif
+      (min des compteurs)
+    - conservative: mise à jour conservatrice (on ne relève que les compteurs
+      inférieurs à la nouvelle estimation) : même garantie, moins de biais.
+    - dtype: np.uint64 (défaut) ou np.uint32 pour diviser la mémoire par deux.
+
+    Une seule empreinte 64 bits par clé ; les d colonnes en sont dérivées
+    par double hachage : col_i = (h1 + i * h2) mod w.
+    Les entiers et leurs écritures en chaîne sont des clés distinctes.
     """
 
-    def __init__(self, depth: int, width: int):
+    def __init__(self, depth: int, width: int, conservative: bool = False, dtype=np.uint64):
         assert depth > 0 and width > 0, "depth/width doivent être > 0"
         self.d = depth
         self.w = width
-        self.table = [[0] * width for _ in range(depth)]
+        self.conservative = conservative
+        self.table = np.zeros((depth, width), dtype=dtype)
+        self._rows = np.arange(depth, dtype=np.uint64)[:, None]
 
-    def _hash(self, i: int, key: str) -> int:
-        # h_i(key) = blake2b(str(i) + "|" + key) mod width
-        m = hashlib.blake2b(digest_size=8)
-        m.update(f"{i}|{key}".encode("utf-8"))
-        return int.from_bytes(m.digest(), "big") % self.w
+    def _columns(self, h: int) -> list:
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.w for i in range(self.d)]
+
+    def _columns_many(self, h: np.ndarray) -> np.ndarray:
+        """Colonnes (d, n) à partir des empreintes uint64 du lot."""
+        h1 = h & np.uint64(0xFFFFFFFF)
+        h2 = (h >> np.uint64(32)) | np.uint64(1)
+        with np.errstate(over="ignore"):
+            return ((h1 + self._rows * h2) % np.uint64(self.w)).astype(np.intp)
 
     def add(self, key: str, count: int = 1):
         if count <= 0:
             return
-        for i in range(self.d):
-            col = self._hash(i, key)
-            self.table[i][col] += count
+        cols = self._columns(hash64(key))
+        rows = range(self.d)
+        if self.conservative:
+            target = min(int(self.table[i, c]) for i, c in zip(rows, cols)) + count
+            for i, c in zip(rows, cols):
+                if self.table[i, c] < target:
+                    self.table[i, c] = target
+        else:
+            for i, c in zip(rows, cols):
+                self.table[i, c] += count
 
     def estimate(self, key: str) -> int:
-        vals = []
-        for i in range(self.d):
-            col = self._hash(i, key)
-            vals.append(self.table[i][col])
-        return min(vals) if vals else 0
+        cols = self._columns(hash64(key))
+        return int(min(self.table[i, c] for i, c in enumerate(cols)))
+
+    def add_many(self, keys, counts=None):
+        """
+        Ajout vectorisé d'un lot. `counts` : None (1 par clé), un entier ou un
+        tableau de même longueur que `keys` ; les comptes <= 0 sont ignorés.
+        En mode conservateur les doublons du lot sont d'abord regroupés.
+        """
+        if not isinstance(keys, np.ndarray):
+            keys = list(keys)
+        n = len(keys)
+        if n == 0:
+            return
+        counts = np.broadcast_to(np.asarray(1 if counts is None else counts, dtype=np.int64), (n,))
+        keep = counts > 0
+        if not keep.all():
+            keys = np.asarray(keys)[keep] if isinstance(keys, np.ndarray) else [k for k, ok in zip(keys, keep) if ok]
+            counts = counts[keep]
+            if len(counts) == 0:
+                return
+        h = hash64_many(keys)
+        flat = self.table.reshape(-1)
+        offsets = (np.arange(self.d, dtype=np.intp) * self.w)[:, None]
+        if self.conservative:
+            h, inverse = np.unique(h, return_inverse=True)
+            counts = np.bincount(inverse.ravel(), weights=counts).astype(np.int64)
+            idx = self._columns_many(h) + offsets
+            target = flat[idx].min(axis=0).astype(np.int64) + counts
+            np.maximum.at(flat, idx.ravel(), np.broadcast_to(target, idx.shape).ravel().astype(flat.dtype))
+        else:
+            idx = self._columns_many(h) + offsets
+            np.add.at(flat, idx.ravel(), np.broadcast_to(counts, idx.shape).ravel().astype(flat.dtype))
+
+    def estimate_many(self, keys) -> np.ndarray:
+        """Estimations vectorisées (tableau d'entiers, dans l'ordre des clés)."""
+        if not isinstance(keys, np.ndarray):
+            keys = list(keys)
+        if len(keys) == 0:
+            return np.zeros(0, dtype=self.table.dtype)
+        cols = self._columns_many(hash64_many(keys))
+        return self.table[np.arange(self.d)[:, None], cols].min(axis=0)
+
+    def merge(self, other: "CountMinSketch") -> None:
+        """Ajoute les compteurs d'un autre sketch de mêmes dimensions (autre worker...)."""
+        if self.table.shape != other.table.shape:
+            raise ValueError("Sketches de dimensions différentes : fusion impossible.")
+        self.table += other.table.astype(self.table.dtype)
+
+
+# ---------- D3 — Heavy hitters (top-K fréquents, fenêtre glissante / décroissance) ----------
+
+class HeavyHitters:
+    """
+    Top-K des clés les plus fréquentes sur un flux, sans parcourir les clés :
+    un CMS estime les fréquences et un tas-min borné (`capacity`) garde les
+    candidats ; une clé n'entre que si son estimation dépasse le minimum.
+
+    Le temps est découpé en `buckets` sous-sketches qui tournent toutes les
+    `window_seconds / buckets` secondes :
+    - decay=None : fenêtre glissante, le plus ancien sous-sketch est oublié ;
+    - decay=0.5 (par ex.) : un sous-sketch d'âge a pèse decay**a
+      (décroissance exponentielle tronquée à `buckets` tranches).
+    Sans `window_seconds`, un seul sketch cumule tout l'historique.
+    """
+
+    def __init__(self, depth: int = 5, width: int = 2000, capacity: int = 100,
+                 window_seconds: float | None = None, buckets: int = 1,
+                 decay: float | None = None, conservative: bool = False, clock=time.time):
+        if capacity <= 0:
+            raise ValueError("capacity doit être > 0")
+        if decay is not None and not 0 < decay <= 1:
+            raise ValueError("decay doit être dans ]0, 1]")
+        self.depth, self.width = depth, width
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self.buckets = max(1, int(buckets)) if window_seconds else 1
+        self.bucket_seconds = window_seconds / self.buckets if window_seconds else None
+        self.decay = decay
+        self.conservative = conservative
+        self.clock = clock
+        self.sketches: deque = deque([self._new_sketch()])   # [0] = tranche courante
+        self.bucket_start = clock()
+        self.candidates: dict = {}
+        self.heap: list = []
+        self.total = 0
+
+    def _new_sketch(self) -> CountMinSketch:
+        return CountMinSketch(self.depth, self.width, conservative=self.conservative)
+
+    # -- rotation des tranches --
+
+    def rotate(self, now: float | None = None) -> int:
+        """Fait tourner les tranches écoulées ; renvoie le nombre de rotations."""
+        if self.bucket_seconds is None:
+            return 0
+        now = self.clock() if now is None else now
+        steps = int((now - self.bucket_start) // self.bucket_seconds)
+        if steps <= 0:
+            return 0
+        for _ in range(min(steps, self.buckets)):
+            self.sketches.appendleft(self._new_sketch())
+            if len(self.sketches) > self.buckets:
+                self.sketches.pop()
+        self.bucket_start += steps * self.bucket_seconds
+        self._refresh()
+        return steps
+
+    def _refresh(self) -> None:
+        """Réévalue les candidats (les anciennes tranches ont perdu du poids)."""
+        if not self.candidates:
+            return
+        keys = list(self.candidates)
+        values = self.estimate_many(keys, rotate=False)
+        self.candidates = {k: v for k, v in zip(keys, values.tolist()) if v > 0}
+        self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self.heap = [(v, k) for k, v in self.candidates.items()]
+        heapq.heapify(self.heap)
+
+    # -- estimations --
+
+    def weights(self) -> list:
+        return [self.decay ** age if self.decay else 1.0 for age in range(len(self.sketches))]
+
+    def estimate_many(self, keys, rotate: bool = True) -> np.ndarray:
+        if rotate:
+            self.rotate()
+        keys = keys if isinstance(keys, np.ndarray) else list(keys)
+        if self.decay is None:
+            total = np.zeros(len(keys), dtype=np.int64)
+            for sk in self.sketches:
+                total += sk.estimate_many(keys).astype(np.int64)
+            return total
+        total = np.zeros(len(keys), dtype=np.float64)
+        for w, sk in zip(self.weights(), self.sketches):
+            total += w * sk.estimate_many(keys)
+        return total
+
+    def estimate(self, key) -> float:
+        return self.estimate_many([key])[0].item()
+
+    # -- ingestion --
+
+    def add_many(self, keys, counts=None, now: float | None = None) -> None:
+        self.rotate(now)
+        keys = np.asarray([str(k) for k in keys] if not isinstance(keys, np.ndarray) else keys)
+        if keys.size == 0:
+            return
+        counts = np.broadcast_to(np.asarray(1 if counts is None else counts, dtype=np.int64), keys.shape)
+        keep = counts > 0
+        keys, counts = keys[keep], counts[keep]
+        if keys.size == 0:
+            return
+        # doublons du lot regroupés : un seul hachage et une seule offre par clé
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        agg = np.bincount(inverse.ravel(), weights=counts).astype(np.int64)
+        self.sketches[0].add_many(uniq, agg)
+        self.total += int(agg.sum())
+        self._offer(uniq, self.estimate_many(uniq, rotate=False))
+
+    def add(self, key, count: int = 1, now: float | None = None) -> None:
+        self.add_many([key], [count], now)
+
+    def _min(self):
+        heap, cand = self.heap, self.candidates
+        while heap and cand.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)   # entrée périmée (clé évincée ou valeur mise à jour)
+        return heap[0][0] if heap else 0
+
+    def _offer(self, keys: np.ndarray, values: np.ndarray) -> None:
+        cand, heap = self.candidates, self.heap
+        if len(cand) >= self.capacity:
+            # filtre vectorisé : seules les clés au niveau du minimum peuvent entrer
+            mask = values >= self._min()
+            keys, values = keys[mask], values[mask]
+        for key, value in zip(keys.tolist(), values.tolist()):
+            if key in cand:
+                cand[key] = value
+                heapq.heappush(heap, (value, key))
+            elif len(cand) < self.capacity:
+                cand[key] = value
+                heapq.heappush(heap, (value, key))
+            elif value > self._min():
+                _, evicted = heapq.heappop(heap)
+                del cand[evicted]
+                cand[key] = value
+                heapq.heappush(heap, (value, key))
+        if len(heap) > 4 * self.capacity + 64:
+            self._rebuild_heap()
+
+    def top(self, k: int) -> list:
+        """[(clé, estimation), ...] par estimation décroissante."""
+        self.rotate()
+        return sorted(self.candidates.items(), key=lambda kv: (-kv[1], kv[0]))[:max(0, k)]
+
+    # -- fusion (sketches construits par plusieurs workers) --
+
+    def merge(self, other: "HeavyHitters") -> None:
+        """Fusion tranche par tranche (alignées par âge) puis réélection des candidats."""
+        if (self.depth, self.width, self.buckets, self.decay) != (other.depth, other.width, other.buckets, other.decay):
+            raise ValueError("Paramètres de sketch différents : fusion impossible.")
+        self.rotate()
+        other.rotate(self.clock())
+        for mine, theirs in zip(self.sketches, other.sketches):
+            mine.merge(theirs)
+        self.total += other.total
+        keys = list(set(self.candidates) | set(other.candidates))
+        values = self.estimate_many(keys, rotate=False).tolist()
+        best = heapq.nlargest(self.capacity, zip(values, keys))
+        self.candidates = {k: v for v, k in best if v > 0}
+        self._rebuild_heap()
+
+    # -- snapshot / restauration --
+
+    def to_bytes(self) -> bytes:
+        meta = {
+            "depth": self.depth, "width": self.width, "capacity": self.capacity,
+            "window_seconds": self.window_seconds, "buckets": self.buckets,
+            "decay": self.decay, "conservative": self.conservative,
+            "bucket_start": self.bucket_start, "total": self.total,
+            "candidates": list(self.candidates.items()),
+        }
+        buf = io.BytesIO()
+        np.savez(buf, tables=np.stack([sk.table for sk in self.sketches]),
+                 meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8))
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, clock=time.time) -> "HeavyHitters":
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            meta = json.loads(npz["meta"].tobytes().decode("utf-8"))
+            tables = npz["tables"]
+        hh = cls(meta["depth"], meta["width"], meta["capacity"], meta["window_seconds"],
+                 meta["buckets"], meta["decay"], meta["conservative"], clock)
+        if tables.shape[1:] != (hh.depth, hh.width):
+            raise ValueError("Snapshot de sketch incohérent.")
+        hh.sketches.clear()
+        for table in tables:
+            sk = hh._new_sketch()
+            sk.table[...] = table
+            hh.sketches.append(sk)
+        hh.bucket_start = meta["bucket_start"]
+        hh.total = meta["total"]
+        hh.candidates = {k: v for k, v in meta["candidates"]}
+        hh._rebuild_heap()
+        return hh
+
+
+def bench_cms(n: int = 1_000_000, distinct: int = 100_000, depth: int = 5, width: int = 2000) -> None:
+    """Débit d'ingestion / d'estimation : boucle add() contre add_many()."""
+    import time
+    rng = np.random.default_rng(0)
+    ids = rng.zipf(1.2, n) % distinct
+    str_keys = [f"player{i}" for i in ids]
+
+    cms = CountMinSketch(depth, width)
+    m = min(n, 50_000)
+    t0 = time.perf_counter()
+    for k in str_keys[:m]:
+        cms.add(k)
+    dt = time.perf_counter() - t0
+    print(f"{'add() boucle (chaînes)':<32}: {m / dt:>12,.0f} évts/s")
+
+    for label, keys in (("add_many (chaînes)", str_keys), ("add_many (entiers)", ids)):
+        for conservative in (False, True):
+            cms = CountMinSketch(depth, width, conservative=conservative)
+            t0 = time.perf_counter()
+            cms.add_many(keys)
+            dt = time.perf_counter() - t0
+            mode = "conservatif" if conservative else "standard"
+            print(f"{label + ' ' + mode:<32}: {n / dt:>12,.0f} évts/s")
+    t0 = time.perf_counter()
+    cms.estimate_many(ids)
+    dt = time.perf_counter() - t0
+    print(f"{'estimate_many (entiers)':<32}: {n / dt:>12,.0f} requêtes/s")
+
+
+if __name__ == "__main__":
+    cms = CountMinSketch(depth=5, width=200)
+    cms.add_many(["pikachu", "bulbasaur", "pikachu"], [3, 1, 2])
+    print("📊 pikachu ≈", cms.estimate("pikachu"), "| mew ≈", cms.estimate("mew"))
+
+    # hachage scalaire et vectorisé identiques, quel que soit le conteneur
+    mixed = [5, "5", 7, b"pika", -1, 2**70, np.int64(9), "mew", True, 3.5]
+    assert hash64_many(mixed).tolist() == [hash64(k) for k in mixed]
+    assert hash64_many(np.array(mixed, dtype=object)).tolist() == [hash64(k) for k in mixed]
+    ids = [5, 7, 5]
+    assert hash64_many(ids).tolist() == hash64_many(np.array(ids)).tolist() == [hash64(k) for k in ids]
+    assert hash64("a") != hash64("a\0") and hash64_many(["a", "a\0"]).tolist() == [hash64("a"), hash64("a\0")]
+    print("✅ hash64_many(liste) == [hash64(k) for k in liste]")
+
+    if "--bench" in sys.argv:
+        bench_cms()
@@ -1,5 +1,25 @@
 import hashlib
-from typing import Iterable, List
+import io
+import math
+import mmap
+import os
+import random
+import sqlite3
+import struct
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl   # verrou inter-processus de MappedBloomFilter (POSIX)
+except ImportError:   # Windows : le reste du module n'en dépend pas
+    fcntl = None
 
 # ---------- E1 — SHA-256 ----------
 
@@ -16,16 +36,25 @@ def sha256_text(text: str, salt: str = "") -> str:
 def sha256_file(fileobj, salt: str = "", chunk_size: int = 65536) -> str:
     """
     Hash SHA-256 d'un fichier streamé (request.files['file']).
-    On lit par chunks pour éviter de charger en RAM.
+    On lit par chunks (readinto dans un buffer préalloué) pour éviter de charger en RAM.
     """
     h = hashlib.sha256()
     if salt:
         h.update(salt.encode("utf-8"))
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    readinto = getattr(fileobj, "readinto", None)
     while True:
-        chunk = fileobj.read(chunk_size)
-        if not chunk:
-            break
-        h.update(chunk)
+        if readinto is not None:
+            n = readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+        else:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
     # repositionne à 0 si on veut relire ailleurs
     try:
         fileobj.seek(0)
@@ -34,42 +63,801 @@ def sha256_file(fileobj, salt: str = "", chunk_size: int = 65536) -> str:
     return h.hexdigest()
 
 
+# ---------- E1 bis — Arbre de Merkle (gros fichiers par morceaux) ----------
+
+MERKLE_CHUNK_SIZE = 1 << 20   # 1 Mio
+MERKLE_MAX_CHUNK_SIZE = 64 << 20   # borne la mémoire des buffers de lecture (2 x workers au plus)
+
+
+def merkle_leaf(chunk) -> bytes:
+    # préfixes 0x00 / 0x01 (comme RFC 6962) : une feuille ne peut pas passer pour un nœud
+    h = hashlib.sha256(b"\x00")
+    h.update(chunk)
+    return h.digest()
+
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    """Racine d'un arbre binaire ; un nœud sans frère remonte tel quel."""
+    level = list(leaves) or [merkle_leaf(b"")]
+    while len(level) > 1:
+        nxt = [hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest() for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+
+def _submit_chunks(ex: ThreadPoolExecutor, source, chunk_size: int, in_flight: int):
+    """
+    Lance le hachage des morceaux d'une source (chemin ou objet fichier).
+    - fichier réel : projeté en mémoire (mmap), chaque tâche hache une vue
+      sans copie ;
+    - sinon : lecture séquentielle par readinto dans un petit pool de buffers
+      préalloués (jamais plus que de morceaux), réutilisés dès que leur
+      morceau est haché.
+    Renvoie (taille, futures, nettoyage).
+    """
+    if isinstance(source, str):
+        source = open(source, "rb")
+        owned = True
+    else:
+        owned = False
+    try:
+        fd = source.fileno()
+    except (AttributeError, OSError, ValueError):
+        fd = None
+    if fd is not None:
+        if hasattr(source, "flush"):
+            source.flush()
+        size = os.fstat(fd).st_size
+        if size == 0:
+            futures = [ex.submit(merkle_leaf, b"")]
+            return 0, futures, (source.close if owned else (lambda: None))
+        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        futures = [ex.submit(merkle_leaf, view[off:off + chunk_size]) for off in range(0, size, chunk_size)]
+
+        def cleanup():
+            view.release()
+            mm.close()
+            if owned:
+                source.close()
+        return size, futures, cleanup
+
+    size = source.seek(0, os.SEEK_END)
+    source.seek(0)
+    free = [bytearray(chunk_size) for _ in range(min(in_flight, -(-size // chunk_size)))]
+    if not free:
+        return 0, [ex.submit(merkle_leaf, b"")], (lambda: None)
+    pending: deque = deque()
+    futures = []
+    size = 0
+    while True:
+        if not free:
+            done_future, buf = pending.popleft()
+            done_future.result()
+            free.append(buf)
+        buf = free.pop()
+        n = source.readinto(buf)
+        if not n:
+            free.append(buf)
+            break
+        size += n
+        f = ex.submit(lambda b, k: merkle_leaf(memoryview(b)[:k]), buf, n)
+        pending.append((f, buf))
+        futures.append(f)
+    if not futures:
+        futures = [ex.submit(merkle_leaf, b"")]
+    return size, futures, (lambda: None)
+
+
+def merkle_many(sources, chunk_size: int = MERKLE_CHUNK_SIZE, workers: Optional[int] = None) -> List[dict]:
+    """
+    Arbre de Merkle de plusieurs fichiers, tous les morceaux partageant un
+    seul pool de threads (hashlib relâche le GIL sur les gros buffers).
+    Chaque résultat : {"root", "size", "chunk_size", "chunks": [hex, ...]}.
+    ValueError si chunk_size sort de [1, MERKLE_MAX_CHUNK_SIZE].
+    """
+    if not 0 < chunk_size <= MERKLE_MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size doit être compris entre 1 et {MERKLE_MAX_CHUNK_SIZE} octets.")
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        jobs = [_submit_chunks(ex, src, chunk_size, 2 * workers) for src in sources]
+        for size, futures, cleanup in jobs:
+            try:
+                leaves = [f.result() for f in futures]
+            finally:
+                cleanup()
+            results.append({
+                "root": merkle_root(leaves).hex(),
+                "size": size,
+                "chunk_size": chunk_size,
+                "chunks": [leaf.hex() for leaf in leaves],
+            })
+    return results
+
+
+def merkle_file(source, chunk_size: int = MERKLE_CHUNK_SIZE, workers: Optional[int] = None) -> dict:
+    """Arbre de Merkle d'un fichier (chemin ou objet fichier, ex. request.files['file'])."""
+    return merkle_many([source], chunk_size, workers)[0]
+
+
+def corrupted_chunks(result: dict, expected: List[str]) -> List[int]:
+    """Indices des morceaux qui diffèrent de la liste attendue (morceaux en trop ou manquants inclus)."""
+    chunks = result["chunks"]
+    bad = [i for i, (a, b) in enumerate(zip(chunks, expected)) if a != b]
+    bad.extend(range(min(len(chunks), len(expected)), max(len(chunks), len(expected))))
+    return bad
+
+
 # ---------- E2 — Bloom Filter ----------
 
+def _digests(keys: Iterable[str]) -> np.ndarray:
+    """Une seule empreinte blake2b de 128 bits par clé -> tableau (n, 2) de uint64 (h1, h2)."""
+    raw = b"".join(hashlib.blake2b(str(k).encode("utf-8"), digest_size=16).digest() for k in keys)
+    return np.frombuffer(raw, dtype="<u8").reshape(-1, 2)
+
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
 class BloomFilter:
     """
-    Filtre de Bloom simple en mémoire (non persistant).
-    - m: taille du bitset (nombre de bits)
+    Filtre de Bloom en mémoire (non persistant).
+    - m: taille du bitset (nombre de bits), stocké compacté dans un bytearray
+      (8 bits par octet)
     - k: nombre de fonctions de hachage
     Collisions → faux positifs possibles, jamais de faux négatifs.
+
+    Double hachage de Kirsch–Mitzenmacher : une seule empreinte par clé,
+    découpée en (h1, h2), donne les k positions g_i = (h1 + i * h2) mod m.
+    `add_many` / `check_many` traitent tout un lot avec NumPy.
     """
-    def __init__(self, m: int = 2048, k: int = 4):
+    def __init__(self, m: int = 2048, k: int = 4, buffer=None):
         assert m > 0 and k > 0
         self.m = m
         self.k = k
-        self.bits = [0] * m
+        # buffer: zone externe de (m + 7) // 8 octets (mmap...), sinon bytearray privé
+        self.bits = buffer if buffer is not None else bytearray((m + 7) // 8)
+        self._view = np.frombuffer(self.bits, dtype=np.uint8)
+        self._steps = np.arange(k, dtype=np.uint64)[:, None]
+        self.count = 0   # éléments distincts ajoutés (approximatif)
+        self.ones = 0    # bits à 1, tenu à jour à chaque bit levé
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fpr: float = 0.01) -> "BloomFilter":
+        """Dimensionne m et k pour `capacity` éléments au taux de faux positifs `fpr`."""
+        assert capacity > 0 and 0 < fpr < 1
+        m = max(8, math.ceil(-capacity * math.log(fpr) / math.log(2) ** 2))
+        k = max(1, round(m / capacity * math.log(2)))
+        return cls(m=m, k=k)
+
+    def _positions(self, key: str) -> List[int]:
+        h1, h2 = _digests([key])[0].tolist()
+        # même arithmétique modulo 2**64 que la version NumPy
+        return [((h1 + i * h2) & 0xFFFFFFFFFFFFFFFF) % self.m for i in range(self.k)]
+
+    def _positions_many(self, digests: np.ndarray) -> np.ndarray:
+        """Positions (k, n) pour un lot d'empreintes."""
+        h1, h2 = digests[:, 0], digests[:, 1]
+        with np.errstate(over="ignore"):
+            return ((h1 + self._steps * h2) % np.uint64(self.m)).astype(np.int64)
 
-    def _hash(self, i: int, key: str) -> int:
-        # h_i(key) = blake2b(i|key) mod m (rapide, bien distribué)
-        h = hashlib.blake2b(digest_size=8)
-        h.update(f"{i}|{key}".encode("utf-8"))
-        return int.from_bytes(h.digest(), "big") % self.m
+    def _test(self, pos: np.ndarray) -> np.ndarray:
+        return ((self._view[pos >> 3] >> (pos & 7).astype(np.uint8)) & 1).astype(bool).all(axis=0)
 
     def add(self, key: str) -> None:
-        for i in range(self.k):
-            idx = self._hash(i, key)
-            self.bits[idx] = 1
+        present = True
+        for idx in self._positions(key):
+            byte, bit = idx >> 3, 1 << (idx & 7)
+            if not self.bits[byte] & bit:
+                present = False
+                self.bits[byte] |= bit
+                self.ones += 1
+        if not present:
+            self.count += 1
 
     def add_many(self, keys: Iterable[str]) -> None:
-        for k in keys:
-            self.add(str(k))
+        digests = _digests(keys)
+        if not len(digests):
+            return
+        self._set_many(digests)
+
+    def _set_many(self, digests: np.ndarray) -> None:
+        pos = self._positions_many(digests)
+        self.count += np.unique(digests[~self._test(pos), 0]).size
+        self._set_positions(pos)
+
+    def _set_positions(self, pos: np.ndarray) -> None:
+        """Lève les bits `pos` (toute forme) et compte ceux qui étaient à 0."""
+        pos = np.unique(pos)
+        fresh = pos[((self._view[pos >> 3] >> (pos & 7).astype(np.uint8)) & 1) == 0]
+        self.ones += fresh.size
+        np.bitwise_or.at(self._view, fresh >> 3, np.left_shift(1, fresh & 7).astype(np.uint8))
 
     def check(self, key: str) -> bool:
-        for i in range(self.k):
-            idx = self._hash(i, key)
-            if self.bits[idx] == 0:
+        for idx in self._positions(key):
+            if not self.bits[idx >> 3] & (1 << (idx & 7)):
                 return False
         return True
 
     def check_many(self, keys: Iterable[str]) -> List[bool]:
-        return [self.check(str(k)) for k in keys]
+        digests = _digests(keys)
+        if not len(digests):
+            return []
+        return self._test(self._positions_many(digests)).tolist()
+
+    def set_bits(self) -> int:
+        return self.ones
+
+    def fill_ratio(self) -> float:
+        return self.set_bits() / self.m
+
+    def estimated_fpr(self) -> float:
+        """Taux de faux positifs actuel estimé : (bits à 1 / m) ** k."""
+        return self.fill_ratio() ** self.k
+
+
+class ScalableBloomFilter:
+    """
+    Filtre de Bloom extensible (Almeida et al.) : quand la couche courante
+    atteint sa capacité, on en ajoute une plus grande (× growth) avec un
+    taux d'erreur plus strict (× tightening). Avec fpr_0 = fpr × (1 - tightening),
+    la somme des taux de toutes les couches reste sous `fpr`, quel que soit
+    le nombre d'éléments.
+    """
+    def __init__(self, initial_capacity: int = 10_000, fpr: float = 0.001,
+                 growth: int = 2, tightening: float = 0.5):
+        assert initial_capacity > 0 and 0 < fpr < 1 and growth >= 1 and 0 < tightening < 1
+        self.initial_capacity = initial_capacity
+        self.fpr = fpr
+        self.growth = growth
+        self.tightening = tightening
+        self.layers: List[BloomFilter] = []
+        self.capacities: List[int] = []
+        self._add_layer()
+
+    def _add_layer(self) -> None:
+        i = len(self.layers)
+        capacity = self.initial_capacity * self.growth ** i
+        fpr = self.fpr * (1 - self.tightening) * self.tightening ** i
+        self.layers.append(BloomFilter.for_capacity(capacity, fpr))
+        self.capacities.append(capacity)
+
+    @property
+    def m(self) -> int:
+        return sum(layer.m for layer in self.layers)
+
+    @property
+    def k(self) -> int:
+        return self.layers[-1].k
+
+    @property
+    def count(self) -> int:
+        return sum(layer.count for layer in self.layers)
+
+    def add(self, key: str) -> None:
+        if self.check(key):
+            return
+        if self.layers[-1].count >= self.capacities[-1]:
+            self._add_layer()
+        self.layers[-1].add(key)
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        keys = [str(k) for k in keys]
+        digests = _digests(keys)
+        if not len(digests):
+            return
+        # seules les clés absentes de toutes les couches sont insérées
+        seen = np.zeros(len(digests), dtype=bool)
+        for layer in self.layers:
+            seen |= layer._test(layer._positions_many(digests))
+        fresh = digests[~seen]
+        # doublons du lot : une seule insertion
+        _, first = np.unique(fresh[:, 0], return_index=True)
+        fresh = fresh[np.sort(first)]
+        while len(fresh):
+            layer = self.layers[-1]
+            room = self.capacities[-1] - layer.count
+            if room <= 0:
+                self._add_layer()
+                continue
+            batch, fresh = fresh[:room], fresh[room:]
+            layer.count += len(batch)
+            layer._set_positions(layer._positions_many(batch))
+
+    def check(self, key: str) -> bool:
+        return any(layer.check(key) for layer in self.layers)
+
+    def check_many(self, keys: Iterable[str]) -> List[bool]:
+        digests = _digests(keys)
+        if not len(digests):
+            return []
+        found = np.zeros(len(digests), dtype=bool)
+        for layer in self.layers:
+            found |= layer._test(layer._positions_many(digests))
+        return found.tolist()
+
+    def estimated_fpr(self) -> float:
+        """Borne du taux de faux positifs : 1 - prod(1 - fpr_couche)."""
+        ok = 1.0
+        for layer in self.layers:
+            ok *= 1 - layer.estimated_fpr()
+        return 1 - ok
+
+
+class MappedBloomFilter(BloomFilter):
+    """
+    Filtre de Bloom partagé : le bitset vit dans un fichier projeté en mémoire
+    (mmap MAP_SHARED). Tous les workers qui ouvrent le même fichier lisent et
+    écrivent les mêmes pages, sans copie, et un redémarrage repart du fichier
+    tel quel (démarrage à chaud).
+
+    En-tête (HEADER) : magic, version, schéma de hachage, m, k, compteur.
+    Les lectures se passent de verrou (un bit ne repasse jamais à 0 hors
+    `clear`) ; les écritures OR et le compteur sont protégés par un verrou de
+    fichier `flock` (inter-processus) doublé d'un verrou de thread.
+    """
+
+    MAGIC = b"BLMF"
+    HEADER = struct.Struct("<4sBBxxQIxxxxQ")   # magic, format, schéma, m, k, compteur
+    SCHEME_BLAKE2B_KM = 1                      # blake2b-128 + double hachage Kirsch–Mitzenmacher
+
+    def __init__(self, path: str, m: int = 2048, k: int = 4):
+        self.path = path
+        self.lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            self._map(m, k)
+        except Exception:
+            os.close(self.fd)
+            raise
+        # m et k viennent du fichier : un fichier existant impose ses dimensions
+        m, k = self.HEADER.unpack_from(self.mm)[3:5]
+        super().__init__(m, k, buffer=memoryview(self.mm)[self.HEADER.size:])
+        self._count_offset = self.HEADER.size - 8
+
+    def _map(self, m: int, k: int) -> None:
+        with self._file_lock():
+            if os.fstat(self.fd).st_size == 0:
+                header = self.HEADER.pack(self.MAGIC, 1, self.SCHEME_BLAKE2B_KM, m, k, 0)
+                os.write(self.fd, header)
+                os.ftruncate(self.fd, self.HEADER.size + (m + 7) // 8)
+            self.mm = mmap.mmap(self.fd, 0)
+            if len(self.mm) < self.HEADER.size:
+                self.mm.close()
+                raise ValueError("Fichier de filtre de Bloom tronqué.")
+            magic, fmt, scheme, m, k, _ = self.HEADER.unpack_from(self.mm)
+            if magic != self.MAGIC or fmt != 1 or scheme != self.SCHEME_BLAKE2B_KM:
+                self.mm.close()
+                raise ValueError("Fichier de filtre de Bloom inconnu ou incompatible.")
+            if len(self.mm) != self.HEADER.size + (m + 7) // 8:
+                self.mm.close()
+                raise ValueError("Fichier de filtre de Bloom tronqué.")
+
+    @classmethod
+    def open(cls, path: str, capacity: int = 10_000, fpr: float = 0.001) -> "MappedBloomFilter":
+        """Ouvre `path`, ou le crée dimensionné pour `capacity` éléments à `fpr`."""
+        sized = BloomFilter.for_capacity(capacity, fpr)
+        return cls(path, sized.m, sized.k)
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            # sans flock (Windows) : seul le verrou de thread protège les écritures,
+            # le fichier ne doit alors être ouvert que par un seul processus
+            yield
+            return
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    @property
+    def count(self) -> int:
+        if not hasattr(self, "_count_offset"):
+            return 0
+        return struct.unpack_from("<Q", self.mm, self._count_offset)[0]
+
+    @count.setter
+    def count(self, value: int) -> None:
+        # le compteur vit dans l'en-tête ; ignoré pendant BloomFilter.__init__
+        if hasattr(self, "_count_offset"):
+            struct.pack_into("<Q", self.mm, self._count_offset, value)
+
+    def set_bits(self) -> int:
+        # les autres processus lèvent aussi des bits : `ones` ne voit que les
+        # nôtres, on recompte le fichier (table de popcount par octet, O(m / 8))
+        return int(_POPCOUNT[self._view].sum(dtype=np.int64))
+
+    def add(self, key: str) -> None:
+        with self.lock, self._file_lock():
+            super().add(key)
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        digests = _digests(keys)
+        if not len(digests):
+            return
+        with self.lock, self._file_lock():
+            self._set_many(digests)
+
+    def clear(self) -> None:
+        with self.lock, self._file_lock():
+            self._view[:] = 0
+            self.count = 0
+            self.ones = 0
+
+    def flush(self) -> None:
+        """Force l'écriture des pages modifiées sur disque (sinon laissée à l'OS)."""
+        self.mm.flush()
+
+    def close(self) -> None:
+        self._view = None
+        self.bits.release()
+        self.mm.close()
+        os.close(self.fd)
+
+
+# ---------- E3 — Cuckoo Filter (suppression possible) ----------
+
+class CuckooFilter:
+    """
+    Filtre coucou : appartenance approximative avec suppression.
+    Chaque clé est réduite à une empreinte de `fp_bits` bits (8 ou 16),
+    rangée dans l'un de ses deux seaux de `BUCKET_SIZE` cases :
+    i2 = i1 XOR hash(empreinte), donc l'autre seau se retrouve sans la clé.
+    Un seau plein déplace une empreinte vers son seau alternatif (coucou).
+
+    - add / delete / check en O(1) ; `*_many` par lots (hachage et
+      vérification vectorisés avec NumPy).
+    - FPR ≈ 2 * BUCKET_SIZE / 2**fp_bits ; à 95 % de remplissage une empreinte
+      de 16 bits coûte ≈ 17 bits par élément.
+    - Supprimer une clé jamais ajoutée peut effacer une empreinte voisine :
+      ne retirer que des clés effectivement insérées.
+    """
+
+    BUCKET_SIZE = 4
+    MAX_KICKS = 500
+
+    def __init__(self, buckets: int = 1024, fp_bits: int = 16, seed=None):
+        assert buckets > 0 and fp_bits in (8, 16)
+        self.buckets = 1 << max(0, (buckets - 1).bit_length())   # puissance de 2 (XOR)
+        self.mask = self.buckets - 1
+        self.fp_bits = fp_bits
+        self.fp_mask = (1 << fp_bits) - 1
+        typecode, dtype = ("B", np.uint8) if fp_bits == 8 else ("H", np.uint16)
+        self.table = array(typecode, bytes(self.buckets * self.BUCKET_SIZE * (fp_bits // 8)))
+        self._view = np.frombuffer(self.table, dtype=dtype).reshape(self.buckets, self.BUCKET_SIZE)
+        self.count = 0
+        self.victim = None   # (seau, empreinte) évincée lors d'un échec d'insertion
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fpr: float = 0.001, load: float = 0.95) -> "CuckooFilter":
+        """Dimensionne le filtre pour `capacity` éléments à un taux de faux positifs `fpr`."""
+        assert capacity > 0 and 0 < fpr < 1
+        fp_bits = 8 if 2 * cls.BUCKET_SIZE / 2 ** 8 <= fpr else 16
+        return cls(buckets=math.ceil(capacity / (cls.BUCKET_SIZE * load)), fp_bits=fp_bits)
+
+    @property
+    def capacity(self) -> int:
+        return self.buckets * self.BUCKET_SIZE
+
+    def load_factor(self) -> float:
+        return self.count / self.capacity
+
+    def _alt(self, index: int, fp: int) -> int:
+        return (index ^ (fp * 0x5BD1E995)) & self.mask
+
+    def _locate_many(self, keys: Iterable[str]):
+        """(i1, i2, empreinte) pour chaque clé, calculés sur tout le lot."""
+        digests = _digests(keys)
+        fp = (digests[:, 1] & np.uint64(self.fp_mask)).astype(np.int64)
+        fp[fp == 0] = 1   # 0 = case vide
+        i1 = (digests[:, 0] & np.uint64(self.mask)).astype(np.int64)
+        i2 = (i1 ^ (fp * 0x5BD1E995)) & self.mask
+        return i1, i2, fp
+
+    def _insert(self, i1: int, i2: int, fp: int) -> bool:
+        if self.victim is not None:
+            return False
+        table, b = self.table, self.BUCKET_SIZE
+        for index in (i1, i2):
+            base = index * b
+            for slot in range(base, base + b):
+                if not table[slot]:
+                    table[slot] = fp
+                    self.count += 1
+                    return True
+        index = self.rng.choice((i1, i2))
+        for _ in range(self.MAX_KICKS):
+            slot = index * b + self.rng.randrange(b)
+            fp, table[slot] = table[slot], fp
+            index = self._alt(index, fp)
+            base = index * b
+            for slot in range(base, base + b):
+                if not table[slot]:
+                    table[slot] = fp
+                    self.count += 1
+                    return True
+        # filtre saturé : l'empreinte déplacée est gardée à part (aucun faux négatif)
+        self.victim = (index, fp)
+        self.count += 1
+        return True
+
+    def _remove(self, i1: int, i2: int, fp: int) -> bool:
+        table, b = self.table, self.BUCKET_SIZE
+        for index in (i1, i2):
+            base = index * b
+            for slot in range(base, base + b):
+                if table[slot] == fp:
+                    table[slot] = 0
+                    self.count -= 1
+                    self._reinsert_victim()
+                    return True
+        if self.victim is not None and self.victim[1] == fp and self.victim[0] in (i1, i2):
+            self.victim = None
+            self.count -= 1
+            return True
+        return False
+
+    def _reinsert_victim(self) -> None:
+        if self.victim is not None:
+            index, fp = self.victim
+            self.victim = None
+            self.count -= 1
+            self._insert(index, self._alt(index, fp), fp)
+
+    def add(self, key: str) -> bool:
+        """False si le filtre est plein (la clé n'a pas été ajoutée)."""
+        return self.add_many([key])[0]
+
+    def add_many(self, keys: Iterable[str]) -> List[bool]:
+        i1, i2, fp = self._locate_many(keys)
+        return [self._insert(a, b, f) for a, b, f in zip(i1.tolist(), i2.tolist(), fp.tolist())]
+
+    def delete(self, key: str) -> bool:
+        """True si une empreinte de la clé a été retirée."""
+        return self.delete_many([key])[0]
+
+    def delete_many(self, keys: Iterable[str]) -> List[bool]:
+        i1, i2, fp = self._locate_many(keys)
+        return [self._remove(a, b, f) for a, b, f in zip(i1.tolist(), i2.tolist(), fp.tolist())]
+
+    def check(self, key: str) -> bool:
+        return self.check_many([key])[0]
+
+    def check_many(self, keys: Iterable[str]) -> List[bool]:
+        i1, i2, fp = self._locate_many(keys)
+        if not len(fp):
+            return []
+        v, col = self._view, fp.astype(self._view.dtype)[:, None]
+        found = (v[i1] == col).any(axis=1) | (v[i2] == col).any(axis=1)
+        if self.victim is not None:
+            index, vfp = self.victim
+            found |= (fp == vfp) & ((i1 == index) | (i2 == index))
+        return found.tolist()
+
+
+# ---------- E4 — Stockage dédupliqué par contenu (replays, skins...) ----------
+
+class BlobStore:
+    """
+    Stockage local adressé par contenu : un blob est rangé sous son empreinte
+    SHA-256 (`objects/ab/cdef...`), donc un contenu déjà présent n'est jamais
+    réécrit ; l'envoi renvoie directement la référence existante.
+
+    - index sur disque (SQLite) : empreinte, taille, nombre de références ;
+    - filtre de Bloom en mémoire, rechargé depuis l'index au démarrage : à
+      l'envoi, « absent » évite la requête à l'index pour un contenu neuf. Le
+      filtre est propre au processus (un autre worker a pu ranger ce contenu) :
+      l'insertion finale est un upsert, qui retombe sur la référence existante ;
+    - comptage de références : `release` décrémente, `gc` supprime les blobs
+      qui ne sont plus référencés ;
+    - cache LRU des blobs chauds, borné en octets (`cache_bytes`), seuls les
+      blobs de moins de `max_cached_blob` octets y entrent ; les autres sont
+      lus en flux (`open`).
+
+    Les écritures passent par des transactions `BEGIN IMMEDIATE` : entre
+    processus, un upsert (et le dépôt du fichier) et un `gc` ne s'entrelacent pas.
+    """
+
+    def __init__(self, root: str, cache_bytes: int = 64 << 20, max_cached_blob: int = 4 << 20,
+                 bloom_capacity: int = 100_000, bloom_fpr: float = 0.001):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.tmp = os.path.join(root, "tmp")
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.tmp, exist_ok=True)
+        self.lock = threading.RLock()
+        # transactions explicites (voir `_transaction`)
+        self.db = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False,
+                                  isolation_level=None, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            " digest TEXT PRIMARY KEY, size INTEGER NOT NULL, refs INTEGER NOT NULL,"
+            " created REAL NOT NULL DEFAULT (strftime('%s','now')))"
+        )
+        self.bloom = ScalableBloomFilter(initial_capacity=bloom_capacity, fpr=bloom_fpr)
+        batch = self.db.execute("SELECT digest FROM blobs")
+        while True:
+            rows = batch.fetchmany(10_000)
+            if not rows:
+                break
+            self.bloom.add_many(r[0] for r in rows)
+        self.cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self.cache_bytes = cache_bytes
+        self.max_cached_blob = max_cached_blob
+        self.cached = 0
+        self.stats = {"stored": 0, "deduplicated": 0, "bloom_skips": 0,
+                      "cache_hits": 0, "cache_misses": 0, "collected": 0}
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    @contextmanager
+    def _transaction(self):
+        """Transaction d'écriture, exclusive entre processus. Appeler sous `self.lock`."""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def _row(self, digest: str):
+        return self.db.execute("SELECT size, refs FROM blobs WHERE digest = ?", (digest,)).fetchone()
+
+    def put(self, fileobj) -> dict:
+        """
+        Range le contenu de `fileobj` (lu depuis le début). Flux relisible : on
+        hache d'abord (sha256_file) et on ne copie que si le contenu est neuf ;
+        sinon la copie vers un fichier temporaire se fait en même temps que le hachage.
+        Renvoie {"digest", "size", "refs", "deduplicated"}.
+        """
+        if getattr(fileobj, "seekable", lambda: False)():
+            fileobj.seek(0)
+            digest = sha256_file(fileobj)
+            hit = self._add_ref(digest)
+            if hit is not None:
+                return hit
+            fileobj.seek(0)
+            staged = self._stage(fileobj)[1]
+        else:
+            digest, staged = self._stage(fileobj)
+        size = os.path.getsize(staged)
+        final = self.path(digest)
+        try:
+            with self.lock, self._transaction():
+                # upsert : un envoi identique (ce processus ou un autre) a pu passer avant
+                self.db.execute(
+                    "INSERT INTO blobs (digest, size, refs) VALUES (?, ?, 1)"
+                    " ON CONFLICT(digest) DO UPDATE SET refs = refs + 1", (digest, size))
+                refs = self._row(digest)[1]
+                fresh = not os.path.exists(final)
+                if fresh:
+                    os.makedirs(os.path.dirname(final), exist_ok=True)
+                    os.replace(staged, final)
+                self.bloom.add(digest)
+                self.stats["stored" if fresh else "deduplicated"] += 1
+        finally:
+            if os.path.exists(staged):
+                os.remove(staged)
+        return {"digest": digest, "size": size, "refs": refs, "deduplicated": not fresh}
+
+    def _add_ref(self, digest: str):
+        """Ajoute une référence à un blob déjà rangé ; None s'il faut le copier."""
+        with self.lock:
+            if not self.bloom.check(digest):
+                self.stats["bloom_skips"] += 1
+                return None
+            with self._transaction():
+                row = self._row(digest)
+                if row is None or not os.path.exists(self.path(digest)):
+                    return None
+                self.db.execute("UPDATE blobs SET refs = refs + 1 WHERE digest = ?", (digest,))
+            self.stats["deduplicated"] += 1
+        return {"digest": digest, "size": row[0], "refs": row[1] + 1, "deduplicated": True}
+
+    def _stage(self, fileobj, chunk_size: int = 1 << 20):
+        """Copie le flux dans tmp/ en le hachant au passage ; renvoie (empreinte, chemin)."""
+        h = hashlib.sha256()
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        fd, staged = tempfile.mkstemp(dir=self.tmp)
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                n = fileobj.readinto(buf)
+                if not n:
+                    break
+                h.update(view[:n])
+                out.write(view[:n])
+        return h.hexdigest(), staged
+
+    def info(self, digest: str):
+        # l'index fait foi : le filtre local ignore les blobs rangés par d'autres workers
+        with self.lock:
+            row = self._row(digest)
+        if row is None:
+            return None
+        return {"digest": digest, "size": row[0], "refs": row[1]}
+
+    def open(self, digest: str):
+        """
+        Contenu du blob en lecture : BytesIO pour un blob en cache (ou assez petit
+        pour y entrer), sinon le fichier ouvert, à lire en flux. None si inconnu
+        (ou supprimé par un `gc` concurrent).
+        """
+        with self.lock:
+            if self._row(digest) is None:
+                return None
+            data = self.cache.get(digest)
+            if data is not None:
+                self.cache.move_to_end(digest)
+                self.stats["cache_hits"] += 1
+                return io.BytesIO(data)
+            self.stats["cache_misses"] += 1
+            try:
+                f = open(self.path(digest), "rb")
+            except FileNotFoundError:
+                return None
+        # le fichier reste lisible une fois ouvert, même si un gc le supprime ensuite
+        if os.fstat(f.fileno()).st_size > self.max_cached_blob:
+            return f
+        with f:
+            data = f.read()
+        with self.lock:
+            if digest not in self.cache:
+                self.cache[digest] = data
+                self.cached += len(data)
+                while self.cached > self.cache_bytes:
+                    _, evicted = self.cache.popitem(last=False)
+                    self.cached -= len(evicted)
+        return io.BytesIO(data)
+
+    def get(self, digest: str):
+        """Contenu complet du blob, ou None (préférer `open` pour les gros blobs)."""
+        f = self.open(digest)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def release(self, digest: str):
+        """Retire une référence ; renvoie le nombre restant (None si blob inconnu)."""
+        with self.lock, self._transaction():
+            row = self._row(digest)
+            if row is None:
+                return None
+            refs = max(0, row[1] - 1)
+            self.db.execute("UPDATE blobs SET refs = ? WHERE digest = ?", (refs, digest))
+            return refs
+
+    def gc(self) -> dict:
+        """Supprime les blobs sans référence (fichier, index et cache)."""
+        with self.lock, self._transaction():
+            rows = self.db.execute("SELECT digest, size FROM blobs WHERE refs <= 0").fetchall()
+            self.db.executemany("DELETE FROM blobs WHERE digest = ?", [(d,) for d, _ in rows])
+            freed = 0
+            for digest, size in rows:
+                try:
+                    os.remove(self.path(digest))
+                except FileNotFoundError:
+                    pass
+                data = self.cache.pop(digest, None)
+                if data is not None:
+                    self.cached -= len(data)
+                freed += size
+            # le filtre de Bloom garde ces empreintes : simple requête d'index en trop
+            self.stats["collected"] += len(rows)
+        return {"collected": len(rows), "freed_bytes": freed}
+
+    def summary(self) -> dict:
+        with self.lock:
+            count, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            return {"blobs": count, "bytes": total, "cached_blobs": len(self.cache),
+                    "cached_bytes": self.cached, **self.stats}
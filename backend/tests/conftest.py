@@ -0,0 +1,7 @@
+import os
+import sys
+
+# les tests importent `src.*` (et `app`) comme l'application, quel que soit le cwd
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
@@ -0,0 +1,110 @@
+"""Routes Flask : chemins d'erreur 400 des nouvelles routes et petits scénarios de bout en bout."""
+import io
+import json
+
+import pytest
+
+import app as backend
+
+
+@pytest.fixture
+def client():
+    backend.app.config["TESTING"] = True
+    return backend.app.test_client()
+
+
+def multipart(client, url, **fields):
+    return client.post(url, data=fields, content_type="multipart/form-data")
+
+
+@pytest.mark.parametrize("body", [
+    '{"player": "nan-player", "score": NaN}',
+    '{"player": "inf-player", "score": Infinity}',
+    '{"player": "str-player", "score": "nan"}',
+    '{"player": "bad-player", "score": "abc"}',
+    '{"scores": [["a", 1], ["b"]]}',
+    '{"player": "missing-score"}',
+])
+def test_leaderboard_rejects_invalid_scores(client, body):
+    r = client.post("/leaderboard/scores", data=body, content_type="application/json")
+    assert r.status_code == 400
+    assert backend.LEADERBOARD.rank("nan-player") is None
+
+
+def test_leaderboard_scores_and_top(client):
+    r = client.post("/leaderboard/scores", json={"scores": [["t-alice", 10**9], ["t-bob", 10**9 - 1]]})
+    assert r.status_code == 200 and r.json["ranks"] == {"t-alice": 1, "t-bob": 2}
+    top = client.get("/leaderboard/top?k=2").json["top"]
+    assert [row["player"] for row in top] == ["t-alice", "t-bob"]
+    assert client.get("/leaderboard/top?k=abc").status_code == 400
+
+
+def test_sketch_top_rejects_non_integer_k(client):
+    assert client.put("/sketches/t-top").status_code == 201
+    client.post("/sketches/t-top/events", json={"events": ["mew", "mew", ["pikachu", 3]]})
+    assert client.get("/sketches/t-top/top?k=abc").status_code == 400
+    r = client.get("/sketches/t-top/top?k=1")
+    assert r.status_code == 200 and r.json["top"] == [{"key": "pikachu", "estimate": 3}]
+    assert client.get("/sketches/t-unknown/top?k=1").status_code == 404
+
+
+@pytest.mark.parametrize("fields", [
+    {"chunk_size": "abc"},
+    {"chunk_size": "0"},
+    {"chunk_size": str(1 << 40)},
+    {"expected_chunks": "pas du json"},
+    {"expected_chunks": '{"0": "abc"}'},
+])
+def test_sha256_merkle_rejects_bad_parameters(client, fields):
+    r = multipart(client, "/sha256", file=(io.BytesIO(b"x" * 100), "a.bin"), mode="merkle", **fields)
+    assert r.status_code == 400
+
+
+def test_sha256_merkle_reports_corrupted_chunks(client):
+    r = multipart(client, "/sha256", file=(io.BytesIO(b"a" * 30), "a.bin"), mode="merkle", chunk_size="10")
+    chunks = r.json["chunks"]
+    expected = json.dumps([chunks[0], "0" * 64, chunks[2]])
+    r = multipart(client, "/sha256", file=(io.BytesIO(b"a" * 30), "a.bin"), mode="merkle",
+                  chunk_size="10", expected_chunks=expected)
+    assert r.status_code == 200 and r.json["corrupted_chunks"] == [1]
+
+
+@pytest.mark.parametrize("fields", [
+    {"chunk_size": "abc"},
+    {"chunk_size": str(1 << 40)},
+    {"expected": "pas du json"},
+    {"expected": "[]"},
+    {"expected": '{"a.bin": "abc"}'},
+])
+def test_sha256_batch_rejects_bad_parameters(client, fields):
+    r = multipart(client, "/sha256/batch", files=(io.BytesIO(b"x" * 10), "a.bin"), **fields)
+    assert r.status_code == 400
+
+
+def test_sha256_batch_without_files(client):
+    assert multipart(client, "/sha256/batch", chunk_size="10").status_code == 400
+
+
+def test_bans_are_idempotent_and_decided_by_the_exact_set(client):
+    r = client.post("/bans/add", json={"items": ["t-ban-1", "t-ban-2", "t-ban-1"]})
+    assert r.json["added"] == 2 and r.json["already_banned"] == []
+    r = client.post("/bans/add", json={"items": ["t-ban-1"]})
+    assert r.json["added"] == 0 and r.json["already_banned"] == ["t-ban-1"]
+    # un id jamais banni n'est jamais retiré du filtre, même en cas de collision d'empreinte
+    r = client.post("/bans/remove", json={"items": ["t-ban-1", "t-never-banned"]})
+    assert r.json["removed"] == {"t-ban-1": True, "t-never-banned": False}
+    assert r.json["not_banned"] == ["t-never-banned"]
+    r = client.post("/bans/check", json={"items": ["t-ban-1", "t-ban-2"]})
+    assert r.json["present"] == {"t-ban-1": False, "t-ban-2": True}
+
+
+def test_pathfinding_modes_agree_on_a_registered_map(client):
+    grid = [[1, 1, 1, 1], [None, None, 1, None], [1, 1, 1, 1]]
+    map_id = client.post("/maps", json={"grid": grid}).json["map_id"]
+    distances = set()
+    for algo in ("dijkstra", "astar", "bidijkstra", "biastar", "jps", "hpa"):
+        r = client.post("/pathfinding", json={"map_id": map_id, "start": [0, 0], "goal": [2, 0], "algorithm": algo})
+        assert r.status_code == 200
+        distances.add(r.json["distance"])
+    assert distances == {6}
+    assert client.post("/pathfinding", json={"map_id": "t-unknown", "start": [0, 0], "goal": [0, 1]}).status_code == 404
@@ -0,0 +1,113 @@
+"""Partie A : chaque moteur de recherche est comparé à une référence naïve (re, str.find, DP)."""
+import random
+import re
+
+import pytest
+
+from src.partA_text_search import (
+    AhoCorasick, ApproxMatcher, KMPStreamMatcher, find_all_occurrences,
+    rabin_karp_multi, rabin_karp_multi_vectorized,
+)
+
+
+def regex_find_all(text, patterns, flags=0):
+    # lookahead : occurrences chevauchantes, comme les automates
+    return {p: [m.start() for m in re.finditer(f"(?={re.escape(p)})", text, flags)] for p in patterns}
+
+
+def random_text(rng, n, alphabet="abcab "):
+    return "".join(rng.choice(alphabet) for _ in range(n))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_aho_corasick_matches_regex(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, 2000)
+    patterns = list({random_text(rng, rng.randint(1, 5), "abc") for _ in range(30)})
+    assert AhoCorasick(patterns).find_all(text) == regex_find_all(text, patterns)
+
+
+def test_aho_corasick_ignore_case_keeps_original_positions():
+    text = "gg NOOB lol Noob, cheaterCHEATER"
+    patterns = ["noob", "Noob", "cheater"]
+    expected = regex_find_all(text, patterns, re.IGNORECASE)
+    assert AhoCorasick(patterns, ignore_case=True).find_all(text) == expected
+
+
+def test_aho_corasick_scan_batch_only_reports_hits():
+    ac = AhoCorasick(["hack", "ddos"])
+    assert ac.scan_batch(["gg", "hack hack", "ddos"]) == [{}, {"hack": [0, 5]}, {"ddos": [0]}]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_kmp_stream_matches_find_across_chunk_boundaries(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, 3000, "ab")
+    pattern = "abab"
+    expected = regex_find_all(text, [pattern])[pattern]
+    assert find_all_occurrences(text, pattern) == expected
+    cuts = sorted(rng.sample(range(1, len(text)), 40))
+    chunks = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+    assert list(KMPStreamMatcher(pattern).feed_all(chunks)) == expected
+    encoded = [c.encode() for c in chunks]
+    assert list(KMPStreamMatcher(pattern).feed_all(encoded)) == expected
+
+
+def test_kmp_scan_file_variants_agree(tmp_path):
+    data = b"xxabcab" * 1000 + b"abcab"
+    path = tmp_path / "log.bin"
+    path.write_bytes(data)
+    expected = [m.start() for m in re.finditer(b"(?=abcab)", data)]
+    matcher = KMPStreamMatcher(b"abcab")
+    assert list(matcher.scan_file(str(path))) == expected
+    assert list(matcher.scan_file_chunks(str(path), chunk_size=1000)) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rabin_karp_vectorized_matches_regex(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, 5000, "abcé")
+    patterns = list({random_text(rng, rng.randint(1, 6), "abcé") for _ in range(50)})
+    expected = regex_find_all(text, patterns)
+    assert rabin_karp_multi(text, patterns) == expected
+    assert rabin_karp_multi_vectorized(text, patterns) == expected
+
+
+def test_rabin_karp_vectorized_edge_cases_match_baseline():
+    for text, patterns in (("abc", ["", "b"]), ("", ["", "a"]), ("abc", []), ("ab", ["abc"])):
+        assert rabin_karp_multi_vectorized(text, patterns) == rabin_karp_multi(text, patterns)
+
+
+def sellers(text, pattern):
+    """Distance d'édition minimale d'un sous-mot de `text` finissant en j (DP de Sellers)."""
+    col = list(range(len(pattern) + 1))
+    out = []
+    for ch in text:
+        prev, col[0] = col[0], 0
+        for i, pc in enumerate(pattern, 1):
+            prev, col[i] = col[i], min(col[i] + 1, col[i - 1] + 1, prev + (pc != ch))
+        out.append(col[-1])
+    return out
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_approx_matcher_agrees_with_edit_distance_dp(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, 400, "abc")
+    pattern, k = random_text(rng, 6, "abc"), 2
+    dist = sellers(text, pattern)
+    hits = ApproxMatcher([pattern], k=k, table=None).search(text).get(pattern, [])
+    # un match par groupe de fins consécutives, avec le meilleur score du groupe
+    runs, run = [], []
+    for j, d in enumerate(dist, 1):
+        if d <= k:
+            run.append((j, d))
+        elif run:
+            runs.append(run)
+            run = []
+    if run:
+        runs.append(run)
+    assert len(hits) == len(runs)
+    for (end, errors), run in zip(hits, runs):
+        assert errors == min(d for _, d in run) == dist[end - 1]
+        assert run[0][0] <= end <= run[-1][0]
@@ -0,0 +1,125 @@
+"""Partie B : sélection, classement et fenêtres glissantes comparés à sorted() / recalcul brut."""
+import math
+import random
+
+import numpy as np
+import pytest
+
+from src.partB_selection import (
+    KeyedWindowAggregator, Leaderboard, TimeWindowAggregator, introselect, shard_topk,
+    sliding_window_max, split_shards, topk_heap, topk_quickselect, topk_sharded,
+    window_aggregates_batch,
+)
+
+INPUTS = {
+    "aleatoire": lambda rng, n: [rng.randint(0, 10**6) for _ in range(n)],
+    "croissant": lambda rng, n: list(range(n)),
+    "decroissant": lambda rng, n: list(range(n, 0, -1)),
+    "doublons": lambda rng, n: [rng.randint(0, 3) for _ in range(n)],
+    "constant": lambda rng, n: [7] * n,
+}
+
+
+@pytest.mark.parametrize("kind", INPUTS)
+def test_introselect_matches_sorted(kind):
+    rng = random.Random(0)
+    data = INPUTS[kind](rng, 2000)
+    ref = sorted(data, reverse=True)
+    for k in (0, 1, 17, 999, 1999):
+        arr = list(data)
+        introselect(arr, k)
+        assert arr[k] == ref[k]
+        assert min(arr[:k], default=math.inf) >= arr[k] >= max(arr[k + 1:], default=-math.inf)
+        assert sorted(arr) == sorted(data)
+
+
+def test_introselect_sub_range_leaves_the_rest_untouched():
+    rng = random.Random(1)
+    data = [rng.random() for _ in range(500)]
+    arr = list(data)
+    introselect(arr, 150, low=100, high=300)
+    assert arr[:100] == data[:100] and arr[301:] == data[301:]
+    assert arr[150] == sorted(data[100:301], reverse=True)[50]
+
+
+@pytest.mark.parametrize("kind", INPUTS)
+@pytest.mark.parametrize("k", [0, 1, 10, 300, 1000, 5000])
+def test_topk_variants_match_sorted(kind, k):
+    data = INPUTS[kind](random.Random(2), 1000)
+    ref = sorted(data, reverse=True)[:k]
+    assert topk_quickselect(data, k) == ref
+    assert topk_quickselect(list(data), k, in_place=True) == ref
+    assert topk_heap(data, k) == ref
+
+
+def test_topk_sharded_matches_sorted():
+    data = np.random.default_rng(3).integers(0, 10**9, 50_000)
+    ref = sorted(data.tolist(), reverse=True)[:100]
+    assert shard_topk(data, 100) == ref
+    assert topk_sharded(split_shards(data, 7), 100, workers=1) == ref
+    assert topk_sharded(split_shards(data.tolist(), 7), 100, workers=2) == ref
+
+
+def test_topk_sharded_reads_npy_paths(tmp_path):
+    data = np.random.default_rng(4).random(10_000)
+    paths = []
+    for i, part in enumerate(np.array_split(data, 3)):
+        paths.append(str(tmp_path / f"shard{i}.npy"))
+        np.save(paths[-1], part)
+    assert topk_sharded(paths, 25, workers=1) == sorted(data.tolist(), reverse=True)[:25]
+
+
+def test_leaderboard_matches_sorted_dict():
+    rng = random.Random(5)
+    lb, scores = Leaderboard(seed=5), {}
+    for step in range(3000):
+        player = f"p{rng.randrange(300)}"
+        if rng.random() < 0.2:
+            assert lb.remove(player) == (scores.pop(player, None) is not None)
+        else:
+            scores[player] = rng.randint(0, 50)
+            lb.upsert(player, scores[player])
+    ordering = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+    expected = [(i, p, s) for i, (p, s) in enumerate(ordering, 1)]
+    assert len(lb) == len(scores)
+    assert lb.top(10) == expected[:10]
+    assert lb.around(50, radius=3) == expected[46:53]
+    assert all(lb.rank(p) == r for r, p, _ in expected)
+
+
+@pytest.mark.parametrize("bad", [math.nan, math.inf, -math.inf])
+def test_leaderboard_rejects_non_finite_scores(bad):
+    lb = Leaderboard()
+    lb.upsert("a", 1)
+    with pytest.raises(ValueError):
+        lb.upsert("a", bad)
+    assert lb.scores == {"a": 1} and lb.top(5) == [(1, "a", 1)]
+    assert lb.remove("a") and len(lb) == 0
+
+
+def test_sliding_window_max_matches_brute_force():
+    rng = random.Random(6)
+    arr = [rng.randint(-50, 50) for _ in range(500)]
+    for w in (1, 3, 50):
+        assert sliding_window_max(arr, w) == [max(arr[i:i + w]) for i in range(len(arr) - w + 1)]
+
+
+def test_window_aggregates_match_brute_force():
+    rng = random.Random(7)
+    ts = sorted(rng.uniform(0, 100) for _ in range(800))
+    vals = [rng.uniform(-10, 10) for _ in ts]
+    window = 5.0
+    batch = window_aggregates_batch(ts, vals, window)
+    online = TimeWindowAggregator(window)
+    keyed = KeyedWindowAggregator(window)
+    for i, (t, v) in enumerate(zip(ts, vals)):
+        online.push(t, v)
+        keyed.push("srv", t, v)
+        inside = [x for s, x in zip(ts[:i + 1], vals[:i + 1]) if t - window < s]
+        stats = online.stats()
+        assert stats["count"] == batch["count"][i] == len(inside)
+        assert stats["max"] == batch["max"][i] == max(inside)
+        assert stats["min"] == batch["min"][i] == min(inside)
+        assert stats["sum"] == pytest.approx(sum(inside)) == batch["sum"][i]
+    assert keyed.stats("srv") == online.stats()
+    assert keyed.prune(ts[-1] + window) == 1 and keyed.stats("srv") is None
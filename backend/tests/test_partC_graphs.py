@@ -0,0 +1,275 @@
+"""Partie C : chaque recherche de chemin est comparée à un Dijkstra de référence sur coordonnées."""
+import heapq
+import math
+import random
+
+import pytest
+
+from src.partC_graphs import (
+    CompiledGrid, FlowField, GuildGraph, HierarchicalPathfinder, LRUCache, MapRegistry,
+    PathWorkerPool, astar_compiled, bidirectional_compiled, detect_cycle_with_dsu,
+    dijkstra_compiled, jps, jps_compiled, make_maze, solve_queries,
+)
+
+
+def reference_dijkstra(grid, start, goal):
+    """Dijkstra naïf sur la grille de listes : on paie le coût de la case où l'on entre."""
+    rows, cols = len(grid), len(grid[0])
+    dist, pq = {start: 0}, [(0, start)]
+    while pq:
+        d, (r, c) = heapq.heappop(pq)
+        if (r, c) == goal:
+            return d
+        if d > dist[(r, c)]:
+            continue
+        for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] is not None:
+                nd = d + grid[nr][nc]
+                if nd < dist.get((nr, nc), math.inf):
+                    dist[(nr, nc)] = nd
+                    heapq.heappush(pq, (nd, (nr, nc)))
+    return math.inf
+
+
+def random_grid(rng, rows, cols, walls=0.25, costs=(1, 5)):
+    return [[None if rng.random() < walls else rng.randint(*costs) for _ in range(cols)] for _ in range(rows)]
+
+
+def free_cells(grid):
+    return [(r, c) for r, line in enumerate(grid) for c, v in enumerate(line) if v is not None]
+
+
+def assert_valid_path(grid, path, dist):
+    """Cases voisines, aucun mur, et coût du chemin égal à la distance annoncée."""
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        assert abs(r1 - r2) + abs(c1 - c2) == 1
+    assert all(grid[r][c] is not None for r, c in path[1:])
+    assert sum(grid[r][c] for r, c in path[1:]) == dist
+
+
+def queries(rng, grid, n):
+    cells = free_cells(grid)
+    return [(rng.choice(cells), rng.choice(cells)) for _ in range(n)]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_compiled_searches_match_reference_dijkstra(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 25, 30)
+    cg = CompiledGrid.from_rows(grid)
+    cg.ensure_connectivity()
+    variants = (
+        dijkstra_compiled, astar_compiled, bidirectional_compiled,
+        lambda cg, s, t: bidirectional_compiled(cg, s, t, heuristic=True),
+    )
+    for start, goal in queries(rng, grid, 25):
+        expected = reference_dijkstra(grid, start, goal)
+        for fn in variants:
+            dist, path, _ = fn(cg, cg.index(start), cg.index(goal))
+            assert dist == expected
+            if dist < math.inf:
+                cells = [cg.cell(i) for i in path]
+                assert cells[0] == start and cells[-1] == goal
+                assert_valid_path(grid, cells, dist)
+        assert cg.unreachable(cg.index(start), cg.index(goal)) == (expected == math.inf)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_jps_matches_dijkstra_on_uniform_grids(seed):
+    rng = random.Random(seed)
+    grids = [random_grid(rng, 30, 30, walls=0.3, costs=(1, 1)), make_maze(21, 31, seed=seed),
+             [[1] * 40 for _ in range(40)]]
+    for grid in grids:
+        cg = CompiledGrid.from_rows(grid)
+        for start, goal in queries(rng, grid, 30):
+            expected = reference_dijkstra(grid, start, goal)
+            dist, path, _, used_jps = jps(cg, start, goal)
+            assert used_jps and dist == expected
+            if dist < math.inf:
+                assert path[0] == start and path[-1] == goal
+                assert_valid_path(grid, path, dist)
+
+
+def test_jps_follows_map_edits_and_falls_back_on_weighted_maps():
+    grid = [[1] * 10 for _ in range(10)]
+    cg = CompiledGrid.from_rows(grid)
+    assert jps(cg, (0, 0), (0, 9))[0] == 9
+    # les tables JPS+ sont liées à la version : un mur ajouté doit être vu
+    for r in range(9):
+        cg.set_cost((r, 5), None)
+        grid[r][5] = None
+    dist, path, _, _ = jps(cg, (0, 0), (0, 9))
+    assert dist == reference_dijkstra(grid, (0, 0), (0, 9)) == 27
+    assert_valid_path(grid, path, dist)
+    weighted = [[1, 2], [3, 1]]
+    dist, _, _, used_jps = jps(CompiledGrid.from_rows(weighted), (0, 0), (1, 1))
+    assert not used_jps and dist == reference_dijkstra(weighted, (0, 0), (1, 1))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_hpa_is_never_shorter_than_dijkstra_and_finds_the_same_goals(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 40, 40, walls=0.2)
+    cg = CompiledGrid.from_rows(grid)
+    hpa = HierarchicalPathfinder(cg, cluster_size=8)
+    for step in range(2):
+        for start, goal in queries(rng, grid, 30):
+            expected = reference_dijkstra(grid, start, goal)
+            dist, path, _ = hpa.find_path(start, goal)
+            if expected == math.inf:
+                assert dist == math.inf
+                continue
+            assert expected <= dist
+            assert path[0] == start and path[-1] == goal
+            assert_valid_path(grid, path, dist)
+        # modifications incrémentales : seuls les clusters touchés sont recalculés
+        changes = [(cell, None if rng.random() < 0.5 else rng.randint(1, 5))
+                   for cell in rng.sample(free_cells(grid), 40)]
+        hpa.update_cells(changes)
+        for (r, c), v in changes:
+            grid[r][c] = v
+
+
+def test_flow_field_matches_dijkstra_from_every_cell():
+    rng = random.Random(7)
+    grid = random_grid(rng, 15, 15)
+    cg = CompiledGrid.from_rows(grid)
+    goal = free_cells(grid)[0]
+    field = FlowField(cg, goal)
+    for start in free_cells(grid):
+        expected = reference_dijkstra(grid, start, goal)
+        assert field.distance(start) == expected
+        path = field.path_from(start)
+        if expected < math.inf:
+            assert path[0] == start and path[-1] == goal
+            assert_valid_path(grid, path, expected)
+        else:
+            assert path == []
+
+
+def test_solve_queries_and_worker_pool_match_dijkstra():
+    rng = random.Random(8)
+    grid = random_grid(rng, 20, 20, costs=(1, 1))
+    cg = CompiledGrid.from_rows(grid)
+    cg.ensure_connectivity()
+    batch = [(cg.index(s), cg.index(t), algo) for (s, t), algo in
+             zip(queries(rng, grid, 24), ["dijkstra", "astar", "jps", "hpa"] * 6)]
+    expected = [reference_dijkstra(grid, cg.cell(s), cg.cell(t)) for s, t, _ in batch]
+    assert [r[0] for r in solve_queries(cg, batch)] == expected
+    pool = PathWorkerPool(cg, workers=2).acquire()
+    try:
+        assert [r[0] for r in pool.run(batch)] == expected
+    finally:
+        pool.release()
+        pool.close()
+
+
+def test_map_registry_patch_publishes_a_copy(tmp_path):
+    registry = MapRegistry(str(tmp_path))
+    grid = [[1, 1, 1], [1, None, 1], [1, 1, 2.5]]
+    map_id = registry.create(CompiledGrid.from_rows(grid))
+    before = registry.get(map_id)
+    after = registry.patch(map_id, [((0, 1), None), ((1, 1), 3)])
+    assert before.to_rows() == grid
+    assert after.to_rows() == [[1, None, 1], [1, 3, 1], [1, 1, 2.5]]
+    assert after.version != before.version
+    reloaded = MapRegistry(str(tmp_path)).get(map_id)
+    assert reloaded.to_rows() == after.to_rows() and reloaded.version == after.version
+
+
+def test_compiled_grid_binary_round_trip():
+    for grid in ([[1, None], [254, 0]], [[1.5, None], [2, 3]]):
+        cg = CompiledGrid.from_rows(grid)
+        assert CompiledGrid.from_bytes(cg.to_bytes()).to_rows() == grid
+
+
+def test_lru_cache_bounds_entries_and_bytes():
+    evicted = []
+    cache = LRUCache(maxsize=3, on_evict=evicted.append, maxbytes=100, sizeof=len)
+    for key in "abc":
+        cache.put(key, "x" * 30)
+    cache.get("a")
+    cache.put("d", "x" * 30)                  # 4 entrées > maxsize : "b" part (LRU)
+    assert [k for k, _ in cache.items()] == ["c", "a", "d"] and cache.nbytes == 90
+    cache.put("e", "x" * 200)                 # la plus récente reste même trop grosse
+    assert [k for k, _ in cache.items()] == ["e"] and len(evicted) == 4
+
+
+def naive_components(merges):
+    """Composantes et cycles par parcours en largeur, sans union-find."""
+    adj = {}
+    for a, b in merges:
+        adj.setdefault(a, set()).add(b)
+        adj.setdefault(b, set()).add(a)
+    comp = {}
+    for node in adj:
+        if node in comp:
+            continue
+        comp[node], todo = node, [node]
+        while todo:
+            for nxt in adj[todo.pop()]:
+                if nxt not in comp:
+                    comp[nxt] = node
+                    todo.append(nxt)
+    return comp
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_guild_graph_matches_naive_components(seed):
+    rng = random.Random(seed)
+    names = [f"g{i}" for i in range(60)] + ["a\nb", "é\0"]
+    merges = [(rng.choice(names), rng.choice(names)) for _ in range(50)]
+    guilds = GuildGraph()
+    results = guilds.merge_batch(merges)
+    comp = naive_components(merges)
+    edges_per_comp, nodes_per_comp = {}, {}
+    for a, b in merges:
+        edges_per_comp[comp[a]] = edges_per_comp.get(comp[a], 0) + 1
+    for node, root in comp.items():
+        nodes_per_comp[root] = nodes_per_comp.get(root, 0) + 1
+    restored = GuildGraph.from_bytes(guilds.to_bytes())
+    for g in (guilds, restored):
+        assert g.stats()["components"] == len(nodes_per_comp)
+        for a in comp:
+            assert g.component_size(a) == nodes_per_comp[comp[a]]
+            # un cycle existe si la composante a au moins autant d'arêtes que de nœuds
+            assert g.has_cycle(a) == (edges_per_comp.get(comp[a], 0) >= nodes_per_comp[comp[a]])
+        for a, b in merges[:20]:
+            assert g.same_guild(a, b)
+    assert results.count(False) == guilds.stats()["cycles"]
+
+
+def test_guild_graph_rejects_unknown_snapshot_format():
+    data = bytearray(GuildGraph().to_bytes())
+    data[4] = 1
+    with pytest.raises(ValueError):
+        GuildGraph.from_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        GuildGraph.from_bytes(b"GD")
+
+
+def test_detect_cycle_matches_edge_count_rule():
+    rng = random.Random(9)
+    for _ in range(50):
+        n = rng.randint(2, 12)
+        edges = [(rng.randrange(n), rng.randrange(n)) for _ in range(rng.randint(0, n))]
+        comp = naive_components(edges)
+        counts = {}
+        for a, b in edges:
+            counts.setdefault(comp[a], [0, set()])[0] += 1
+            counts[comp[a]][1].update((a, b))
+        assert detect_cycle_with_dsu(edges, n) == any(e >= len(nodes) for e, nodes in counts.values())
+
+
+def test_connectivity_index_follows_wall_edits():
+    rng = random.Random(10)
+    grid = random_grid(rng, 20, 20, walls=0.35, costs=(1, 1))
+    cg = CompiledGrid.from_rows(grid)
+    cg.ensure_connectivity()
+    for _ in range(60):
+        r, c = rng.randrange(20), rng.randrange(20)
+        grid[r][c] = None if grid[r][c] is not None else 1
+        cg.set_cost((r, c), grid[r][c])
+        for start, goal in queries(rng, grid, 5):
+            expected = reference_dijkstra(grid, start, goal) == math.inf
+            assert cg.unreachable(cg.index(start), cg.index(goal)) == expected
@@ -0,0 +1,111 @@
+"""Partie D : sketches et échantillonnage comparés aux comptes exacts (Counter) et à la théorie."""
+import math
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.partD_streaming import (
+    CountMinSketch, HeavyHitters, ReservoirSampler, hash64, hash64_many,
+    reservoir_sampling, weighted_reservoir_sampling,
+)
+
+
+def zipf_stream(n, distinct, seed=0):
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.3, n), distinct)
+    return [f"player{r}" for r in ranks.tolist()]
+
+
+@pytest.mark.parametrize("conservative", [False, True])
+def test_count_min_error_bound(conservative):
+    depth, width = 5, 2000
+    stream = zipf_stream(100_000, 20_000)
+    exact = Counter(stream)
+    cms = CountMinSketch(depth, width, conservative=conservative)
+    cms.add_many(stream)
+    keys = list(exact)
+    est = cms.estimate_many(keys)
+    truth = np.array([exact[k] for k in keys])
+    # jamais de sous-estimation ; sur-estimation <= e/w * N avec probabilité >= 1 - e^-d
+    assert (est >= truth).all()
+    over = (est - truth) > math.e / width * len(stream)
+    assert over.mean() <= math.exp(-depth)
+    assert [cms.estimate(k) for k in keys[:50]] == est[:50].tolist()
+
+
+def test_count_min_batch_and_scalar_ingest_agree():
+    stream = zipf_stream(5000, 500, seed=1)
+    a, b = CountMinSketch(4, 300), CountMinSketch(4, 300)
+    a.add_many(stream)
+    for key in stream:
+        b.add(key)
+    assert (a.table == b.table).all()
+    merged = CountMinSketch(4, 300)
+    merged.add_many(stream[:2500])
+    other = CountMinSketch(4, 300)
+    other.add_many(stream[2500:])
+    merged.merge(other)
+    assert (merged.table == a.table).all()
+
+
+def test_hash64_many_matches_scalar_including_nul_and_long_keys():
+    rng = random.Random(2)
+    keys = ["a", "a\0", "\0", "", "é", b"x\0y", 42, -1, 2**70, 3.5, "z" * 50_000]
+    keys += ["".join(rng.choice("ab\0") for _ in range(rng.randint(0, 20))) for _ in range(500)]
+    assert hash64_many(keys).tolist() == [hash64(k) for k in keys]
+    assert hash64("a") != hash64("a\0")
+    ints = np.arange(1000)
+    assert hash64_many(ints).tolist() == [hash64(int(i)) for i in ints]
+
+
+def test_heavy_hitters_top_matches_exact_counts():
+    stream = zipf_stream(50_000, 5000, seed=3)
+    hh = HeavyHitters(depth=5, width=4000, capacity=50)
+    hh.add_many(stream)
+    exact = Counter(stream).most_common(10)
+    top = hh.top(10)
+    assert [k for k, _ in top[:5]] == [k for k, _ in exact[:5]]
+    for key, estimate in top:
+        assert estimate >= Counter(stream)[key]
+    restored = HeavyHitters.from_bytes(hh.to_bytes())
+    assert restored.top(10) == top
+
+
+def test_heavy_hitters_window_forgets_old_slices():
+    now = [0.0]
+    hh = HeavyHitters(width=500, capacity=10, window_seconds=10, buckets=2, clock=lambda: now[0])
+    hh.add_many(["old"] * 100)
+    now[0] = 6.0
+    hh.add_many(["new"] * 10)
+    assert dict(hh.top(2)) == {"old": 100, "new": 10}
+    now[0] = 11.0     # la tranche de "old" sort de la fenêtre
+    assert dict(hh.top(2)) == {"new": 10}
+
+
+def test_reservoir_sampling_is_uniform():
+    n, k, trials = 20, 5, 4000
+    counts = Counter()
+    for seed in range(trials):
+        sample = reservoir_sampling(range(n), k, seed=seed)
+        assert len(set(sample)) == k
+        counts.update(sample)
+    expected = trials * k / n
+    assert all(abs(counts[i] - expected) < 0.15 * expected for i in range(n))
+
+
+def test_reservoir_add_and_extend_agree():
+    a = ReservoirSampler(10, seed=4)
+    for item in range(10_000):
+        a.add(item)
+    b = ReservoirSampler(10, seed=4).extend(range(10_000))
+    assert a.sample == b.sample and a.n == b.n == 10_000
+    assert reservoir_sampling([1, 2], 5) == [1, 2]
+
+
+def test_weighted_reservoir_follows_weights():
+    counts = Counter()
+    for seed in range(4000):
+        counts.update(weighted_reservoir_sampling([("light", 1.0), ("heavy", 3.0)], 1, seed=seed))
+    assert 2.6 < counts["heavy"] / counts["light"] < 3.4
@@ -0,0 +1,124 @@
+"""Partie E : empreintes et filtres comparés à hashlib, à un arbre de Merkle naïf et à un set exact."""
+import hashlib
+import io
+import os
+
+import pytest
+
+from src.partE_security import (
+    MERKLE_MAX_CHUNK_SIZE, BlobStore, BloomFilter, CuckooFilter, MappedBloomFilter,
+    ScalableBloomFilter, corrupted_chunks, merkle_file, merkle_many, sha256_file, sha256_text,
+)
+
+
+def naive_merkle(data, chunk_size):
+    level = [hashlib.sha256(b"\x00" + data[i:i + chunk_size]).digest()
+             for i in range(0, len(data), chunk_size)] or [hashlib.sha256(b"\x00").digest()]
+    while len(level) > 1:
+        nxt = [hashlib.sha256(b"\x01" + a + b).digest() for a, b in zip(level[::2], level[1::2])]
+        level = nxt + level[len(nxt) * 2:]
+    return level[0].hex()
+
+
+def test_sha256_helpers_match_hashlib():
+    data = os.urandom(200_000)
+    assert sha256_text("bonjour", "sel") == hashlib.sha256("selbonjour".encode()).hexdigest()
+    assert sha256_file(io.BytesIO(data), chunk_size=4096) == hashlib.sha256(data).hexdigest()
+
+
+@pytest.mark.parametrize("size", [0, 1, 999, 1000, 1001, 25_000])
+def test_merkle_matches_naive_tree(tmp_path, size):
+    data = os.urandom(size)
+    path = tmp_path / "asset.pak"
+    path.write_bytes(data)
+    expected = naive_merkle(data, 1000)
+    for source in (io.BytesIO(data), str(path)):
+        result = merkle_file(source, 1000, workers=3)
+        assert result["root"] == expected and result["size"] == size
+        assert len(result["chunks"]) == max(1, -(-size // 1000))
+    many = merkle_many([io.BytesIO(data), io.BytesIO(data[::-1])], 1000)
+    assert [r["root"] for r in many] == [expected, naive_merkle(data[::-1], 1000)]
+
+
+def test_merkle_rejects_unbounded_chunk_size():
+    for chunk_size in (0, -1, MERKLE_MAX_CHUNK_SIZE + 1):
+        with pytest.raises(ValueError):
+            merkle_file(io.BytesIO(b"abc"), chunk_size)
+
+
+def test_corrupted_chunks_finds_changed_extra_and_missing_chunks():
+    data = bytearray(os.urandom(5000))
+    good = merkle_file(io.BytesIO(bytes(data)), 1000)
+    data[2500] ^= 1
+    bad = merkle_file(io.BytesIO(bytes(data)), 1000)
+    assert corrupted_chunks(bad, good["chunks"]) == [2]
+    assert corrupted_chunks(bad, good["chunks"][:3]) == [2, 3, 4]
+
+
+def false_positive_rate(flt, n):
+    probes = [f"absent-{i}" for i in range(n)]
+    return sum(flt.check_many(probes)) / n
+
+
+def test_bloom_filter_has_no_false_negatives_and_meets_its_fpr():
+    members = [f"player{i}" for i in range(5000)]
+    bloom = BloomFilter.for_capacity(5000, 0.01)
+    bloom.add_many(members[:2500])
+    for key in members[2500:]:
+        bloom.add(key)
+    assert all(bloom.check_many(members)) and all(bloom.check(k) for k in members[:100])
+    assert false_positive_rate(bloom, 50_000) <= 2 * 0.01
+    assert bloom.set_bits() == sum(bin(b).count("1") for b in bloom.bits) == bloom.ones
+
+
+def test_scalable_bloom_keeps_its_fpr_past_capacity():
+    members = [f"player{i}" for i in range(20_000)]
+    bloom = ScalableBloomFilter(initial_capacity=1000, fpr=0.01)
+    bloom.add_many(members)
+    assert len(bloom.layers) > 1 and all(bloom.check_many(members))
+    assert false_positive_rate(bloom, 50_000) <= 0.01
+
+
+def test_mapped_bloom_filter_is_shared_and_persistent(tmp_path):
+    path = str(tmp_path / "bans.bloom")
+    a = MappedBloomFilter.open(path, capacity=1000, fpr=0.01)
+    b = MappedBloomFilter.open(path, capacity=1000, fpr=0.01)
+    a.add_many(["x", "y"])
+    assert b.check_many(["x", "y"]) == [True, True] and b.count == 2
+    a.close()
+    b.close()
+    reopened = MappedBloomFilter.open(path)
+    assert reopened.check("x") and reopened.count == 2
+    reopened.close()
+    (tmp_path / "junk.bloom").write_bytes(b"not a bloom filter at all, nope")
+    with pytest.raises(ValueError):
+        MappedBloomFilter.open(str(tmp_path / "junk.bloom"))
+
+
+def test_cuckoo_filter_matches_exact_set_within_fpr_bound():
+    cuckoo = CuckooFilter.for_capacity(10_000, fpr=0.001)
+    members = [f"player{i}" for i in range(10_000)]
+    assert all(cuckoo.add_many(members))
+    assert all(cuckoo.check_many(members))
+    bound = 2 * CuckooFilter.BUCKET_SIZE / 2 ** cuckoo.fp_bits
+    assert false_positive_rate(cuckoo, 50_000) <= bound
+    # retirer la moitié ne crée aucun faux négatif sur l'autre moitié
+    assert all(cuckoo.delete_many(members[::2]))
+    assert all(cuckoo.check_many(members[1::2]))
+    assert cuckoo.count == 5000
+    assert all(cuckoo.delete(k) for k in members[1::2]) and cuckoo.count == 0
+
+
+def test_blob_store_deduplicates_and_collects(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    payload = os.urandom(10_000)
+    first = store.put(io.BytesIO(payload))
+    second = store.put(io.BytesIO(payload))
+    assert first["digest"] == second["digest"] == hashlib.sha256(payload).hexdigest()
+    assert (first["deduplicated"], second["deduplicated"], second["refs"]) == (False, True, 2)
+    assert store.get(first["digest"]) == payload
+    assert store.summary()["blobs"] == 1
+    assert store.release(first["digest"]) == 1 and store.gc()["collected"] == 0
+    assert store.release(first["digest"]) == 0
+    assert store.gc() == {"collected": 1, "freed_bytes": 10_000}
+    assert store.get(first["digest"]) is None